@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core.authentication import user_cache
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user whenever it changes, e.g. on a password change or deactivation."""
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def invalidate_user_of_blacklisted_token(sender, instance, **kwargs):
+    """Drop the cached user when one of its tokens is blacklisted, e.g. on logout."""
+    if instance.token.user_id is not None:
+        user_cache.invalidate(instance.token.user_id)
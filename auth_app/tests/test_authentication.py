@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.authentication import CookieJWTAuthentication, user_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def authenticate(user):
+    request = RequestFactory().get('/api/quizzes/')
+    request.COOKIES['access_token'] = str(AccessToken.for_user(user))
+    with CaptureQueriesContext(connection) as queries:
+        result = CookieJWTAuthentication().authenticate(request)
+    return result[0], len(queries)
+
+
+@pytest.mark.parametrize('alias', ['', 'default'])
+def test_user_is_loaded_once_and_then_served_from_cache(test_user, settings, alias):
+    settings.AUTH_USER_CACHE_ALIAS = alias
+
+    first, first_queries = authenticate(test_user)
+    second, second_queries = authenticate(test_user)
+
+    assert (first_queries, second_queries) == (1, 0)
+    assert first.pk == second.pk == test_user.pk
+    assert first is not second
+
+
+def test_cache_can_be_disabled(test_user, settings):
+    settings.AUTH_USER_CACHE_TTL = 0
+
+    assert [authenticate(test_user)[1] for _ in range(2)] == [1, 1]
+
+
+def test_password_change_and_deactivation_invalidate_the_cached_user(test_user):
+    authenticate(test_user)
+    test_user.set_password('a-new-password')
+    test_user.save()
+    user, queries = authenticate(test_user)
+    assert queries == 1
+    assert user.check_password('a-new-password')
+
+    test_user.is_active = False
+    test_user.save()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(test_user)
+
+
+def test_blacklisting_a_token_invalidates_the_cached_user(test_user):
+    authenticate(test_user)
+    assert user_cache.get(test_user.pk) is not None
+
+    RefreshToken.for_user(test_user).blacklist()
+
+    assert user_cache.get(test_user.pk) is None
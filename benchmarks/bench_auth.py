@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Database queries and latency per authenticated API request, with and without the user cache.
+
+Serves the quiz endpoints in-process with Django's test client against a throwaway SQLite database.
+Every request authenticates with the access_token cookie; "uncached" sets AUTH_USER_CACHE_TTL=0, so
+CookieJWTAuthentication loads the user on every request as before the cache existed.
+
+Usage:
+    python benchmarks/bench_auth.py --requests 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(BASE_DIR), str(Path(__file__).resolve().parent)]
+os.environ.setdefault("BENCH_DATABASE", os.path.join(tempfile.mkdtemp(prefix="quizly-auth-"), "db.sqlite3"))
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-for-the-auth-benchmark-only")
+os.environ["DJANGO_SETTINGS_MODULE"] = "load_settings"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from core.authentication import user_cache  # noqa: E402
+from quiz_app.models import Question, Quiz, QuizJob  # noqa: E402
+
+
+def prepare():
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user("bench", "bench@example.com", "bench-password")
+    quizzes = Quiz.objects.bulk_create([
+        Quiz(title=f"Quiz {i}", video_url="https://youtu.be/x", quiz_creator=user) for i in range(20)
+    ])
+    Question.objects.bulk_create([
+        Question(quiz=quiz, question_title="Q?", question_options=["a", "b", "c", "d"], answer="a")
+        for quiz in quizzes for _ in range(10)
+    ])
+    job = QuizJob.objects.create(quiz=quizzes[0])
+    return user, quizzes[0], job
+
+
+def measure(client: Client, path: str, requests: int) -> tuple[float, float]:
+    """Return the queries per request and the median latency in ms."""
+    client.get(path)
+    timings, queries = [], 0
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+        queries += len(captured)
+    return queries / requests, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user, quiz, job = prepare()
+    client = Client()
+    client.cookies["access_token"] = str(AccessToken.for_user(user))
+    endpoints = [
+        ("quiz list", "/api/quizzes/?summary=true"),
+        ("quiz detail", f"/api/quizzes/{quiz.id}/"),
+        ("job detail", f"/api/jobs/{job.id}/"),
+    ]
+
+    print(f"{'endpoint':<12} {'queries uncached':>16} {'queries cached':>14} {'ms uncached':>11} {'ms cached':>9}")
+    for name, path in endpoints:
+        with override_settings(AUTH_USER_CACHE_TTL=0):
+            uncached_queries, uncached_ms = measure(client, path, args.requests)
+        user_cache.clear()
+        cached_queries, cached_ms = measure(client, path, args.requests)
+        print(f"{name:<12} {uncached_queries:>16.1f} {cached_queries:>14.1f} {uncached_ms:>11.2f} {cached_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Load test of the quiz endpoints under WSGI (gunicorn, sync views) and ASGI (uvicorn, async views).
+
+Both servers run against the same throwaway SQLite database with the same number of worker processes.
+For every concurrency level the script keeps that many requests in flight against each endpoint and
+reports throughput, median and 95th percentile latency and failed requests. Generation jobs are only
+queued (QUIZ_JOBS_RUN_IN_PROCESS=False), so the numbers measure request handling, not Gemini or Whisper.
+
+Requires gunicorn and uvicorn (pip install gunicorn uvicorn).
+
+Usage:
+    python benchmarks/bench_load.py --workers 1 --threads 4 --concurrency 1,16,64,256 --requests 500
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def server_env(database: str, async_views: bool, extra_env: dict | None = None) -> dict:
+    env = dict(os.environ, **(extra_env or {}))
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "load_settings",
+        "PYTHONPATH": os.pathsep.join([str(BASE_DIR), str(BENCH_DIR)]),
+        "BENCH_DATABASE": database,
+        "ASYNC_VIEWS": str(async_views),
+        "QUIZ_JOBS_RUN_IN_PROCESS": "False",
+        "DEBUG": "False",
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "bench"),
+        "SECRET_KEY": env.get("SECRET_KEY", "bench-secret-key-for-the-load-test-only"),
+    })
+    return env
+
+
+def prepare_database(database: str, quizzes: int, extra_env: dict | None = None) -> tuple[str, int]:
+    """Migrate the database, create a user with quizzes and return an access token and a quiz ID."""
+    script = (
+        "import django; django.setup(); "
+        "from django.core.management import call_command; call_command('migrate', verbosity=0); "
+        "from django.contrib.auth import get_user_model; "
+        "from rest_framework_simplejwt.tokens import AccessToken; "
+        "from quiz_app.models import Quiz, Question; "
+        "user = get_user_model().objects.create_user('bench', 'bench@example.com', 'bench-password'); "
+        f"quizzes = Quiz.objects.bulk_create([Quiz(title=f'Quiz {{i}}', video_url='https://youtu.be/x', quiz_creator=user) for i in range({quizzes})]); "
+        "Question.objects.bulk_create([Question(quiz=q, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a') for q in quizzes for _ in range(10)]); "
+        "print(AccessToken.for_user(user), quizzes[0].id)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=server_env(database, False, extra_env), cwd=BASE_DIR,
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return output[0], int(output[1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind: str, database: str, workers: int, threads: int, extra_env: dict | None = None) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    if kind == "wsgi":
+        command = [
+            sys.executable, "-m", "gunicorn", "core.wsgi:application", "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers), "--threads", str(threads), "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "core.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ]
+    process = subprocess.Popen(command, env=server_env(database, kind == "asgi", extra_env), cwd=BASE_DIR)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/quizzes/", timeout=1)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def run_load(base_url: str, token: str, method: str, path: str, body, concurrency: int, total: int) -> dict:
+    """Send total requests with concurrency requests in flight and collect the latencies."""
+    latencies, failures = [], 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, cookies={"access_token": token}, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal failures
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                failures += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "failed": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes per server")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument("--concurrency", default="1,16,64,256", help="comma separated requests in flight")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint and concurrency level")
+    parser.add_argument("--quizzes", type=int, default=200, help="quizzes in the benchmark database")
+    args = parser.parse_args()
+
+    for module in ("gunicorn", "uvicorn"):
+        if shutil.which(module) is None and subprocess.run([sys.executable, "-c", f"import {module}"]).returncode:
+            sys.exit(f"{module} is not installed (pip install {module})")
+
+    tmp_dir = tempfile.mkdtemp(prefix="quizly-load-")
+    database = os.path.join(tmp_dir, "db.sqlite3")
+    try:
+        token, quiz_id = prepare_database(database, args.quizzes)
+        endpoints = [
+            ("list", "GET", "/api/quizzes/", None),
+            ("detail", "GET", f"/api/quizzes/{quiz_id}/", None),
+            ("create", "POST", "/api/createQuiz/", {"url": "https://www.youtube.com/watch?v=bench"}),
+        ]
+        levels = [int(level) for level in args.concurrency.split(",")]
+        print(f"{'server':<6} {'endpoint':<8} {'in flight':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7}")
+        for kind in ("wsgi", "asgi"):
+            process, base_url = start_server(kind, database, args.workers, args.threads)
+            try:
+                for name, method, path, body in endpoints:
+                    for concurrency in levels:
+                        result = asyncio.run(run_load(base_url, token, method, path, body, concurrency, args.requests))
+                        print(
+                            f"{kind:<6} {name:<8} {concurrency:>9} {result['rps']:>8.0f} "
+                            f"{result['p50']:>8.1f} {result['p95']:>8.1f} {result['failed']:>7}"
+                        )
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
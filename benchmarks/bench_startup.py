@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for Django management commands and web worker boot.
+
+Measures the wall time of `manage.py check` and of booting a WSGI worker
+(django.setup plus loading the URLconf, which imports every view, the admin and the tasks).
+The "eager" variant imports the heavy ML and GenAI stacks up front the way the
+project did before they were loaded lazily, so both numbers come from the same tree.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+EAGER_IMPORTS = "import torch, whisper, yt_dlp; from google import genai; "
+
+WORKER_BOOT = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings'); "
+    "from core.wsgi import application; "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "import quiz_app.admin"
+)
+
+CHECK = (
+    "import sys; sys.argv = ['manage.py', 'check']; "
+    "import runpy; runpy.run_path('manage.py', run_name='__main__')"
+)
+
+
+def measure(code: str, runs: int) -> list:
+    """Run code in a fresh interpreter runs times and return the wall times in seconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("manage.py check", CHECK),
+        ("worker boot", WORKER_BOOT),
+    ]
+    print(f"{'scenario':<20} {'eager (s)':>10} {'lazy (s)':>10} {'speedup':>8}")
+    for name, code in scenarios:
+        eager = statistics.median(measure(EAGER_IMPORTS + code, args.runs))
+        lazy = statistics.median(measure(code, args.runs))
+        print(f"{name:<20} {eager:>10.2f} {lazy:>10.2f} {eager / lazy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
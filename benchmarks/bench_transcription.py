@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compare the transcription backends on the sample audio in benchmarks/samples.
+
+For every backend the model is loaded once, then each sample is transcribed and compared
+with its reference transcript. Reported are the load time, the real-time factor
+(transcription time / audio duration, lower is faster) and the word error rate.
+
+Samples are pairs of <name>.wav (or any format ffmpeg can read) and <name>.txt with the
+reference transcript; benchmarks/fetch_samples.py downloads a public domain set.
+
+Usage:
+    python benchmarks/fetch_samples.py
+    python benchmarks/bench_transcription.py --model-size base --backends whisper,whisper-int8,faster-whisper
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SAMPLES_DIR = Path(__file__).resolve().parent / "samples"
+AUDIO_SUFFIXES = {".wav", ".flac", ".mp3", ".m4a", ".ogg", ".webm"}
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+    django.setup()
+
+
+def load_audio(path: Path) -> np.ndarray:
+    """Read a sample as 16 kHz mono float32, using ffmpeg for anything but 16 kHz mono 16-bit WAV."""
+    if path.suffix == ".wav":
+        with wave.open(str(path)) as wav:
+            if wav.getframerate() == 16000 and wav.getnchannels() == 1 and wav.getsampwidth() == 2:
+                frames = wav.readframes(wav.getnframes())
+                return np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+    from quiz_app.utils.whisper_utils import decode_audio
+    return decode_audio(str(path))
+
+
+def normalize_words(text: str) -> list:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the number of reference words."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def load_samples(directory: Path) -> list:
+    samples = []
+    for path in sorted(directory.iterdir()):
+        reference = path.with_suffix(".txt")
+        if path.suffix in AUDIO_SUFFIXES and reference.exists():
+            samples.append((path.name, load_audio(path), reference.read_text(encoding="utf-8")))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="whisper,whisper-int8,faster-whisper")
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--samples", type=Path, default=SAMPLES_DIR)
+    args = parser.parse_args()
+
+    setup_django()
+    from quiz_app.utils.transcription_backends import get_backend
+
+    samples = load_samples(args.samples)
+    if not samples:
+        sys.exit(f"No samples found in {args.samples}, see {SAMPLES_DIR / 'README.md'}.")
+    total_audio = sum(len(audio) for _, audio, _ in samples) / 16000
+
+    print(f"{len(samples)} sample(s), {total_audio:.1f}s of audio, model size {args.model_size} on {args.device}\n")
+    print(f"{'backend':<16} {'load (s)':>9} {'transcribe (s)':>15} {'RTF':>7} {'WER':>7}")
+    for name in args.backends.split(","):
+        backend = get_backend(name.strip())
+        try:
+            started = time.perf_counter()
+            model = backend.load(args.model_size, args.device)
+            load_seconds = time.perf_counter() - started
+        except Exception as e:
+            print(f"{backend.name:<16} skipped: {e}")
+            continue
+
+        transcribe_seconds = 0.0
+        errors = []
+        for _, audio, reference in samples:
+            started = time.perf_counter()
+            text = model.transcribe(audio)["text"]
+            transcribe_seconds += time.perf_counter() - started
+            errors.append(word_error_rate(reference, text))
+        rtf = transcribe_seconds / total_audio
+        wer = sum(errors) / len(errors)
+        print(f"{backend.name:<16} {load_seconds:>9.2f} {transcribe_seconds:>15.2f} {rtf:>7.3f} {wer:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
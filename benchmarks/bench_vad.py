@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measure what the voice activity detection pre-pass saves on the sample audio in benchmarks/samples.
+
+For every sample the speech ratio (speech kept by the VAD / total duration) is reported.
+Unless --vad-only is given, each sample is also transcribed with and without the VAD pre-pass,
+reporting both transcription times, the speedup and the word error rate of both runs,
+so that a speedup bought with dropped words is visible.
+
+Usage:
+    python benchmarks/bench_vad.py --model-size base --backend whisper
+    python benchmarks/bench_vad.py --vad-only --threshold-db 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bench_transcription import SAMPLES_DIR, load_samples, setup_django, word_error_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="whisper")
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--samples", type=Path, default=SAMPLES_DIR)
+    parser.add_argument("--threshold-db", type=float, default=None)
+    parser.add_argument("--vad-only", action="store_true", help="Only report the speech ratio, load no model.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from quiz_app.utils.transcription_backends import get_backend
+    from quiz_app.utils.vad import compact_speech, detect_speech
+
+    samples = load_samples(args.samples)
+    if not samples:
+        sys.exit(f"No samples found in {args.samples}, see {SAMPLES_DIR / 'README.md'}.")
+
+    model = None
+    if not args.vad_only:
+        model = get_backend(args.backend).load(args.model_size, args.device)
+        print(f"backend {args.backend}, model size {args.model_size} on {args.device}\n")
+
+    print(f"{'sample':<24} {'audio (s)':>9} {'speech':>7} {'vad (s)':>8} {'full (s)':>9} {'vad+asr (s)':>11} {'speedup':>8} {'WER full':>9} {'WER vad':>8}")
+    totals = {"audio": 0.0, "speech": 0.0, "full": 0.0, "vad": 0.0}
+    for name, audio, reference in samples:
+        started = time.perf_counter()
+        compacted, _ = compact_speech(audio, detect_speech(audio, threshold_db=args.threshold_db))
+        vad_seconds = time.perf_counter() - started
+        duration, speech = len(audio) / 16000, len(compacted) / 16000
+        totals["audio"] += duration
+        totals["speech"] += speech
+        line = f"{name:<24} {duration:>9.1f} {speech / duration:>7.1%} {vad_seconds:>8.3f}"
+        if model is None:
+            print(line)
+            continue
+
+        started = time.perf_counter()
+        full_text = model.transcribe(audio)["text"]
+        full_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        vad_text = model.transcribe(compacted)["text"] if len(compacted) else ""
+        vad_total = vad_seconds + time.perf_counter() - started
+        totals["full"] += full_seconds
+        totals["vad"] += vad_total
+        print(
+            f"{line} {full_seconds:>9.2f} {vad_total:>11.2f} {full_seconds / vad_total:>7.2f}x"
+            f" {word_error_rate(reference, full_text):>9.1%} {word_error_rate(reference, vad_text):>8.1%}"
+        )
+
+    print(f"\nspeech ratio {totals['speech'] / totals['audio']:.1%} of {totals['audio']:.1f}s "
+          f"(threshold {settings.VAD_THRESHOLD_DB if args.threshold_db is None else args.threshold_db} dB)")
+    if model is not None:
+        print(f"overall speedup {totals['full'] / totals['vad']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Download the public domain sample clips used by bench_transcription.py into benchmarks/samples.
+
+Every sample is stored as <name>.wav (16 kHz mono 16-bit, read without ffmpeg) next to
+<name>.txt with its reference transcript. Existing files are kept, so the script can be
+re-run after adding samples to SAMPLES.
+
+Usage:
+    python benchmarks/fetch_samples.py
+    python benchmarks/bench_transcription.py --model-size base
+"""
+import argparse
+import hashlib
+import sys
+import urllib.request
+from pathlib import Path
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "samples"
+
+# (name, url, sha256 of the audio or "" to skip the check, reference transcript)
+SAMPLES = [
+    (
+        "jfk_inaugural",
+        "https://raw.githubusercontent.com/ggml-org/whisper.cpp/master/samples/jfk.wav",
+        "",
+        "And so my fellow Americans, ask not what your country can do for you, "
+        "ask what you can do for your country.",
+    ),
+]
+
+
+def fetch(url: str, target: Path, sha256: str) -> None:
+    """Download url to target, verifying the checksum if one is given."""
+    with urllib.request.urlopen(url, timeout=60) as response:
+        data = response.read()
+    if sha256 and hashlib.sha256(data).hexdigest() != sha256:
+        raise ValueError(f"Checksum mismatch for {url}")
+    target.write_bytes(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=Path, default=SAMPLES_DIR)
+    args = parser.parse_args()
+
+    args.samples.mkdir(parents=True, exist_ok=True)
+    failed = False
+    for name, url, sha256, reference in SAMPLES:
+        audio = args.samples / f"{name}.wav"
+        if not audio.exists():
+            try:
+                fetch(url, audio, sha256)
+            except (OSError, ValueError) as e:
+                print(f"{name}: {e}", file=sys.stderr)
+                failed = True
+                continue
+        audio.with_suffix(".txt").write_text(reference + "\n", encoding="utf-8")
+        print(f"{name}: {audio}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
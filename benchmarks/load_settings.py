@@ -0,0 +1,18 @@
+"""
+Settings for the benchmarks that serve requests: the project settings with a throwaway database.
+BENCH_DATABASE replaces the SQLite file; leave it empty to use DATABASE_URL as configured.
+BENCH_SQLITE_LEGACY=True drops the WAL, busy_timeout and IMMEDIATE options to compare with plain SQLite.
+BENCH_FAST_PASSWORD_HASHER=True hashes passwords with MD5, so logins measure the database and not PBKDF2.
+"""
+import os
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import DATABASES, str_to_bool
+
+if os.environ.get('BENCH_DATABASE'):
+    DATABASES['default']['NAME'] = os.environ['BENCH_DATABASE']
+if str_to_bool(os.environ.get('BENCH_SQLITE_LEGACY', 'False')):
+    DATABASES['default']['OPTIONS'] = {}
+if str_to_bool(os.environ.get('BENCH_FAST_PASSWORD_HASHER', 'False')):
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+ALLOWED_HOSTS = ['*']
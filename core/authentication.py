@@ -1,10 +1,77 @@
+import copy
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users, keyed by user ID.
+    By default a per-process LRU cache with AUTH_USER_CACHE_SIZE entries that expire after
+    AUTH_USER_CACHE_TTL seconds. With AUTH_USER_CACHE_ALIAS the users are stored in that Django
+    cache instead, so invalidations reach every process. Every caller gets its own copy of the user.
+    """
+    def __init__(self):
+        self._local = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"auth-user:{user_id}"
+
+    def _local_cache(self) -> TTLCache:
+        size, ttl = settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+        if self._local is None or (self._local.maxsize, self._local.ttl) != (size, ttl):
+            self._local = TTLCache(maxsize=size, ttl=ttl)
+        return self._local
+
+    def get(self, user_id):
+        """Return a copy of the cached user, or None."""
+        if settings.AUTH_USER_CACHE_TTL <= 0:
+            return None
+        if settings.AUTH_USER_CACHE_ALIAS:
+            user = caches[settings.AUTH_USER_CACHE_ALIAS].get(self._key(user_id))
+        else:
+            with self._lock:
+                user = self._local_cache().get(str(user_id))
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user_id, user) -> None:
+        if settings.AUTH_USER_CACHE_TTL <= 0:
+            return
+        if settings.AUTH_USER_CACHE_ALIAS:
+            caches[settings.AUTH_USER_CACHE_ALIAS].set(self._key(user_id), user, settings.AUTH_USER_CACHE_TTL)
+        else:
+            with self._lock:
+                self._local_cache()[str(user_id)] = copy.copy(user)
+
+    def invalidate(self, user_id) -> None:
+        """Drop the cached user, e.g. after a password change, deactivation or logout."""
+        if settings.AUTH_USER_CACHE_ALIAS:
+            caches[settings.AUTH_USER_CACHE_ALIAS].delete(self._key(user_id))
+        with self._lock:
+            if self._local is not None:
+                self._local.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local = None
+
+
+user_cache = UserCache()
 
 
 class CookieJWTAuthentication(JWTAuthentication):
     """
     Custom JWT authentication that reads the token from an 'access_token' HttpOnly cookie.
+    The user of a token is looked up through user_cache, so most requests need no User query.
     """
     def authenticate(self, request):
         access_token = request.COOKIES.get("access_token")
@@ -15,3 +82,23 @@ class CookieJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
         except InvalidToken:
             return None
+
+    def get_user(self, validated_token):
+        """
+        Return the user of the token from the cache, loading it on a miss.
+        Cached users go through the same active and revocation checks as loaded ones.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,142 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .events import EventStreamRenderer, ajob_events, event_stream_response
+from .serializers import QuizJobSerializer
+from .views import CreateQuizView, QuizListView, QuizReviewPutPatchDeleteView, QuizJobDetailView, QuizEventsView, job_accepted_response
+from quiz_app.jobs import aenqueue_job, schedule_async_job
+from quiz_app.models import QuizJob
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with coroutine handlers for ASGI servers (uvicorn, daphne).
+    Authentication, permission checks and other blocking work run in a thread via sync_to_async,
+    so the event loop keeps serving other requests while a request waits for the database.
+    Handlers return a Response whose data is fully serialized; rendering happens in Django's async handler.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        """Async counterpart of APIView.dispatch."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncCreateQuizView(AsyncAPIView, CreateQuizView):
+    """
+    Async variant of CreateQuizView.
+    The generation job runs as a task on the server's event loop.
+    """
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests for creating a new quiz.
+
+        1. Validate the incoming data using the serializer.
+        2. If valid, save the new quiz, queue the quiz generation job, and return the job data with HTTP 202 status.
+           A retry with the same Idempotency-Key returns the existing job.
+        3. If invalid, return the serializer errors with HTTP 400 status.
+        """
+        job, replayed = await sync_to_async(self.start_generation)(request, enqueue=store_job)
+        if not replayed:
+            schedule_async_job(job.id)
+        return job_accepted_response(job, replayed)
+
+
+def store_job(quiz, kind: str) -> QuizJob:
+    """Store a queued job without handing it to the worker pool; the async views schedule it on the event loop."""
+    return QuizJob.objects.create(quiz=quiz, kind=kind)
+
+
+class AsyncQuizListView(AsyncAPIView, QuizListView):
+    """Async variant of QuizListView."""
+    async def get(self, request, *args, **kwargs):
+        """Handle GET requests to list quizzes, querying and serializing the page in a thread."""
+        return await sync_to_async(self.list)(request, *args, **kwargs)
+
+
+class AsyncQuizReviewPutPatchDeleteView(AsyncAPIView, QuizReviewPutPatchDeleteView):
+    """
+    Async variant of QuizReviewPutPatchDeleteView.
+    Regeneration jobs run as tasks on the server's event loop.
+    """
+    async def get(self, request, *args, **kwargs):
+        """Handle GET requests to retrieve a specific quiz."""
+        return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        """
+        Handle PUT requests to update a specific quiz.
+        Queues the quiz regeneration job and returns the job data with HTTP 202 status.
+        """
+        quiz = await sync_to_async(self.save_update)(request)
+        job = await aenqueue_job(quiz, QuizJob.Kind.UPDATE, force_regenerate=self.force_regenerate())
+        return Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    async def patch(self, request, *args, **kwargs):
+        """
+        Handle PATCH requests to partially update a specific quiz.
+        If a video URL is given, queues the quiz regeneration job and returns the job data with HTTP 202 status,
+        otherwise returns the updated quiz data with HTTP 200 status.
+        """
+        quiz = await sync_to_async(self.save_update)(request, partial=True)
+        if "video_url" in request.data:
+            job = await aenqueue_job(quiz, QuizJob.Kind.UPDATE, force_regenerate=self.force_regenerate())
+            return Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        data = await sync_to_async(lambda: self.get_serializer(quiz).data)()
+        return Response(data, status=status.HTTP_200_OK)
+
+    async def delete(self, request, *args, **kwargs):
+        """Handle DELETE requests to delete a specific quiz."""
+        return await sync_to_async(self.destroy)(request, *args, **kwargs)
+
+
+class AsyncQuizJobDetailView(AsyncAPIView, QuizJobDetailView):
+    """Async variant of QuizJobDetailView."""
+    async def get(self, request, *args, **kwargs):
+        """Handle GET requests to poll the status of a job."""
+        return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+
+
+class AsyncQuizEventsView(AsyncAPIView, QuizEventsView):
+    """
+    Async variant of QuizEventsView that also streams the progress as server-sent events;
+    open event streams hold no worker thread.
+    Each event carries the job status and its overall progress in percent; the stream ends
+    with a "done" or "failed" event.
+    """
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer, EventStreamRenderer]
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to follow the generation of a quiz.
+
+        1. Retrieve the latest job of the quiz.
+        2. For text/event-stream, stream an event on every stage or progress change until the job is done or failed.
+        3. Otherwise, return the job data with HTTP 200 status.
+        """
+        job = await sync_to_async(self.get_job)()
+        if request.accepted_renderer.format != EventStreamRenderer.format:
+            return Response(QuizJobSerializer(job).data, status=status.HTTP_200_OK)
+        return event_stream_response(ajob_events(job.id))
@@ -0,0 +1,121 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from quiz_app.models import Question
+
+PAYLOAD_KEY = 'quiz-payload:{}'
+
+
+def with_versions(queryset):
+    """
+    Annotate each quiz with the newest updated_at and the number of its questions.
+    Correlated subqueries are only evaluated for the returned rows, so paginated lists keep using their index.
+    """
+    questions = Question.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz')
+    return queryset.annotate(
+        questions_updated_at=Subquery(questions.annotate(latest=Max('updated_at')).values('latest')),
+        question_count=Subquery(questions.annotate(count=Count('id')).values('count')),
+    )
+
+
+def make_etag(*parts) -> str:
+    """Return a strong ETag over the given parts."""
+    digest = hashlib.sha256('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def quiz_etag(quiz) -> str:
+    """
+    Return the ETag of a quiz annotated by with_versions.
+    It changes whenever the quiz is saved or a question is added, changed or deleted.
+    """
+    return make_etag('quiz', quiz.pk, quiz.updated_at.isoformat(), quiz.questions_updated_at, quiz.question_count)
+
+
+def quiz_last_modified(quiz):
+    """Return when a quiz annotated by with_versions or one of its questions last changed."""
+    return max(filter(None, (quiz.updated_at, quiz.questions_updated_at)))
+
+
+def http_timestamp(value) -> int:
+    """Return a datetime in whole seconds since the epoch, the resolution of HTTP dates."""
+    return int(value.timestamp())
+
+
+def not_modified(request, etag: str, last_modified=None):
+    """
+    Return a 304 response with the validators if the client's copy is current, otherwise None.
+    If-None-Match takes precedence over If-Modified-Since, which is compared in whole seconds.
+    """
+    timestamp = http_timestamp(last_modified) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        return None
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag: str, last_modified=None):
+    """
+    Set ETag and Last-Modified on a response. The responses depend on the logged-in user,
+    so clients may keep them only privately and must revalidate them before reuse.
+    Last-Modified is left out while the second of the last change is not over: a second change
+    in that second would get the same value, and If-Modified-Since would then hide it.
+    """
+    response['ETag'] = etag
+    if last_modified is not None and http_timestamp(last_modified) < http_timestamp(timezone.now()):
+        response['Last-Modified'] = http_date(http_timestamp(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class QuizPayloadCache:
+    """
+    Serialized quizzes in the Django cache QUIZ_PAYLOAD_CACHE_ALIAS, keyed by quiz ID.
+    Every payload is stored with the ETag of the quiz version it was built from and only returned for
+    that ETag, so a process never serves an outdated payload, even if the invalidation of another
+    process did not reach its cache. Signal handlers drop payloads of changed quizzes early.
+    """
+    @staticmethod
+    def _cache():
+        return caches[settings.QUIZ_PAYLOAD_CACHE_ALIAS]
+
+    def get_many(self, etags: dict) -> dict:
+        """
+        Args:
+            etags (dict): The current ETag per quiz ID.
+
+        Returns:
+            dict: The cached payloads per quiz ID, only for quizzes whose ETag matches.
+        """
+        if settings.QUIZ_PAYLOAD_CACHE_TTL <= 0 or not etags:
+            return {}
+        found = self._cache().get_many([PAYLOAD_KEY.format(quiz_id) for quiz_id in etags])
+        payloads = {}
+        for quiz_id, etag in etags.items():
+            entry = found.get(PAYLOAD_KEY.format(quiz_id))
+            if entry is not None and entry[0] == etag:
+                payloads[quiz_id] = entry[1]
+        return payloads
+
+    def set_many(self, payloads: dict) -> None:
+        """
+        Args:
+            payloads (dict): (etag, payload) tuples per quiz ID.
+        """
+        if settings.QUIZ_PAYLOAD_CACHE_TTL <= 0 or not payloads:
+            return
+        entries = {PAYLOAD_KEY.format(quiz_id): entry for quiz_id, entry in payloads.items()}
+        self._cache().set_many(entries, settings.QUIZ_PAYLOAD_CACHE_TTL)
+
+    def invalidate(self, quiz_id) -> None:
+        """Drop the cached payload of a quiz."""
+        self._cache().delete(PAYLOAD_KEY.format(quiz_id))
+
+
+payload_cache = QuizPayloadCache()
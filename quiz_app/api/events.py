@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from quiz_app.models import QuizJob
+
+EVENT_FIELDS = ('id', 'quiz_id', 'status', 'progress', 'error')
+TERMINAL_STATUSES = (QuizJob.Status.DONE, QuizJob.Status.FAILED)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients request text/event-stream. Successful responses are streamed by the view,
+    so this renderer only renders error responses, as JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset)
+
+
+def format_event(event: str, data: dict) -> str:
+    """Return one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JobEventState:
+    """
+    Turns successive snapshots of a job into server-sent events.
+    An event is sent whenever stage or progress change, a comment line keeps idle connections
+    open every QUIZ_EVENTS_KEEPALIVE seconds, and the stream ends when the job finished,
+    vanished or QUIZ_EVENTS_TIMEOUT is reached.
+    """
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.started = self.last_sent = time.monotonic()
+        self.last = None
+        self.finished = False
+
+    def next_events(self, job: dict | None) -> list:
+        now = time.monotonic()
+        if job is None:
+            self.finished = True
+            return [format_event('failed', {'id': self.job_id, 'status': QuizJob.Status.FAILED, 'error': 'Job not found.'})]
+        events = []
+        snapshot = {'id': job['id'], 'quiz': job['quiz_id'], 'status': job['status'], 'progress': job['progress'], 'error': job['error']}
+        if snapshot != self.last:
+            self.last = snapshot
+            self.last_sent = now
+            terminal = job['status'] in TERMINAL_STATUSES
+            events.append(format_event(job['status'] if terminal else 'progress', snapshot))
+            self.finished = terminal
+        elif now - self.last_sent >= settings.QUIZ_EVENTS_KEEPALIVE:
+            self.last_sent = now
+            events.append(': keepalive\n\n')
+        if now - self.started >= settings.QUIZ_EVENTS_TIMEOUT:
+            self.finished = True
+        return events
+
+
+async def ajob_events(job_id: int):
+    """
+    Yield the server-sent events of a job, polling the job row every QUIZ_EVENTS_POLL_INTERVAL seconds.
+    Holds no thread while the client waits.
+    """
+    state = JobEventState(job_id)
+    yield f"retry: {settings.QUIZ_EVENTS_RETRY_MS}\n\n"
+    while True:
+        job = await QuizJob.objects.filter(pk=job_id).values(*EVENT_FIELDS).afirst()
+        for event in state.next_events(job):
+            yield event
+        if state.finished:
+            return
+        await asyncio.sleep(settings.QUIZ_EVENTS_POLL_INTERVAL)
+
+
+def event_stream_response(events) -> StreamingHttpResponse:
+    """Wrap an event iterator in an unbuffered text/event-stream response."""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
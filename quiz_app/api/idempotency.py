@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from quiz_app.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyKeyReused(APIException):
+    """Raised when an Idempotency-Key is sent again with a different request body."""
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different request.'
+    default_code = 'idempotency_key_reused'
+
+
+def get_idempotency_key(request) -> str | None:
+    """Return the Idempotency-Key header of the request, or None if it was not sent."""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+        raise ValidationError({IDEMPOTENCY_HEADER: 'Must be between 1 and 255 characters long.'})
+    return key
+
+
+def request_hash(data: dict) -> str:
+    """Return a fingerprint of the validated request data."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def find_replayed_job(user, key: str, fingerprint: str):
+    """
+    Return the job started by an earlier request of the user with the same key, or None.
+    Keys older than IDEMPOTENCY_KEY_TTL are forgotten.
+    Raises IdempotencyKeyReused if the earlier request had a different body.
+    """
+    record = IdempotencyKey.objects.select_related('job').filter(user=user, key=key, created_at__gte=_expiry_cutoff()).first()
+    if record is None:
+        return None
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyReused()
+    return record.job
+
+
+def remember_key(user, key: str, fingerprint: str, job) -> None:
+    """Store the key together with the job it started and drop the user's expired keys."""
+    IdempotencyKey.objects.filter(user=user, created_at__lt=_expiry_cutoff()).delete()
+    IdempotencyKey.objects.create(user=user, key=key, request_hash=fingerprint, job=job)
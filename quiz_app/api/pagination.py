@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """
+    Cursor pagination for quiz lists, newest first.
+    Cursors encode the position on created_at (with id as tie-breaker), so each page is a
+    single indexed range query no matter how many quizzes exist.
+
+    Attributes:
+        page_size (int): The default number of quizzes per page.
+        page_size_query_param (str): The query parameter to change the page size.
+        max_page_size (int): The largest page size a client may request.
+        ordering (tuple): The fields the cursor is based on.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
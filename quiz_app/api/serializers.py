@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from quiz_app.models import Quiz, Question
+from quiz_app.models import Quiz, Question, QuizJob
 
 
 class CreateQuizSerializer(serializers.ModelSerializer):
@@ -78,6 +78,7 @@ class QuizSerializer(serializers.ModelSerializer):
         video_url (str): The URL of the video for the quiz.
         created_at (datetime): The timestamp when the quiz was created.
         updated_at (datetime): The timestamp when the quiz was last updated.
+        transcript_source (str): Where the transcript came from: captions, auto_captions or whisper.
         questions (list): The list of associated questions.
     """
     questions = QuestionSerializer(many=True)
@@ -92,7 +93,34 @@ class QuizSerializer(serializers.ModelSerializer):
             fields (list): The fields to be included in the serializer.
         """
         model = Quiz
-        fields = ['id', 'title', 'description', 'video_url', 'created_at', 'updated_at', 'questions']
+        fields = ['id', 'title', 'description', 'video_url', 'created_at', 'updated_at', 'transcript_source', 'questions']
+        read_only_fields = ['transcript_source']
+
+
+class QuizSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for lightweight quiz lists.
+    Includes the quiz details without the questions.
+
+    Fields:
+        id (int): The unique identifier of the quiz.
+        title (str): The title of the quiz.
+        description (str): The description of the quiz.
+        video_url (str): The URL of the video for the quiz.
+        created_at (datetime): The timestamp when the quiz was created.
+        updated_at (datetime): The timestamp when the quiz was last updated.
+    """
+    class Meta:
+        """
+        Meta class for QuizSummarySerializer.
+        Specifies the model and fields to be used.
+
+        Attributes:
+            model (Quiz): The quiz model.
+            fields (list): The fields to be included in the serializer.
+        """
+        model = Quiz
+        fields = ['id', 'title', 'description', 'video_url', 'created_at', 'updated_at']
 
 
 class UpdatedQuizSerializer(serializers.ModelSerializer):
@@ -116,3 +144,35 @@ class UpdatedQuizSerializer(serializers.ModelSerializer):
         """
         model = Quiz
         fields = ['title', 'description', 'video_url']
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for quiz generation jobs.
+    Reports the current stage of a background generation run.
+
+    Fields:
+        id (int): The unique identifier of the job.
+        quiz (int): The ID of the quiz being generated.
+        kind (str): Whether the job creates or updates the quiz.
+        status (str): queued, downloading, transcribing, generating, done or failed.
+        progress (int): The overall progress of the job in percent.
+        error (str): The error message if the job failed.
+        force_regenerate (bool): Whether cached generation results are bypassed.
+        created_at (datetime): The timestamp when the job was queued.
+        updated_at (datetime): The timestamp of the last stage transition.
+        started_at (datetime): The timestamp when a worker picked up the job.
+        finished_at (datetime): The timestamp when the job finished.
+    """
+    class Meta:
+        """
+        Meta class for QuizJobSerializer.
+        Specifies the model and fields to be used.
+
+        Attributes:
+            model (QuizJob): The quiz job model.
+            fields (list): The fields to be included in the serializer.
+        """
+        model = QuizJob
+        fields = ['id', 'quiz', 'kind', 'status', 'progress', 'error', 'force_regenerate', 'created_at', 'updated_at', 'started_at', 'finished_at']
+        read_only_fields = fields
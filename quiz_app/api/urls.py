@@ -1,9 +1,27 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import CreateQuizView, QuizListView, QuizReviewPutPatchDeleteView
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncCreateQuizView as CreateQuizView,
+        AsyncQuizListView as QuizListView,
+        AsyncQuizReviewPutPatchDeleteView as QuizReviewPutPatchDeleteView,
+        AsyncQuizJobDetailView as QuizJobDetailView,
+        AsyncQuizEventsView as QuizEventsView,
+    )
+else:
+    from .views import (
+        CreateQuizView,
+        QuizListView,
+        QuizReviewPutPatchDeleteView,
+        QuizJobDetailView,
+        QuizEventsView,
+    )
 
 urlpatterns = [
     path('createQuiz/', CreateQuizView.as_view(), name='create-quiz'),
     path('quizzes/', QuizListView.as_view(), name='quiz-list'),
     path('quizzes/<int:pk>/', QuizReviewPutPatchDeleteView.as_view(), name='quiz-review-put-patch-delete'),
+    path('quizzes/<int:pk>/events/', QuizEventsView.as_view(), name='quiz-events'),
+    path('jobs/<int:pk>/', QuizJobDetailView.as_view(), name='job-detail'),
 ]
@@ -1,12 +1,24 @@
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
 
+from .conditional import add_validators, make_etag, not_modified, payload_cache, quiz_etag, quiz_last_modified, with_versions
+from .idempotency import REPLAYED_HEADER, find_replayed_job, get_idempotency_key, remember_key, request_hash
+from .pagination import QuizCursorPagination
 from .permissions import IsUserQuizCreatorPermission
-from .serializers import CreateQuizSerializer, QuizSerializer, UpdatedQuizSerializer
-from quiz_app.tasks import generate_quiz, update_generated_quiz
-from quiz_app.models import Quiz
+from .serializers import (
+    CreateQuizSerializer,
+    QuizSerializer,
+    QuizSummarySerializer,
+    UpdatedQuizSerializer,
+    QuizJobSerializer,
+)
+from quiz_app.jobs import enqueue_job
+from quiz_app.models import Quiz, QuizJob
 
 
 class CreateQuizView(generics.CreateAPIView):
@@ -14,51 +26,153 @@ class CreateQuizView(generics.CreateAPIView):
     API view for creating a new quiz.
     Only authenticated users can access this endpoint.
     Uses the CreateQuizSerializer to validate and create a new quiz.
+    Requests with an Idempotency-Key header are only executed once per key and user;
+    retries return the job of the first request.
 
     Attributes:
         permission_classes (list): The permission classes to apply to this view.
     """
     permission_classes = [IsAuthenticated]
-    
+
+    def start_generation(self, request, enqueue=enqueue_job):
+        """
+        Validate the request, save the new quiz and queue its generation job.
+        If the Idempotency-Key of the request was used before, the earlier job is returned instead.
+
+        Args:
+            request (Request): The create request.
+            enqueue (callable): Stores and queues the job for a quiz, enqueue_job by default.
+
+        Returns:
+            tuple: The job and whether it was started by an earlier request.
+        """
+        serializer = CreateQuizSerializer(data=request.data, context={'user': request.user})
+        serializer.is_valid(raise_exception=True)
+        key = get_idempotency_key(request)
+        if key is None:
+            return enqueue(serializer.save(), QuizJob.Kind.CREATE), False
+
+        fingerprint = request_hash(serializer.validated_data)
+        job = find_replayed_job(request.user, key, fingerprint)
+        if job is not None:
+            return job, True
+        try:
+            with transaction.atomic():
+                job = enqueue(serializer.save(), QuizJob.Kind.CREATE)
+                remember_key(request.user, key, fingerprint, job)
+        except IntegrityError:
+            # A concurrent request with the same key won the race.
+            job = find_replayed_job(request.user, key, fingerprint)
+            if job is None:
+                raise
+            return job, True
+        return job, False
+
     def create(self, request, *args, **kwargs):
         """
         Handle POST requests for creating a new quiz.
 
         1. Validate the incoming data using the serializer.
-        2. If valid, save the new quiz, trigger quiz generation, and return the quiz data with HTTP 201 status.
+        2. If valid, save the new quiz, queue the quiz generation job, and return the job data with HTTP 202 status.
+           A retry with the same Idempotency-Key returns the existing job (marked with Idempotent-Replayed: true).
         3. If invalid, return the serializer errors with HTTP 400 status.
         """
-        serializer = CreateQuizSerializer(data=request.data, context={'user': request.user})
-        serializer.is_valid(raise_exception=True)
-        instance = serializer.save()
-        generate_quiz(instance.id)
-        instance.refresh_from_db()
-        output_serializer = QuizSerializer(instance)
-        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+        job, replayed = self.start_generation(request)
+        return job_accepted_response(job, replayed)
+
+
+def job_accepted_response(job: QuizJob, replayed: bool = False) -> Response:
+    """Return the job data with HTTP 202 status, marking responses of replayed requests."""
+    response = Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    if replayed:
+        response[REPLAYED_HEADER] = 'true'
+    return response
 
 
 class QuizListView(generics.ListAPIView):
     """
-    API view for listing all quizzes.
+    API view for listing quizzes.
     Only authenticated users can access this endpoint.
-    Uses the QuizSerializer to serialize the quiz data.
+    Lists the quizzes of the requesting user, or all quizzes if ?scope=all is given.
+    Uses the QuizSerializer to serialize the quiz data, or the QuizSummarySerializer
+    without questions if ?summary=true is given.
+    Results are cursor paginated, newest first.
+    Every page carries an ETag; a request with a matching If-None-Match gets 304 without serialization.
+    Serialized quizzes are reused from the payload cache.
 
     Attributes:
-        queryset (QuerySet): The queryset of quizzes to be listed.
         serializer_class (QuizSerializer): The serializer class to use for this view.
+        pagination_class (QuizCursorPagination): The pagination class to use for this view.
         permission_classes (list): The permission classes to apply to this view.
     """
-    queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
+    pagination_class = QuizCursorPagination
     permission_classes = [IsAuthenticated]
 
+    def is_summary(self) -> bool:
+        """Return True if the client asked for quizzes without questions."""
+        return self.request.query_params.get('summary', '').lower() in ('true', '1', 'yes', 'on')
+
+    def get_queryset(self):
+        """
+        Return the quizzes, annotated with the version of their questions unless in summary mode.
+        The per-user listing is served by the (quiz_creator, -created_at, -id) index.
+        """
+        queryset = Quiz.objects.all()
+        if self.request.query_params.get('scope') != 'all':
+            queryset = queryset.filter(quiz_creator=self.request.user)
+        if self.is_summary():
+            return queryset
+        return with_versions(queryset)
+
+    def item_versions(self, quizzes: list) -> dict:
+        """Return the version of every quiz on the page: its ETag, or its updated_at in summary mode."""
+        if self.is_summary():
+            return {quiz.pk: quiz.updated_at.isoformat() for quiz in quizzes}
+        return {quiz.pk: quiz_etag(quiz) for quiz in quizzes}
+
+    def serialize_page(self, quizzes: list, versions: dict) -> list:
+        """
+        Serialize the quizzes of a page. Full quizzes are taken from the payload cache where possible;
+        the questions of the others are prefetched in one query.
+        """
+        if self.is_summary():
+            return self.get_serializer(quizzes, many=True).data
+        payloads = payload_cache.get_many(versions)
+        missing = [quiz for quiz in quizzes if quiz.pk not in payloads]
+        if missing:
+            prefetch_related_objects(missing, 'questions')
+            serialized = dict(zip((quiz.pk for quiz in missing), self.get_serializer(missing, many=True).data))
+            payload_cache.set_many({pk: (versions[pk], data) for pk, data in serialized.items()})
+            payloads.update(serialized)
+        return [payloads[quiz.pk] for quiz in quizzes]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return one page of quizzes, or 304 if the client's copy of the page is current.
+        The ETag covers the version of every quiz on the page and the links to the neighbouring pages.
+        """
+        quizzes = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        versions = self.item_versions(quizzes)
+        etag = make_etag('quizzes', self.is_summary(), self.paginator.get_next_link(), self.paginator.get_previous_link(), *versions.values())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return add_validators(self.get_paginated_response(self.serialize_page(quizzes, versions)), etag)
+
+    def get_serializer_class(self):
+        """Return the summary serializer in summary mode."""
+        if self.is_summary():
+            return QuizSummarySerializer
+        return QuizSerializer
+
     def get(self, request, *args, **kwargs):
         """
-        Handle GET requests to list all quizzes.
+        Handle GET requests to list quizzes.
 
-        1. Retrieve all quizzes from the database.
-        2. Serialize the quiz data.
-        3. Return the serialized data with HTTP 200 status.
+        1. Retrieve one page of the user's quizzes (or all quizzes) from the database.
+        2. Return HTTP 304 if the page matches the If-None-Match header.
+        3. Serialize the quiz data and return the serialized page with HTTP 200 status.
         """
         return super().get(request, *args, **kwargs)
 
@@ -68,6 +182,8 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
     API view for retrieving, updating, or deleting a specific quiz.
     Only the quiz creator can update or delete the quiz.
     Uses the QuizSerializer to serialize the quiz data.
+    GET responses carry ETag and Last-Modified and are answered with 304 for conditional requests
+    that match; serialized quizzes are reused from the payload cache.
 
     Attributes:
         queryset (QuerySet): The queryset of quizzes to be accessed.
@@ -77,19 +193,50 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated, IsUserQuizCreatorPermission]
 
+    def force_regenerate(self) -> bool:
+        """Return True if the client asked to bypass cached generation results."""
+        return self.request.query_params.get('force', '').lower() in ('true', '1', 'yes', 'on')
+
+    def get_queryset(self):
+        """
+        Return the quizzes with their creator joined.
+        GET annotates the version of the questions for the validators; the questions themselves are
+        loaded by retrieve only when the quiz has to be serialized. PATCH prefetches them.
+        """
+        queryset = Quiz.objects.select_related('quiz_creator')
+        if self.request.method == 'GET':
+            return with_versions(queryset)
+        if self.request.method == 'PATCH':
+            return queryset.prefetch_related('questions')
+        return queryset
+
     def get_object(self):
         """
         Retrieve the quiz object based on the provided primary key (pk).
+        The quiz is loaded once per request and reused by the permission check and the handler.
         Raises NotFound if the quiz does not exist.
 
         Returns:
             Quiz: The quiz object if found.
         """
-        quiz_id = self.kwargs.get('pk')
-        try:
-            quiz = Quiz.objects.get(pk=quiz_id)
-        except Quiz.DoesNotExist:
-            raise NotFound('Quiz not found.')
+        if getattr(self, '_quiz', None) is None:
+            try:
+                self._quiz = self.get_queryset().get(pk=self.kwargs.get('pk'))
+            except Quiz.DoesNotExist:
+                raise NotFound('Quiz not found.')
+        return self._quiz
+
+    def save_update(self, request, partial: bool = False):
+        """
+        Validate the request data and save it to the quiz.
+
+        Returns:
+            Quiz: The updated quiz.
+        """
+        quiz = self.get_object()
+        serializer = UpdatedQuizSerializer(quiz, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
         return quiz
 
     def retrieve(self, request, *args, **kwargs):
@@ -97,10 +244,21 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
         Handle GET requests to retrieve a specific quiz.
 
         1. Retrieve the quiz object using the provided primary key (pk).
-        2. Serialize the quiz data.
-        3. Return the serialized data with HTTP 200 status.
+        2. Return HTTP 304 if it matches the If-None-Match or If-Modified-Since header.
+        3. Otherwise serialize the quiz data, or take it from the payload cache.
+        4. Return the serialized data with ETag and Last-Modified and HTTP 200 status.
         """
-        return super().retrieve(request, *args, **kwargs)
+        quiz = self.get_object()
+        etag, last_modified = quiz_etag(quiz), quiz_last_modified(quiz)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        data = payload_cache.get_many({quiz.pk: etag}).get(quiz.pk)
+        if data is None:
+            prefetch_related_objects([quiz], 'questions')
+            data = self.get_serializer(quiz).data
+            payload_cache.set_many({quiz.pk: (etag, data)})
+        return add_validators(Response(data), etag, last_modified)
 
     def update(self, request, *args, **kwargs):
         """
@@ -108,15 +266,12 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
         1. Retrieve the quiz object using the provided primary key (pk).
         2. Validate and update the quiz data.
-        3. Return the updated quiz data with HTTP 200 status.
+        3. Queue the quiz regeneration job and return the job data with HTTP 202 status.
+           Pass ?force=true to bypass cached generation results.
         """
-        quiz = self.get_object()
-        serializer = UpdatedQuizSerializer(quiz, data=request.data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-        update_generated_quiz(quiz.id)
-        output_serializer = self.get_serializer(quiz)
-        return Response(output_serializer.data, status=status.HTTP_200_OK)
+        quiz = self.save_update(request)
+        job = enqueue_job(quiz, QuizJob.Kind.UPDATE, force_regenerate=self.force_regenerate())
+        return Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
     def partial_update(self, request, *args, **kwargs):
         """
@@ -124,18 +279,14 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
         1. Retrieve the quiz object using the provided primary key (pk).
         2. Validate and partially update the quiz data.
-        3. If the video URL is changed, trigger quiz regeneration.
-        4. Return the updated quiz data with HTTP 200 status.
+        3. If a video URL is given, queue the quiz regeneration job and return the job data with HTTP 202 status.
+           Pass ?force=true to bypass cached generation results.
+        4. Otherwise return the updated quiz data with HTTP 200 status.
         """
-        quiz = self.get_object()
-        old_url = quiz.video_url
-        serializer = UpdatedQuizSerializer(quiz, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        quiz = self.save_update(request, partial=True)
         if "video_url" in request.data:
-            new_url = request.data["video_url"]
-            if new_url == old_url or new_url != old_url:
-                update_generated_quiz(quiz.id)
+            job = enqueue_job(quiz, QuizJob.Kind.UPDATE, force_regenerate=self.force_regenerate())
+            return Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
         output_serializer = self.get_serializer(quiz)
         return Response(output_serializer.data, status=status.HTTP_200_OK)
     
@@ -148,3 +299,60 @@ class QuizReviewPutPatchDeleteView(generics.RetrieveUpdateDestroyAPIView):
         3. Return a success message with HTTP 204 status.
         """
         return super().destroy(request, *args, **kwargs)
+
+
+class QuizJobDetailView(generics.RetrieveAPIView):
+    """
+    API view for polling the status of a quiz generation job.
+    Only the creator of the quiz can see its jobs.
+    Uses the QuizJobSerializer to serialize the job data.
+
+    Attributes:
+        serializer_class (QuizJobSerializer): The serializer class to use for this view.
+        permission_classes (list): The permission classes to apply to this view.
+    """
+    serializer_class = QuizJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Return the jobs of quizzes created by the requesting user."""
+        return QuizJob.objects.filter(quiz__quiz_creator=self.request.user)
+
+
+class QuizEventsView(generics.GenericAPIView):
+    """
+    API view returning the latest generation job of a quiz, for clients that poll its progress.
+    Only the creator of the quiz can follow its jobs.
+    Server-sent events are only streamed by AsyncQuizEventsView: a stream stays open for up to
+    QUIZ_EVENTS_TIMEOUT seconds, which would hold a WSGI worker thread for as long.
+    Requests for text/event-stream are answered with HTTP 406.
+
+    Attributes:
+        permission_classes (list): The permission classes to apply to this view.
+        renderer_classes (list): The renderer classes, without text/event-stream.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
+
+    def get_queryset(self):
+        """Return the jobs of quizzes created by the requesting user."""
+        return QuizJob.objects.filter(quiz__quiz_creator=self.request.user)
+
+    def get_job(self):
+        """
+        Return the latest job of the quiz.
+        Raises NotFound if the quiz does not exist, belongs to another user or has no job.
+        """
+        job = self.get_queryset().filter(quiz_id=self.kwargs.get('pk')).order_by('-created_at', '-id').first()
+        if job is None:
+            raise NotFound('No generation job found for this quiz.')
+        return job
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to follow the generation of a quiz.
+
+        1. Retrieve the latest job of the quiz.
+        2. Return the job data with HTTP 200 status.
+        """
+        return Response(QuizJobSerializer(self.get_job()).data, status=status.HTTP_200_OK)
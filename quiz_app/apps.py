@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class QuizAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_app'
+
+    def ready(self):
+        """
+        Connect the signal handlers that invalidate cached quiz payloads, resume jobs lost by a
+        previous process on the first request (in-process workers only) and load the configured
+        Whisper models once when the worker process starts.
+        """
+        from . import signals  # noqa: F401
+
+        if settings.QUIZ_JOBS_RUN_IN_PROCESS:
+            from django.core.signals import request_started
+            from quiz_app.jobs import resume_jobs_on_first_request
+            request_started.connect(resume_jobs_on_first_request)
+
+        if settings.WHISPER_WARMUP_MODELS:
+            from quiz_app.utils.whisper_registry import registry
+            registry.warm_up(settings.WHISPER_WARMUP_MODELS)
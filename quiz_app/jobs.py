@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import QuizJob
+from .tasks import agenerate_quiz, aupdate_generated_quiz, generate_quiz, update_generated_quiz
+from quiz_app.utils.genai_utils import QuizGenerationError
+from quiz_app.utils.progress import progress_reporter
+
+logger = logging.getLogger(__name__)
+
+TASKS = {
+    QuizJob.Kind.CREATE: generate_quiz,
+    QuizJob.Kind.UPDATE: update_generated_quiz,
+}
+
+ASYNC_TASKS = {
+    QuizJob.Kind.CREATE: agenerate_quiz,
+    QuizJob.Kind.UPDATE: aupdate_generated_quiz,
+}
+
+RUNNING_STATUSES = (QuizJob.Status.DOWNLOADING, QuizJob.Status.TRANSCRIBING, QuizJob.Status.GENERATING)
+
+# Keeps references to the running async jobs, the event loop only holds weak ones.
+_background_tasks = set()
+
+
+def enqueue_job(quiz, kind: str = QuizJob.Kind.CREATE, force_regenerate: bool = False) -> QuizJob:
+    """
+    Store a queued job for the given quiz and hand it to the in-process worker pool.
+    If in-process workers are disabled, the job waits for the run_quiz_workers command.
+
+    Args:
+        quiz (Quiz): The quiz to generate or regenerate.
+        kind (str): Either QuizJob.Kind.CREATE or QuizJob.Kind.UPDATE.
+        force_regenerate (bool): Bypass the generation result cache.
+
+    Returns:
+        QuizJob: The newly queued job.
+    """
+    job = QuizJob.objects.create(quiz=quiz, kind=kind, force_regenerate=force_regenerate)
+    if settings.QUIZ_JOBS_RUN_IN_PROCESS:
+        transaction.on_commit(lambda: get_worker_pool().submit(job.id))
+    return job
+
+
+async def aenqueue_job(quiz, kind: str = QuizJob.Kind.CREATE, force_regenerate: bool = False) -> QuizJob:
+    """
+    Async variant of enqueue_job for the async views.
+    The job runs as a task on the running event loop instead of occupying a worker thread,
+    so it must only be used under an ASGI server whose loop outlives the request.
+
+    Args:
+        quiz (Quiz): The quiz to generate or regenerate.
+        kind (str): Either QuizJob.Kind.CREATE or QuizJob.Kind.UPDATE.
+        force_regenerate (bool): Bypass the generation result cache.
+
+    Returns:
+        QuizJob: The newly queued job.
+    """
+    job = await QuizJob.objects.acreate(quiz=quiz, kind=kind, force_regenerate=force_regenerate)
+    schedule_async_job(job.id)
+    return job
+
+
+def schedule_async_job(job_id: int) -> None:
+    """Run a stored job as a task on the running event loop, unless in-process workers are disabled."""
+    if settings.QUIZ_JOBS_RUN_IN_PROCESS:
+        task = asyncio.create_task(arun_job(job_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+def claim_job(job_id: int) -> bool:
+    """Atomically move a queued job to its first stage. Returns False if another worker owns it."""
+    claimed = QuizJob.objects.filter(pk=job_id, status=QuizJob.Status.QUEUED).update(
+        status=QuizJob.Status.DOWNLOADING,
+        started_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    return claimed == 1
+
+
+def claim_next_job():
+    """Claim the oldest queued job, or return None if the queue is empty."""
+    for job_id in QuizJob.objects.filter(status=QuizJob.Status.QUEUED).order_by('created_at', 'id').values_list('id', flat=True)[:10]:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def set_job_status(job_id: int, status: str, **fields) -> None:
+    """Persist the new status of a job."""
+    QuizJob.objects.filter(pk=job_id).update(status=status, updated_at=timezone.now(), **fields)
+
+
+def job_error_message(error: Exception) -> str:
+    """
+    Return the message stored on a failed job. Jobs are visible through the API, so it never contains
+    the exception text, which may include yt-dlp, ffmpeg or Gemini internals and URLs.
+    """
+    if isinstance(error, QuizGenerationError):
+        return "No valid quiz could be generated from this video."
+    if isinstance(error, TimeoutError):
+        return "Generating the quiz took too long. Please try again later."
+    if type(error).__module__.startswith("yt_dlp"):
+        return "The video could not be downloaded."
+    return "The quiz could not be generated. Please try again later."
+
+
+def fail_job(job_id: int, error: Exception) -> None:
+    """Log the error of a job with its traceback and mark the job as failed with a short message."""
+    logger.error("Quiz job %s failed", job_id, exc_info=error)
+    set_job_status(job_id, QuizJob.Status.FAILED, error=job_error_message(error), finished_at=timezone.now())
+
+
+def recover_stale_jobs(stale_after: float | None = None) -> int:
+    """
+    Requeue jobs whose worker is gone, e.g. after a restart, a deploy or a crash of the process that
+    ran them. Live jobs refresh their row through JobHeartbeat, so a running job whose row was not
+    updated for QUIZ_JOB_STALE_AFTER seconds is lost; it is moved back to queued and claimed again.
+
+    Args:
+        stale_after (float): Seconds without an update after which a running job counts as lost.
+
+    Returns:
+        int: The number of requeued jobs.
+    """
+    stale_after = settings.QUIZ_JOB_STALE_AFTER if stale_after is None else stale_after
+    now = timezone.now()
+    requeued = QuizJob.objects.filter(
+        status__in=RUNNING_STATUSES, updated_at__lt=now - timedelta(seconds=stale_after),
+    ).update(status=QuizJob.Status.QUEUED, progress=0, started_at=None, updated_at=now)
+    if requeued:
+        logger.warning("Requeued %s stale quiz job(s)", requeued)
+    return requeued
+
+
+def resume_jobs() -> int:
+    """
+    Requeue stale jobs and submit every queued job to the in-process worker pool.
+    Queued jobs of a previous process are otherwise lost with its pool. A job that another live
+    process already queued is only run once, because claim_job lets a single worker win.
+
+    Returns:
+        int: The number of submitted jobs.
+    """
+    recover_stale_jobs()
+    job_ids = list(QuizJob.objects.filter(status=QuizJob.Status.QUEUED).order_by('created_at', 'id').values_list('id', flat=True))
+    for job_id in job_ids:
+        get_worker_pool().submit(job_id)
+    return len(job_ids)
+
+
+_resumed = False
+_resume_lock = threading.Lock()
+
+
+def resume_jobs_on_first_request(sender, **kwargs) -> None:
+    """request_started handler that resumes lost jobs once per process, when in-process workers are enabled."""
+    global _resumed
+    with _resume_lock:
+        if _resumed:
+            return
+        _resumed = True
+    request_started.disconnect(resume_jobs_on_first_request)
+    if settings.QUIZ_JOBS_RUN_IN_PROCESS:
+        resume_jobs()
+
+
+class JobHeartbeat:
+    """
+    Touches updated_at of a running job every third of QUIZ_JOB_STALE_AFTER,
+    so long stages without progress reports are not mistaken for lost jobs by recover_stale_jobs.
+    Used with `with` it beats from a background thread; with `async with` from an asyncio task,
+    so entering and leaving it never blocks the event loop.
+    """
+    def __init__(self, job_id: int, interval: float | None = None):
+        self.job_id = job_id
+        self.interval = settings.QUIZ_JOB_STALE_AFTER / 3 if interval is None else interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name=f'quiz-job-heartbeat-{self.job_id}', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._arun(), name=f'quiz-job-heartbeat-{self.job_id}')
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval):
+                self._beat()
+        finally:
+            connections.close_all()
+
+    async def _arun(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await sync_to_async(self._beat)()
+
+    def _beat(self) -> None:
+        QuizJob.objects.filter(pk=self.job_id, status__in=RUNNING_STATUSES).update(updated_at=timezone.now())
+
+
+class JobProgress:
+    """
+    Progress callback that stores the stage and percent of a job.
+    Only stage changes and whole percent steps are written, so fine-grained
+    reports (e.g. yt-dlp download hooks) cause at most about 100 updates per job.
+    """
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._last = None
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, percent: int) -> None:
+        with self._lock:
+            if self._last is not None and self._last[0] == stage and percent <= self._last[1]:
+                return
+            self._last = (stage, percent)
+        set_job_status(self.job_id, stage, progress=percent)
+
+
+def run_job(job_id: int, claimed: bool = False) -> None:
+    """
+    Execute a job and record its stage transitions.
+
+    Steps:
+    1. Claim the job unless the caller already did
+    2. Run the generation task while reporting stages to the job row
+    3. Mark the job as done, or log the error and mark the job as failed with a short message
+
+    Args:
+        job_id (int): The ID of the job to run.
+        claimed (bool): Whether the caller already claimed the job.
+    """
+    if not claimed and not claim_job(job_id):
+        return
+    job = QuizJob.objects.get(pk=job_id)
+    task = TASKS[job.kind]
+    try:
+        with JobHeartbeat(job_id), progress_reporter(JobProgress(job_id)):
+            task(job.quiz_id, use_cache=not job.force_regenerate)
+    except Exception as e:
+        fail_job(job_id, e)
+    else:
+        set_job_status(job_id, QuizJob.Status.DONE, progress=100, finished_at=timezone.now())
+
+
+async def arun_job(job_id: int, claimed: bool = False) -> None:
+    """
+    Async variant of run_job that awaits the async generation task.
+    Stages are reported from worker threads only (the transcription executor and sync_to_async),
+    so the status updates never run database queries on the event loop.
+
+    Args:
+        job_id (int): The ID of the job to run.
+        claimed (bool): Whether the caller already claimed the job.
+    """
+    if not claimed and not await sync_to_async(claim_job)(job_id):
+        return
+    job = await QuizJob.objects.aget(pk=job_id)
+    task = ASYNC_TASKS[job.kind]
+    try:
+        async with JobHeartbeat(job_id):
+            with progress_reporter(JobProgress(job_id)):
+                await task(job.quiz_id, use_cache=not job.force_regenerate)
+    except Exception as e:
+        await sync_to_async(fail_job)(job_id, e)
+    else:
+        await sync_to_async(set_job_status)(job_id, QuizJob.Status.DONE, progress=100, finished_at=timezone.now())
+
+
+class WorkerPool:
+    """
+    Pool of background threads that run quiz jobs.
+
+    Attributes:
+        max_workers (int): Number of jobs that run concurrently.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='quiz-job')
+
+    def submit(self, job_id: int, claimed: bool = False):
+        """Schedule a job to run on one of the worker threads."""
+        return self._executor.submit(self._run, job_id, claimed)
+
+    def _run(self, job_id: int, claimed: bool) -> None:
+        """Run a job and release the database connections of the worker thread."""
+        try:
+            run_job(job_id, claimed=claimed)
+        finally:
+            connections.close_all()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Return the worker pool of this process, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(settings.QUIZ_JOB_WORKERS)
+        return _pool
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quiz_app.jobs import WorkerPool, claim_next_job, recover_stale_jobs
+
+
+class Command(BaseCommand):
+    """
+    Run a standalone pool of quiz generation workers.
+    Polls the job table for queued jobs and runs them without an external broker.
+    At startup and every --recover-interval seconds, running jobs without progress for
+    QUIZ_JOB_STALE_AFTER seconds (their worker was lost) are requeued.
+    """
+    help = "Run background workers that process queued quiz generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.QUIZ_JOB_WORKERS)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--recover-interval', type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        poll_interval = options['poll_interval']
+        pool = WorkerPool(workers)
+        running = set()
+        next_recovery = 0.0
+        self.stdout.write(f"Processing quiz jobs with {workers} worker(s).")
+        try:
+            while True:
+                if time.monotonic() >= next_recovery:
+                    recover_stale_jobs()
+                    next_recovery = time.monotonic() + options['recover_interval']
+                running = {future for future in running if not future.done()}
+                job_id = claim_next_job() if len(running) < workers else None
+                if job_id is None:
+                    time.sleep(poll_interval)
+                    continue
+                running.add(pool.submit(job_id, claimed=True))
+        except KeyboardInterrupt:
+            self.stdout.write("Waiting for running jobs to finish...")
+        finally:
+            pool.shutdown(wait=True)
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quiz_app.utils.transcription_service import (
+    TranscriptionService,
+    cpu_threads_per_slot,
+    parse_address,
+    parse_devices,
+)
+
+
+class Command(BaseCommand):
+    """
+    Run the transcription service that owns the Whisper models.
+    Web and job workers send their transcription jobs to it when TRANSCRIPTION_SERVICE_ADDRESS is set.
+    """
+    help = "Run the local transcription service with per-device concurrency limits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--address', default=settings.TRANSCRIPTION_SERVICE_ADDRESS or '127.0.0.1:8765')
+        parser.add_argument('--devices', default=settings.TRANSCRIPTION_DEVICES,
+                            help='Devices and concurrent jobs per device, e.g. "cuda:0=1,cpu=2".')
+        parser.add_argument('--queue-size', type=int, default=settings.TRANSCRIPTION_QUEUE_SIZE)
+        parser.add_argument('--warm-up', default=','.join(settings.WHISPER_WARMUP_MODELS),
+                            help='Model sizes to load on every device before accepting jobs, e.g. "base".')
+
+    def handle(self, *args, **options):
+        import torch
+        from quiz_app.utils.whisper_registry import registry
+
+        devices = parse_devices(options['devices'])
+        torch.set_num_threads(cpu_threads_per_slot(devices))
+        for model_size in filter(None, options['warm_up'].split(',')):
+            for device in devices:
+                registry.warm_up([model_size.strip()], device)
+
+        service = TranscriptionService(parse_address(options['address']), devices, options['queue_size'])
+        self.stdout.write(f"Transcription service listening on {service.address} with devices {devices}.")
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            service.stop()
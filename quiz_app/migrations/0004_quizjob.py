@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0003_quiz_quiz_creator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('create', 'Create'), ('update', 'Update')], default='create', max_length=20)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('transcribing', 'Transcribing'), ('generating', 'Generating'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='quiz_app.quiz')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0004_quizjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=255)),
+                ('model_size', models.CharField(max_length=50)),
+                ('language', models.CharField(max_length=20)),
+                ('transcript', models.TextField()),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model_size', 'language'), name='unique_transcript_cache_key')],
+            },
+        ),
+    ]
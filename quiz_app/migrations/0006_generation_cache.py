@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_transcriptcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('quiz_data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='force_regenerate',
+            field=models.BooleanField(default=False),
+        ),
+    ]
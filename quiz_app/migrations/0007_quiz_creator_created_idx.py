@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0006_generation_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['quiz_creator', '-created_at', '-id'], name='quiz_creator_created_idx'),
+        ),
+    ]
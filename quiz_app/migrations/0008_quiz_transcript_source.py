@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0007_quiz_creator_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='transcript_source',
+            field=models.CharField(blank=True, choices=[('captions', 'Captions'), ('auto_captions', 'Automatic captions'), ('whisper', 'Whisper')], max_length=20, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0008_quiz_transcript_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
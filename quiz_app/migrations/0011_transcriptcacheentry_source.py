@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0010_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptcacheentry',
+            name='source',
+            field=models.CharField(default='whisper', max_length=20),
+        ),
+    ]
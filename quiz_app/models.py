@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 # Create your models here.
@@ -7,12 +8,24 @@ User = get_user_model()
 
 
 class Quiz(models.Model):
+
+    class TranscriptSource(models.TextChoices):
+        CAPTIONS = 'captions', 'Captions'
+        AUTO_CAPTIONS = 'auto_captions', 'Automatic captions'
+        WHISPER = 'whisper', 'Whisper'
+
     title = models.CharField(max_length=200, null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     video_url = models.URLField()
     quiz_creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quizes')
+    transcript_source = models.CharField(max_length=20, choices=TranscriptSource.choices, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz_creator', '-created_at', '-id'], name='quiz_creator_created_idx'),
+        ]
 
     def __str__(self):
         return f"Quiz {self.id}"
@@ -28,3 +41,96 @@ class Question(models.Model):
 
     def __str__(self):
         return self.question_title
+
+
+class QuizJob(models.Model):
+    """A background quiz generation run and its current stage."""
+
+    class Kind(models.TextChoices):
+        CREATE = 'create', 'Create'
+        UPDATE = 'update', 'Update'
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        DOWNLOADING = 'downloading', 'Downloading'
+        TRANSCRIBING = 'transcribing', 'Transcribing'
+        GENERATING = 'generating', 'Generating'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.CREATE)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    force_regenerate = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """An Idempotency-Key sent with a create request and the job the request started."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    job = models.ForeignKey(QuizJob, on_delete=models.CASCADE, related_name='idempotency_keys')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} (job {self.job_id})"
+
+
+class TranscriptCacheEntry(models.Model):
+    """A stored transcript of a video, reused instead of downloading and transcribing it again."""
+    video_id = models.CharField(max_length=255)
+    model_size = models.CharField(max_length=50)
+    language = models.CharField(max_length=20)
+    transcript = models.TextField()
+    source = models.CharField(max_length=20, default='whisper')
+    size_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'model_size', 'language'], name='unique_transcript_cache_key'),
+        ]
+
+    def __str__(self):
+        return f"Transcript {self.video_id} ({self.model_size}, {self.language})"
+
+
+class GenerationCacheEntry(models.Model):
+    """A stored GenAI quiz result, keyed by transcript hash, prompt version and model name."""
+    cache_key = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    quiz_data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Generation {self.cache_key[:12]} ({self.model_name}, v{self.prompt_version})"
+
+
+class PipelineLease(models.Model):
+    """
+    Marks a video whose pipeline is running, so jobs for the same video in other processes wait for it
+    and then reuse its cached transcript and quiz. A lease is replaced once it has expired.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    token = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Pipeline lease {self.key[:12]} (until {self.expires_at})"
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from quiz_app.api.conditional import payload_cache
+from quiz_app.models import Question, Quiz
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def invalidate_cached_quiz(sender, instance, **kwargs):
+    """
+    Drop the cached payload of a quiz when it is saved or deleted, e.g. after a PATCH.
+    Generated questions are saved with update and bulk_create, which send no signals;
+    save_questions drops the payload itself.
+    """
+    payload_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_quiz_of_question(sender, instance, **kwargs):
+    """
+    Drop the cached payload of the quiz of a saved question.
+    Deleted questions need no handler, which keeps their bulk deletes fast: the payload is stored with
+    the quiz ETag, which includes the question count, so it is never served after a delete.
+    """
+    payload_cache.invalidate(instance.quiz_id)
@@ -1,70 +1,272 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .api.conditional import payload_cache
 from .models import Quiz, Question
-from quiz_app.utils.whisper_utils import whisper_transcribe
-from quiz_app.utils.genai_utils import generate_questions
+from quiz_app.utils.whisper_utils import acquire_transcript, canonical_video_id
+from quiz_app.utils.genai_utils import agenerate_questions, generate_questions
+from quiz_app.utils.pipeline_lease import apipeline_lease, pipeline_lease
+from quiz_app.utils.progress import report_progress, report_stage, GENERATING
+from quiz_app.utils.single_flight import SingleFlight
+
+pipeline_flights = SingleFlight()
 
 
-def generate_quiz(quiz_id: int):
+def generate_quiz(quiz_id: int, use_cache: bool = True):
     """
     Generate a quiz based on the video URL associated with the given quiz ID.
 
     Steps:
     1. Load Quiz instance by ID
-    2. Transcribe video with Whisper
-    3. Generate questions using GenAI
-    4. Save Quiz and Questions to the database
+    2. Get the transcript from the video captions or Whisper
+    3. Generate questions using GenAI (steps 2 and 3 are shared with concurrent jobs for the same video)
+    4. Save the generated title, description and Questions in one transaction, replacing the questions
+       of an earlier run of a job that was recovered after it had already saved them
 
     Args:
         quiz_id (int): The ID of the quiz to generate.
+        use_cache (bool): Set to False to bypass the generation result cache.
 
     Returns:
         int: The ID of the generated quiz.
     """
     quiz = Quiz.objects.get(id=quiz_id)
-    transcript, transcript_file = whisper_transcribe(quiz.video_url)
-    quiz_data = generate_questions(transcript, transcript_file)
+    quiz_data, transcript_source = generate_for_video(quiz.video_url, use_cache=use_cache, quiz_id=quiz.id)
 
-    quiz.title = quiz_data["title"]
-    quiz.description = quiz_data["description"]
-    quiz.save()
-
-    for q in quiz_data["questions"]:
-        question = Question.objects.create(
-            quiz=quiz,
-            question_title=q['question_title'],
-            question_options=q['question_options'],
-            answer=q['answer']
-        )
-        quiz.questions.add(question)
+    save_questions(
+        quiz, quiz_data["questions"], replace=True,
+        title=quiz_data["title"], description=quiz_data["description"], transcript_source=transcript_source,
+    )
     return quiz.id
 
 
-def update_generated_quiz(quiz_id: int):
+def update_generated_quiz(quiz_id: int, use_cache: bool = True):
     """
     Update an existing quiz by regenerating its questions based on the current video URL.
 
     Steps:
     1. Load Quiz instance by ID
-    2. Transcribe video with Whisper
-    3. Generate questions using GenAI
-    4. Save updated Quiz and Questions to the database
+    2. Get the transcript from the video captions or Whisper
+    3. Generate questions using GenAI (steps 2 and 3 are shared with concurrent jobs for the same video)
+    4. Replace the Questions of the Quiz in one transaction
 
     Args:
         quiz_id (int): The ID of the quiz to update.
+        use_cache (bool): Set to False to bypass the generation result cache.
 
     Returns:
         int: The ID of the updated quiz.
     """
     quiz = Quiz.objects.get(id=quiz_id)
-    transcript, transcript_file = whisper_transcribe(quiz.video_url)
-    quiz_data = generate_questions(transcript, transcript_file)
+    quiz_data, transcript_source = generate_for_video(quiz.video_url, use_cache=use_cache, quiz_id=quiz.id)
+
+    save_questions(quiz, quiz_data["questions"], replace=True, transcript_source=transcript_source)
+    return quiz.id
+
+
+async def agenerate_quiz(quiz_id: int, use_cache: bool = True):
+    """
+    Async variant of generate_quiz for jobs running on the event loop of an ASGI server.
+    The blocking caption probe, download and Whisper run on the transcription executor,
+    Gemini is awaited through the async client.
+
+    Args:
+        quiz_id (int): The ID of the quiz to generate.
+        use_cache (bool): Set to False to bypass the generation result cache.
+
+    Returns:
+        int: The ID of the generated quiz.
+    """
+    quiz = await Quiz.objects.aget(id=quiz_id)
+    quiz_data, transcript_source = await agenerate_for_video(quiz.video_url, use_cache=use_cache, quiz_id=quiz.id)
+
+    await sync_to_async(save_questions)(
+        quiz, quiz_data["questions"], replace=True,
+        title=quiz_data["title"], description=quiz_data["description"], transcript_source=transcript_source,
+    )
+    return quiz.id
 
-    quiz.questions.all().delete()
 
-    for q in quiz_data["questions"]:
-        Question.objects.create(
+async def aupdate_generated_quiz(quiz_id: int, use_cache: bool = True):
+    """
+    Async variant of update_generated_quiz for jobs running on the event loop of an ASGI server.
+
+    Args:
+        quiz_id (int): The ID of the quiz to update.
+        use_cache (bool): Set to False to bypass the generation result cache.
+
+    Returns:
+        int: The ID of the updated quiz.
+    """
+    quiz = await Quiz.objects.aget(id=quiz_id)
+    quiz_data, transcript_source = await agenerate_for_video(quiz.video_url, use_cache=use_cache, quiz_id=quiz.id)
+
+    await sync_to_async(save_questions)(quiz, quiz_data["questions"], replace=True, transcript_source=transcript_source)
+    return quiz.id
+
+
+def pipeline_key(video_url: str, use_cache: bool) -> tuple:
+    """Return the key under which concurrent pipeline runs for the same video are coalesced."""
+    return canonical_video_id(video_url) or video_url, use_cache
+
+
+def run_pipeline(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """
+    Get the transcript of a video and generate the quiz data from it.
+
+    Returns:
+        tuple: The generated quiz data and the transcript source.
+    """
+    transcript, transcript_source = acquire_transcript(video_url)
+    report_stage(GENERATING)
+    quiz_data = generate_questions(transcript, use_cache=use_cache, quiz_id=quiz_id)
+    report_progress(GENERATING, 1.0)
+    return quiz_data, transcript_source
+
+
+async def arun_pipeline(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """Async variant of run_pipeline; captions, download and Whisper run on the transcription executor."""
+    transcript, transcript_source = await run_in_transcription_executor(acquire_transcript, video_url)
+    await sync_to_async(report_stage)(GENERATING)
+    quiz_data = await agenerate_questions(transcript, use_cache=use_cache, quiz_id=quiz_id)
+    await sync_to_async(report_progress)(GENERATING, 1.0)
+    return quiz_data, transcript_source
+
+
+def uses_lease(use_cache: bool) -> bool:
+    """
+    Return whether a pipeline run holds the database lease of its video.
+    A job waiting for the lease only saves work if the transcript and the quiz of the finished run are
+    found in the caches afterwards, so the lease is skipped if a cache is disabled or bypassed.
+    """
+    return bool(
+        settings.GENERATION_LEASE_TIMEOUT and use_cache
+        and settings.TRANSCRIPT_CACHE_ENABLED and settings.GENERATION_CACHE_ENABLED
+    )
+
+
+def run_leased_pipeline(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """Run the pipeline while holding the lease of the video, waiting for a run in another process first."""
+    if not uses_lease(use_cache):
+        return run_pipeline(video_url, use_cache, quiz_id)
+    with pipeline_lease(pipeline_key(video_url, use_cache)[0]):
+        return run_pipeline(video_url, use_cache, quiz_id)
+
+
+async def arun_leased_pipeline(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """Async variant of run_leased_pipeline."""
+    if not uses_lease(use_cache):
+        return await arun_pipeline(video_url, use_cache, quiz_id)
+    async with apipeline_lease(pipeline_key(video_url, use_cache)[0]):
+        return await arun_pipeline(video_url, use_cache, quiz_id)
+
+
+def generate_for_video(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """
+    Run the pipeline for a video, coalescing concurrent runs for the same video.
+    With GENERATION_COALESCING, jobs that ask for a video whose pipeline is already running in this
+    process wait for that run and reuse its result (and follow its progress) instead of downloading,
+    transcribing and calling Gemini again. Across processes, the run holds a lease in the database:
+    a job in another process waits until the lease is released (or expired after GENERATION_LEASE_TIMEOUT)
+    and then finds the transcript and the quiz in the caches. Each job still saves its own quiz and questions.
+
+    Args:
+        video_url (str): The URL of the video.
+        use_cache (bool): Set to False to bypass the generation result cache.
+        quiz_id (int): The ID of the quiz, used in the log output.
+
+    Returns:
+        tuple: The generated quiz data and the transcript source.
+    """
+    if not settings.GENERATION_COALESCING:
+        return run_pipeline(video_url, use_cache, quiz_id)
+    return pipeline_flights.do(pipeline_key(video_url, use_cache), run_leased_pipeline, video_url, use_cache, quiz_id)
+
+
+async def agenerate_for_video(video_url: str, use_cache: bool = True, quiz_id: int | None = None) -> tuple[dict, str]:
+    """Async variant of generate_for_video."""
+    if not settings.GENERATION_COALESCING:
+        return await arun_pipeline(video_url, use_cache, quiz_id)
+    return await pipeline_flights.ado(pipeline_key(video_url, use_cache), arun_leased_pipeline, video_url, use_cache, quiz_id)
+
+
+_transcription_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_transcription_executor() -> ThreadPoolExecutor:
+    """Return the executor for blocking transcription work of async jobs, creating it on first use."""
+    global _transcription_executor
+    with _executor_lock:
+        if _transcription_executor is None:
+            _transcription_executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_JOB_WORKERS,
+                thread_name_prefix='quiz-transcribe',
+            )
+        return _transcription_executor
+
+
+def _run_and_close_connections(func, *args):
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+async def run_in_transcription_executor(func, *args):
+    """
+    Run a blocking function on the transcription executor without blocking the event loop.
+    At most QUIZ_JOB_WORKERS transcriptions run at once. Context variables such as the progress
+    reporter are passed on to the executor thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_transcription_executor(), context.run, _run_and_close_connections, func, *args)
+
+
+def save_questions(quiz: Quiz, questions: list, replace: bool = False, **fields) -> bool:
+    """
+    Save the generated quiz fields and questions in a single transaction.
+    The quiz row was loaded before a generation that can take minutes, so it is not saved as a whole:
+    only the given fields and updated_at are written, and a title or description changed in the
+    meantime by a PATCH is kept. If the video URL of the quiz changed meanwhile, the questions belong
+    to the old video and nothing is saved; the job queued by that change generates the new ones.
+    The questions are inserted with one bulk INSERT, so the number of queries does not grow
+    with the number of questions. With replace, the old questions are deleted in the same
+    transaction, so readers never see a partially regenerated quiz. update and bulk_create send no
+    post_save signals, so the cached payload of the quiz is dropped once the transaction commits.
+
+    Args:
+        quiz (Quiz): The quiz the questions belong to, as loaded when the generation started.
+        questions (list): The generated questions.
+        replace (bool): Whether to delete the existing questions of the quiz.
+        **fields: The quiz fields owned by the job, e.g. title, description and transcript_source.
+
+    Returns:
+        bool: False if the quiz was deleted or its video URL changed, so nothing was saved.
+    """
+    new_questions = [
+        Question(
             quiz=quiz,
             question_title=q["question_title"],
             question_options=q["question_options"],
             answer=q["answer"],
         )
-    return quiz.id
+        for q in questions
+    ]
+    with transaction.atomic():
+        updated = Quiz.objects.filter(pk=quiz.pk, video_url=quiz.video_url).update(updated_at=timezone.now(), **fields)
+        if not updated:
+            return False
+        if replace:
+            Question.objects.filter(quiz=quiz).delete()
+        Question.objects.bulk_create(new_questions)
+        transaction.on_commit(lambda: payload_cache.invalidate(quiz.pk))
+    return True
@@ -54,3 +54,22 @@ def create_quiz(db):
         return Quiz.objects.create(**defaults)
 
     return _create
+
+
+@pytest.fixture(autouse=True)
+def clear_whisper_registry():
+    from quiz_app.utils.whisper_registry import registry
+
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_payload_cache():
+    from django.core.cache import caches
+    from django.conf import settings
+
+    caches[settings.QUIZ_PAYLOAD_CACHE_ALIAS].clear()
+    yield
+    caches[settings.QUIZ_PAYLOAD_CACHE_ALIAS].clear()
@@ -0,0 +1,153 @@
+import threading
+
+from asgiref.sync import async_to_sync, sync_to_async
+from rest_framework.test import force_authenticate
+
+from quiz_app import jobs, tasks
+from quiz_app.api.async_views import (
+    AsyncCreateQuizView,
+    AsyncQuizListView,
+    AsyncQuizReviewPutPatchDeleteView,
+)
+from quiz_app.api.views import QuizListView
+from quiz_app.jobs import ASYNC_TASKS, arun_job
+from quiz_app.models import Question, Quiz, QuizJob
+from quiz_app.utils.progress import report_stage
+
+
+def call(view, request, **kwargs):
+    return async_to_sync(view)(request, **kwargs)
+
+
+def test_async_create_queues_job_and_returns_202(api_rf, user, settings):
+    settings.QUIZ_JOBS_RUN_IN_PROCESS = False
+    request = api_rf.post('/api/createQuiz/', {'url': 'https://www.youtube.com/watch?v=abc'}, format='json')
+    force_authenticate(request, user=user)
+
+    response = call(AsyncCreateQuizView.as_view(), request)
+
+    assert response.status_code == 202
+    job = QuizJob.objects.get(pk=response.data['id'])
+    assert job.status == QuizJob.Status.QUEUED
+    assert job.quiz.quiz_creator == user
+
+
+def test_async_create_rejects_anonymous_and_invalid_requests(api_rf, user):
+    request = api_rf.post('/api/createQuiz/', {'url': 'https://example.com'}, format='json')
+    assert call(AsyncCreateQuizView.as_view(), request).status_code == 401
+
+    request = api_rf.post('/api/createQuiz/', {}, format='json')
+    force_authenticate(request, user=user)
+    assert call(AsyncCreateQuizView.as_view(), request).status_code == 400
+
+
+def test_async_list_matches_sync_list(api_rf, user, create_quiz):
+    quiz = create_quiz(user, title='Mine')
+    Question.objects.create(quiz=quiz, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a')
+
+    request = api_rf.get('/api/quizzes/')
+    force_authenticate(request, user=user)
+    async_response = call(AsyncQuizListView.as_view(), request)
+    request = api_rf.get('/api/quizzes/')
+    force_authenticate(request, user=user)
+    sync_response = QuizListView.as_view()(request)
+
+    assert async_response.status_code == 200
+    assert async_response.data == sync_response.data
+
+
+def test_async_detail_update_and_delete(api_rf, user, other_user, create_quiz, settings):
+    settings.QUIZ_JOBS_RUN_IN_PROCESS = False
+    quiz = create_quiz(user)
+    view = AsyncQuizReviewPutPatchDeleteView.as_view()
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/')
+    force_authenticate(request, user=user)
+    assert call(view, request, pk=quiz.id).data['id'] == quiz.id
+
+    request = api_rf.patch(f'/api/quizzes/{quiz.id}/', {'title': 'Renamed'}, format='json')
+    force_authenticate(request, user=other_user)
+    assert call(view, request, pk=quiz.id).status_code == 403
+
+    request = api_rf.patch(f'/api/quizzes/{quiz.id}/', {'title': 'Renamed'}, format='json')
+    force_authenticate(request, user=user)
+    response = call(view, request, pk=quiz.id)
+    assert response.status_code == 200
+    assert response.data['title'] == 'Renamed'
+
+    request = api_rf.put(f'/api/quizzes/{quiz.id}/?force=true', {'title': 'New', 'video_url': 'https://youtu.be/xyz'}, format='json')
+    force_authenticate(request, user=user)
+    response = call(view, request, pk=quiz.id)
+    assert response.status_code == 202
+    job = QuizJob.objects.get(pk=response.data['id'])
+    assert job.kind == QuizJob.Kind.UPDATE and job.force_regenerate
+
+    request = api_rf.delete(f'/api/quizzes/{quiz.id}/')
+    force_authenticate(request, user=user)
+    assert call(view, request, pk=quiz.id).status_code == 204
+    assert not Quiz.objects.filter(pk=quiz.id).exists()
+
+    request = api_rf.get('/api/quizzes/999999/')
+    force_authenticate(request, user=user)
+    assert call(view, request, pk=999999).status_code == 404
+
+
+def test_arun_job_records_stages_and_finishes(create_quiz, user, monkeypatch):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz)
+    seen = []
+
+    async def fake_generate(quiz_id, use_cache=True):
+        await sync_to_async(report_stage)('generating')
+        seen.append((await QuizJob.objects.aget(pk=job.id)).status)
+
+    monkeypatch.setitem(ASYNC_TASKS, QuizJob.Kind.CREATE, fake_generate)
+
+    async_to_sync(arun_job)(job.id)
+
+    job.refresh_from_db()
+    assert seen == ['generating']
+    assert job.status == QuizJob.Status.DONE
+
+
+def test_agenerate_quiz_transcribes_on_executor_and_awaits_gemini(create_quiz, user, monkeypatch):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz)
+    threads, stages = [], []
+
+    def fake_acquire(video_url):
+        threads.append(threading.current_thread().name)
+        report_stage('transcribing')
+        return 'transcript', 'whisper'
+
+    async def fake_agenerate(transcript, use_cache=True, quiz_id=None):
+        return {
+            'title': 'T',
+            'description': 'D',
+            'questions': [{'question_title': 'Q?', 'question_options': ['a', 'b', 'c', 'd'], 'answer': 'a'}],
+        }
+
+    monkeypatch.setattr(tasks, 'acquire_transcript', fake_acquire)
+    monkeypatch.setattr(tasks, 'agenerate_questions', fake_agenerate)
+    monkeypatch.setattr(jobs, 'set_job_status', lambda job_id, status, **fields: stages.append(status))
+
+    async_to_sync(arun_job)(job.id, claimed=True)
+
+    quiz.refresh_from_db()
+    assert threads[0].startswith('quiz-transcribe')
+    assert stages == ['transcribing', 'generating', 'generating', QuizJob.Status.DONE]
+    assert quiz.title == 'T' and quiz.transcript_source == 'whisper'
+    assert quiz.questions.count() == 1
+
+
+def test_async_create_replays_idempotent_requests(api_rf, user, settings):
+    settings.QUIZ_JOBS_RUN_IN_PROCESS = False
+    responses = []
+    for _ in range(2):
+        request = api_rf.post('/api/createQuiz/', {'url': 'https://youtu.be/abc'}, format='json', HTTP_IDEMPOTENCY_KEY='k')
+        force_authenticate(request, user=user)
+        responses.append(call(AsyncCreateQuizView.as_view(), request))
+
+    assert responses[0].data['id'] == responses[1].data['id']
+    assert responses[1]['Idempotent-Replayed'] == 'true'
+    assert QuizJob.objects.count() == 1
@@ -0,0 +1,139 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from quiz_app.utils import captions, whisper_utils
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'captions'
+
+
+def load_info(name):
+    return json.loads((FIXTURES / f'{name}.info.json').read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def recorded_youtube(monkeypatch):
+    """Replay recorded yt-dlp info dicts and caption files instead of hitting YouTube."""
+    payloads = {
+        'lec0000001': 'lecture_en-US.vtt',
+        'tut0000001': 'tutorial_en.json3',
+        'mus0000001': 'music_en.json3',
+    }
+    requested = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            assert opts.get('skip_download')
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=True):
+            assert download is False
+            return load_info(url)
+
+        def urlopen(self, url):
+            requested.append(url)
+            video_id = url.split('v=')[1].split('&')[0]
+            return io.BytesIO((FIXTURES / payloads[video_id]).read_bytes())
+
+    monkeypatch.setattr('quiz_app.utils.captions.yt_dlp.YoutubeDL', FakeYoutubeDL)
+    return requested
+
+
+def test_select_caption_track_prefers_manual_captions():
+    caption_format, source = captions.select_caption_track(load_info('lecture_manual'))
+
+    assert source == captions.MANUAL
+    assert caption_format['ext'] == 'vtt'
+
+
+def test_select_caption_track_uses_original_automatic_captions_only():
+    caption_format, source = captions.select_caption_track(load_info('tutorial_auto'))
+
+    assert source == captions.AUTOMATIC
+    assert caption_format['ext'] == 'json3'
+    assert 'tlang=' not in caption_format['url']
+    assert captions.select_caption_track(load_info('tutorial_auto'), language='fr') is None
+    assert captions.select_caption_track(load_info('no_captions')) is None
+
+
+def test_select_caption_track_respects_automatic_setting(monkeypatch):
+    monkeypatch.setattr(settings, 'CAPTIONS_ALLOW_AUTOMATIC', False)
+
+    assert captions.select_caption_track(load_info('tutorial_auto')) is None
+    assert captions.select_caption_track(load_info('lecture_manual'))[1] == captions.MANUAL
+
+
+def fetch_captions(video_url):
+    return captions.captions_from_info(captions.probe_video(video_url))
+
+
+def test_captions_from_info_parses_vtt_and_json3(recorded_youtube):
+    text, source = fetch_captions('lecture_manual')
+    assert source == captions.MANUAL
+    assert text.startswith('Welcome to the first lecture of cell biology. Today we talk about the cell')
+    assert '[Music]' not in text and '<i>' not in text and 'life & its parts' in text
+
+    text, source = fetch_captions('tutorial_auto')
+    assert source == captions.AUTOMATIC
+    assert text.startswith('in this tutorial we build a small django app from scratch')
+    assert text.endswith('thanks for watching')
+    assert '  ' not in text
+
+
+def test_captions_from_info_rejects_sparse_captions(recorded_youtube):
+    assert fetch_captions('music_auto') is None
+    assert fetch_captions('no_captions') is None
+    assert len(recorded_youtube) == 1
+
+
+def test_acquire_transcript_uses_captions_without_downloading(recorded_youtube, monkeypatch):
+    monkeypatch.setattr(whisper_utils, 'whisper_transcribe', lambda *args: pytest.fail('transcribed audio'))
+
+    transcript, source = whisper_utils.acquire_transcript('tutorial_auto')
+
+    assert source == 'auto_captions'
+    assert transcript.startswith('in this tutorial')
+
+
+def test_acquire_transcript_falls_back_to_whisper(recorded_youtube, monkeypatch):
+    monkeypatch.setattr(whisper_utils, 'whisper_transcribe', lambda url, model_size, language, info: 'whisper text')
+
+    assert whisper_utils.acquire_transcript('music_auto') == ('whisper text', 'whisper')
+
+    monkeypatch.setattr(settings, 'CAPTIONS_ENABLED', False)
+    monkeypatch.setattr(whisper_utils, 'probe_video', lambda *args: pytest.fail('probed captions'))
+    assert whisper_utils.acquire_transcript('tutorial_auto') == ('whisper text', 'whisper')
+
+
+def test_acquire_transcript_checks_the_cache_before_probing(db, recorded_youtube, monkeypatch):
+    monkeypatch.setattr(whisper_utils, 'canonical_video_id', lambda url: f'Youtube:{url}')
+    monkeypatch.setattr(whisper_utils, 'whisper_transcribe', lambda *args: pytest.fail('transcribed audio'))
+
+    first = whisper_utils.acquire_transcript('tutorial_auto')
+    monkeypatch.setattr(whisper_utils, 'probe_video', lambda *args: pytest.fail('probed captions'))
+    second = whisper_utils.acquire_transcript('tutorial_auto')
+
+    assert first == second
+    assert second[1] == 'auto_captions'
+    assert len(recorded_youtube) == 1
+
+
+def test_acquire_transcript_reuses_the_probe_for_whisper(recorded_youtube, monkeypatch):
+    received = []
+
+    def fake_whisper_transcribe(url, model_size, language, info):
+        received.append(info)
+        return 'whisper text'
+
+    monkeypatch.setattr(whisper_utils, 'whisper_transcribe', fake_whisper_transcribe)
+
+    assert whisper_utils.acquire_transcript('music_auto') == ('whisper text', 'whisper')
+    assert received == [load_info('music_auto')]
@@ -0,0 +1,40 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from quiz_app.utils.debug_capture import capture_artifact
+
+
+def test_capture_is_disabled_by_default(settings, tmp_path):
+    settings.DEBUG_CAPTURE_DIR = str(tmp_path / 'capture')
+
+    assert capture_artifact('prompt', 'text', quiz_id=1) is None
+    assert not os.path.exists(settings.DEBUG_CAPTURE_DIR)
+
+
+def test_capture_writes_unique_size_capped_files(settings, tmp_path):
+    settings.DEBUG_CAPTURE_ENABLED = True
+    settings.DEBUG_CAPTURE_DIR = str(tmp_path)
+    settings.DEBUG_CAPTURE_MAX_BYTES = 10
+    settings.DEBUG_CAPTURE_MAX_FILES = 100
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(lambda i: capture_artifact('prompt', f'prompt {i} ' * 10, quiz_id=3), range(20)))
+
+    assert len(set(paths)) == 20
+    assert all(os.path.basename(path).startswith('prompt_quiz3_') for path in paths)
+    assert all(os.path.getsize(path) == 10 for path in paths)
+
+
+def test_capture_keeps_only_the_newest_files(settings, tmp_path):
+    settings.DEBUG_CAPTURE_ENABLED = True
+    settings.DEBUG_CAPTURE_DIR = str(tmp_path)
+    settings.DEBUG_CAPTURE_MAX_FILES = 3
+
+    paths = []
+    for i in range(5):
+        paths.append(capture_artifact('transcript', f'transcript {i}'))
+        past = time.time() - 100 + i
+        os.utime(paths[-1], (past, past))
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths[2:])
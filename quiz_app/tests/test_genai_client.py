@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from google.genai import errors
+from tenacity import wait_none
+
+from quiz_app.utils import genai_client, genai_utils
+from quiz_app.utils.genai_client import GenAIClient, GenAIDeadlineExceeded
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(genai_client, 'wait_random_exponential', lambda **kwargs: wait_none())
+
+
+class FakeModels:
+    def __init__(self, outcomes, delay=0.0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _begin(self, kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            return self.outcomes.pop(0) if self.outcomes else 'ok'
+
+    def _end(self, outcome):
+        with self.lock:
+            self.active -= 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    def generate_content(self, **kwargs):
+        outcome = self._begin(kwargs)
+        time.sleep(self.delay)
+        return self._end(outcome)
+
+
+class FakeAsyncModels(FakeModels):
+    async def generate_content(self, **kwargs):
+        outcome = self._begin(kwargs)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def make_client(models=None, aio_models=None, **options):
+    fake = type('Client', (), {'models': models, 'aio': type('Aio', (), {'models': aio_models})()})()
+    defaults = {'max_concurrency': 2, 'timeout': 5, 'deadline': 10, 'max_attempts': 3}
+    defaults.update(options)
+    return GenAIClient(lambda: fake, **defaults)
+
+
+def server_error():
+    return errors.ServerError(503, {'error': {'message': 'overloaded', 'status': 'UNAVAILABLE'}})
+
+
+def test_generate_content_retries_transient_errors_with_per_attempt_timeout():
+    models = FakeModels([server_error(), TimeoutError(), 'response'])
+    client = make_client(models)
+
+    assert client.generate_content('prompt', config={'response_mime_type': 'application/json'}, model='m') == 'response'
+    assert len(models.calls) == 3
+    assert models.calls[0]['model'] == 'm'
+    assert models.calls[0]['config']['response_mime_type'] == 'application/json'
+    assert 0 < models.calls[0]['config']['http_options']['timeout'] <= 5000
+
+
+def test_generate_content_does_not_retry_client_errors():
+    models = FakeModels([errors.ClientError(400, {'error': {'message': 'bad request'}})])
+    client = make_client(models)
+
+    with pytest.raises(errors.ClientError):
+        client.generate_content('prompt')
+    assert len(models.calls) == 1
+
+
+def test_generate_content_gives_up_after_max_attempts():
+    models = FakeModels([server_error()] * 5)
+    client = make_client(models, max_attempts=2)
+
+    with pytest.raises(errors.ServerError):
+        client.generate_content('prompt')
+    assert len(models.calls) == 2
+
+
+def test_generate_content_limits_calls_in_flight():
+    models = FakeModels([], delay=0.05)
+    client = make_client(models, max_concurrency=2)
+
+    threads = [threading.Thread(target=client.generate_content, args=('prompt',)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(models.calls) == 6
+    assert models.max_active == 2
+
+
+def test_generate_content_stops_waiting_for_a_slot_at_the_deadline():
+    client = make_client(FakeModels([]), max_concurrency=1, deadline=0.1)
+    client._semaphore.acquire()
+
+    with pytest.raises(GenAIDeadlineExceeded):
+        client.generate_content('prompt')
+
+
+def test_agenerate_content_times_out_slow_attempts_and_limits_concurrency():
+    slow = FakeAsyncModels([], delay=1)
+    client = make_client(aio_models=slow, timeout=0.05, deadline=0.5, max_attempts=2)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.agenerate_content('prompt'))
+    assert len(slow.calls) == 2
+
+    fast = FakeAsyncModels([server_error()], delay=0.02)
+    client = make_client(aio_models=fast, max_concurrency=2)
+
+    async def run_all():
+        return await asyncio.gather(*(client.agenerate_content('prompt') for _ in range(5)))
+
+    assert asyncio.run(run_all()) == ['ok'] * 5
+    assert len(fast.calls) == 6
+    assert fast.max_active == 2
+
+
+def test_agenerate_content_stops_waiting_for_a_slot_at_the_deadline():
+    client = make_client(aio_models=FakeAsyncModels([]), max_concurrency=1, deadline=0.1)
+
+    async def wait_behind_a_held_slot():
+        await client._async_semaphore().acquire()
+        await client.agenerate_content('prompt')
+
+    with pytest.raises(GenAIDeadlineExceeded):
+        asyncio.run(wait_behind_a_held_slot())
+
+
+def test_agenerate_questions_uses_async_client(monkeypatch, settings):
+    settings.QUIZ_QUESTION_COUNT = 1
+    question = {'question_title': 'Q?', 'question_options': ['a', 'b', 'c', 'd'], 'answer': 'a'}
+    response = type('Response', (), {'text': '{"title": "T", "description": "D", "questions": [%s]}' % str(question).replace("'", '"')})()
+    aio_models = FakeAsyncModels([response])
+    monkeypatch.setattr(genai_utils, 'gemini', make_client(aio_models=aio_models))
+    monkeypatch.setattr(genai_utils, 'store_generation', lambda *args: None)
+    monkeypatch.setattr(genai_utils, 'count_tokens', lambda text: 0)
+
+    quiz = asyncio.run(genai_utils.agenerate_questions('a transcript', use_cache=False))
+
+    assert quiz == {'title': 'T', 'description': 'D', 'questions': [question]}
+    assert len(aio_models.calls) == 1
+
+
+def test_agenerate_questions_builds_the_prompt_off_the_event_loop(monkeypatch, settings):
+    settings.QUIZ_QUESTION_COUNT = 1
+    question = {'question_title': 'Q?', 'question_options': ['a', 'b', 'c', 'd'], 'answer': 'a'}
+    response = type('Response', (), {'text': json.dumps({'title': 'T', 'description': 'D', 'questions': [question]})})()
+    monkeypatch.setattr(genai_utils, 'gemini', make_client(aio_models=FakeAsyncModels([response])))
+    monkeypatch.setattr(genai_utils, 'store_generation', lambda *args: None)
+    threads = set()
+
+    def count_tokens(text):
+        threads.add(threading.get_ident())
+        return 0
+
+    monkeypatch.setattr(genai_utils, 'count_tokens', count_tokens)
+
+    async def generate():
+        loop_thread = threading.get_ident()
+        await genai_utils.agenerate_questions('a transcript', use_cache=False)
+        return loop_thread
+
+    loop_thread = asyncio.run(generate())
+    assert threads and loop_thread not in threads
@@ -2,14 +2,16 @@ import pytest
 from unittest.mock import Mock
 from rest_framework.test import force_authenticate
 
+from quiz_app.jobs import TASKS, run_job
+from quiz_app.models import QuizJob
 from quiz_app.api.views import CreateQuizView, QuizListView, QuizReviewPutPatchDeleteView
 
 
 def test_create_list_patch_delete_integration(api_rf, user, sample_quiz_data, monkeypatch):
     mock_generate = Mock()
     mock_update = Mock()
-    monkeypatch.setattr('quiz_app.api.views.generate_quiz', mock_generate)
-    monkeypatch.setattr('quiz_app.api.views.update_generated_quiz', mock_update)
+    monkeypatch.setitem(TASKS, QuizJob.Kind.CREATE, mock_generate)
+    monkeypatch.setitem(TASKS, QuizJob.Kind.UPDATE, mock_update)
 
     class FakeUpdatedSerializer:
         def __init__(self, instance=None, data=None, partial=False):
@@ -34,24 +36,27 @@ def test_create_list_patch_delete_integration(api_rf, user, sample_quiz_data, mo
     req = api_rf.post('/api/quizzes/', payload, format='json')
     force_authenticate(req, user=user)
     resp = CreateQuizView.as_view()(req)
-    assert resp.status_code == 201
-    quiz_id = resp.data.get('id')
+    assert resp.status_code == 202
+    quiz_id = resp.data.get('quiz')
     assert quiz_id is not None
-    mock_generate.assert_called_once()
+    run_job(resp.data['id'])
+    mock_generate.assert_called_once_with(quiz_id, use_cache=True)
+    assert QuizJob.objects.get(pk=resp.data['id']).status == QuizJob.Status.DONE
 
     req_list = api_rf.get('/api/quizzes/')
     force_authenticate(req_list, user=user)
     resp_list = QuizListView.as_view()(req_list)
     assert resp_list.status_code == 200
-    ids = {item.get('id') for item in resp_list.data}
+    ids = {item.get('id') for item in resp_list.data['results']}
     assert quiz_id in ids
 
     patch_payload = {'video_url': 'http://new-url/', 'url': 'http://new-url/'}
     req_patch = api_rf.patch(f'/api/quizzes/{quiz_id}/', patch_payload, format='json')
     force_authenticate(req_patch, user=user)
     resp_patch = QuizReviewPutPatchDeleteView.as_view()(req_patch, pk=quiz_id)
-    assert resp_patch.status_code == 200
-    mock_update.assert_called_with(quiz_id)
+    assert resp_patch.status_code == 202
+    run_job(resp_patch.data['id'])
+    mock_update.assert_called_with(quiz_id, use_cache=True)
 
     req_del = api_rf.delete(f'/api/quizzes/{quiz_id}/')
     force_authenticate(req_del, user=user)
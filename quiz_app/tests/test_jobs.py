@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from quiz_app import jobs
+from quiz_app.jobs import TASKS, claim_job, claim_next_job, recover_stale_jobs, resume_jobs, run_job
+from quiz_app.models import QuizJob
+from quiz_app.utils.progress import report_stage
+
+
+def test_run_job_records_stages_and_finishes(db, create_quiz, user, monkeypatch):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz)
+    seen = []
+
+    def fake_generate(quiz_id, use_cache=True):
+        for stage in ('transcribing', 'generating'):
+            report_stage(stage)
+            seen.append(QuizJob.objects.get(pk=job.id).status)
+        return quiz_id
+
+    monkeypatch.setitem(TASKS, QuizJob.Kind.CREATE, fake_generate)
+
+    run_job(job.id)
+
+    job.refresh_from_db()
+    assert seen == ['transcribing', 'generating']
+    assert job.status == QuizJob.Status.DONE
+    assert job.started_at is not None and job.finished_at is not None
+
+
+def test_run_job_marks_failure_with_error(db, create_quiz, user, monkeypatch, caplog):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz, kind=QuizJob.Kind.UPDATE)
+
+    def failing_update(quiz_id, use_cache=True):
+        raise RuntimeError('ffmpeg exited with 1 for https://rr1.googlevideo.com/videoplayback?sig=secret')
+
+    monkeypatch.setitem(TASKS, QuizJob.Kind.UPDATE, failing_update)
+
+    with caplog.at_level('ERROR', logger='quiz_app.jobs'):
+        run_job(job.id)
+
+    job.refresh_from_db()
+    assert job.status == QuizJob.Status.FAILED
+    assert job.error == 'The quiz could not be generated. Please try again later.'
+    assert 'googlevideo' in caplog.records[0].exc_text
+
+
+def test_jobs_are_claimed_only_once(db, create_quiz, user):
+    quiz = create_quiz(user)
+    first = QuizJob.objects.create(quiz=quiz)
+    second = QuizJob.objects.create(quiz=quiz)
+
+    assert claim_next_job() == first.id
+    assert claim_job(first.id) is False
+    assert claim_next_job() == second.id
+    assert claim_next_job() is None
+
+
+def test_recover_stale_jobs_requeues_lost_running_jobs(db, create_quiz, user, monkeypatch):
+    quiz = create_quiz(user)
+    lost = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.TRANSCRIBING, progress=40)
+    alive = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.GENERATING)
+    done = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.DONE)
+    long_ago = timezone.now() - timedelta(hours=1)
+    QuizJob.objects.filter(pk__in=[lost.id, done.id]).update(updated_at=long_ago)
+
+    assert recover_stale_jobs(stale_after=900) == 1
+
+    lost.refresh_from_db()
+    assert (lost.status, lost.progress, lost.started_at) == (QuizJob.Status.QUEUED, 0, None)
+    assert QuizJob.objects.get(pk=alive.id).status == QuizJob.Status.GENERATING
+    assert QuizJob.objects.get(pk=done.id).status == QuizJob.Status.DONE
+
+    submitted = []
+    monkeypatch.setattr(jobs, 'get_worker_pool', lambda: type('Pool', (), {'submit': lambda self, job_id: submitted.append(job_id)})())
+    queued = QuizJob.objects.create(quiz=quiz)
+
+    assert resume_jobs() == 2
+    assert submitted == [lost.id, queued.id]
+
+
+def test_job_heartbeat_keeps_running_jobs_fresh(db, create_quiz, user, monkeypatch):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.TRANSCRIBING)
+    QuizJob.objects.filter(pk=job.id).update(updated_at=timezone.now() - timedelta(hours=1))
+    monkeypatch.setattr(jobs.connections, 'close_all', lambda: None)
+    heartbeat = jobs.JobHeartbeat(job.id, interval=0)
+    stopped = iter([False, True])
+    monkeypatch.setattr(heartbeat._stop, 'wait', lambda timeout: next(stopped))
+
+    heartbeat._run()
+
+    assert recover_stale_jobs(stale_after=900) == 0
+    assert QuizJob.objects.get(pk=job.id).status == QuizJob.Status.TRANSCRIBING
+
+
+def test_async_job_heartbeat_beats_from_the_event_loop(db, create_quiz, user):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.TRANSCRIBING)
+    QuizJob.objects.filter(pk=job.id).update(updated_at=timezone.now() - timedelta(hours=1))
+    heartbeat = jobs.JobHeartbeat(job.id, interval=0)
+
+    async def run():
+        async with heartbeat:
+            await asyncio.sleep(0.05)
+        return heartbeat._task
+
+    task = async_to_sync(run)()
+
+    assert heartbeat._thread is None
+    assert task.done()
+    assert recover_stale_jobs(stale_after=900) == 0
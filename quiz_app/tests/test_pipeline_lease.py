@@ -0,0 +1,78 @@
+import types
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from quiz_app import tasks
+from quiz_app.models import PipelineLease
+from quiz_app.utils import pipeline_lease
+from quiz_app.utils.pipeline_lease import lease_key, release, try_acquire
+
+
+def hold_in_other_process(key, expires_in=60):
+    return PipelineLease.objects.create(key=lease_key(key), token='other', expires_at=timezone.now() + timedelta(seconds=expires_in))
+
+
+def test_lease_is_exclusive_until_released_or_expired(db):
+    key = lease_key('Youtube:abc')
+
+    assert try_acquire(key, 'first')
+    assert not try_acquire(key, 'second')
+    release(key, 'second')
+    assert not try_acquire(key, 'second')
+    release(key, 'first')
+    assert try_acquire(key, 'second')
+
+    PipelineLease.objects.filter(key=key).update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert try_acquire(key, 'third')
+    assert PipelineLease.objects.get(key=key).token == 'third'
+
+
+def test_generate_for_video_waits_for_a_run_in_another_process(db, monkeypatch):
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    lease = hold_in_other_process('Youtube:dQw4w9WgXcQ')
+    events = []
+
+    def other_process_finishes(seconds):
+        events.append('waited')
+        lease.delete()
+
+    def fake_pipeline(video_url, use_cache, quiz_id):
+        events.append('ran')
+        assert PipelineLease.objects.filter(key=lease_key('Youtube:dQw4w9WgXcQ')).exclude(token='other').exists()
+        return {'questions': []}, 'captions'
+
+    monkeypatch.setattr(pipeline_lease.time, 'sleep', other_process_finishes)
+    monkeypatch.setattr(tasks, 'run_pipeline', fake_pipeline)
+
+    assert tasks.generate_for_video(url) == ({'questions': []}, 'captions')
+    assert events == ['waited', 'ran']
+    assert not PipelineLease.objects.exists()
+
+
+def test_generate_for_video_skips_the_lease_when_bypassing_the_cache(db, monkeypatch):
+    hold_in_other_process('Youtube:dQw4w9WgXcQ')
+    monkeypatch.setattr(tasks, 'run_pipeline', lambda video_url, use_cache, quiz_id: ({'questions': []}, 'whisper'))
+
+    assert tasks.generate_for_video('https://youtu.be/dQw4w9WgXcQ', use_cache=False) == ({'questions': []}, 'whisper')
+
+
+def test_agenerate_for_video_waits_for_a_run_in_another_process(db, monkeypatch):
+    lease = hold_in_other_process('Youtube:dQw4w9WgXcQ')
+    events = []
+
+    async def other_process_finishes(seconds):
+        events.append('waited')
+        await lease.adelete()
+
+    async def fake_pipeline(video_url, use_cache, quiz_id):
+        events.append('ran')
+        return {'questions': []}, 'captions'
+
+    monkeypatch.setattr(pipeline_lease, 'asyncio', types.SimpleNamespace(sleep=other_process_finishes))
+    monkeypatch.setattr(tasks, 'arun_pipeline', fake_pipeline)
+
+    assert async_to_sync(tasks.agenerate_for_video)('https://youtu.be/dQw4w9WgXcQ') == ({'questions': []}, 'captions')
+    assert events == ['waited', 'ran']
+    assert not PipelineLease.objects.exists()
@@ -0,0 +1,145 @@
+import importlib
+import json
+import types
+
+from asgiref.sync import async_to_sync
+from rest_framework.test import force_authenticate
+
+from quiz_app.api import events
+from quiz_app.api.async_views import AsyncQuizEventsView
+from quiz_app.api.views import QuizEventsView
+from quiz_app.jobs import JobProgress
+from quiz_app.models import QuizJob
+from quiz_app.utils import transcription_backends
+from quiz_app.utils.progress import progress_reporter, report_progress, report_stage
+from quiz_app.utils.whisper_utils import report_download_progress
+
+
+def parse_events(chunks):
+    parsed = []
+    for chunk in chunks:
+        lines = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if ': ' in line and not line.startswith(':'))
+        if 'event' in lines:
+            parsed.append((lines['event'], json.loads(lines['data'])))
+    return parsed
+
+
+def test_progress_maps_stage_fractions_to_overall_percent():
+    reports = []
+    with progress_reporter(lambda stage, percent: reports.append((stage, percent))):
+        report_stage('downloading')
+        report_download_progress({'status': 'downloading', 'downloaded_bytes': 50, 'total_bytes': 100})
+        report_download_progress({'status': 'downloading', 'downloaded_bytes': 10})
+        report_download_progress({'status': 'finished', 'downloaded_bytes': 100, 'total_bytes': 100})
+        report_progress('transcribing', 2.0)
+        report_stage('generating')
+    report_stage('generating')
+
+    assert reports == [('downloading', 0), ('downloading', 10), ('transcribing', 70), ('generating', 70)]
+
+
+def test_job_progress_writes_only_stage_changes_and_percent_steps(create_quiz, user, monkeypatch):
+    job = QuizJob.objects.create(quiz=create_quiz(user))
+    writes = []
+    monkeypatch.setattr('quiz_app.jobs.set_job_status', lambda job_id, status, **fields: writes.append((status, fields['progress'])))
+
+    callback = JobProgress(job.id)
+    for stage, percent in [('downloading', 0), ('downloading', 0), ('downloading', 5), ('downloading', 3), ('transcribing', 20)]:
+        callback(stage, percent)
+
+    assert writes == [('downloading', 0), ('downloading', 5), ('transcribing', 20)]
+
+
+def test_whisper_progress_bar_reports_decoded_frames_only_inside_the_context():
+    module = importlib.import_module('whisper.transcribe')
+    original = module.tqdm
+    reports = []
+    with progress_reporter(lambda stage, percent: reports.append((stage, percent))):
+        with transcription_backends.whisper_progress():
+            with module.tqdm.tqdm(total=300, disable=True) as bar:
+                bar.update(150)
+                bar.update(150)
+        with module.tqdm.tqdm(total=300, disable=True) as bar:
+            bar.update(300)
+
+    assert reports == [('transcribing', 45), ('transcribing', 70)]
+    assert module.tqdm is original
+
+
+def test_events_stream_progress_until_the_job_is_done(api_rf, user, create_quiz, settings, monkeypatch):
+    settings.QUIZ_EVENTS_POLL_INTERVAL = 0
+    quiz = create_quiz(user)
+    QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.FAILED)
+    job = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.DOWNLOADING)
+    updates = iter([
+        {'status': QuizJob.Status.DOWNLOADING, 'progress': 10},
+        {'status': QuizJob.Status.DOWNLOADING, 'progress': 10},
+        {'status': QuizJob.Status.GENERATING, 'progress': 70},
+        {'status': QuizJob.Status.DONE, 'progress': 100},
+    ])
+
+    async def advance_job(seconds):
+        await QuizJob.objects.filter(pk=job.id).aupdate(**next(updates))
+
+    monkeypatch.setattr(events, 'asyncio', types.SimpleNamespace(sleep=advance_job))
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/events/', HTTP_ACCEPT='text/event-stream')
+    force_authenticate(request, user=user)
+    response = async_to_sync(AsyncQuizEventsView.as_view())(request, pk=quiz.id)
+
+    async def collect():
+        return [chunk.decode() async for chunk in response.streaming_content]
+
+    chunks = async_to_sync(collect)()
+
+    assert response['Content-Type'] == 'text/event-stream'
+    assert chunks[0].startswith('retry:')
+    assert [(event, data['status'], data['progress']) for event, data in parse_events(chunks)] == [
+        ('progress', 'downloading', 0),
+        ('progress', 'downloading', 10),
+        ('progress', 'generating', 70),
+        ('done', 'done', 100),
+    ]
+
+
+def test_sync_events_view_returns_the_job_for_polling_and_refuses_streams(api_rf, user, create_quiz):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.TRANSCRIBING, progress=40)
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/events/', HTTP_ACCEPT='application/json')
+    force_authenticate(request, user=user)
+    response = QuizEventsView.as_view()(request, pk=quiz.id)
+
+    assert response.status_code == 200
+    assert (response.data['id'], response.data['status'], response.data['progress']) == (job.id, 'transcribing', 40)
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/events/', HTTP_ACCEPT='text/event-stream')
+    force_authenticate(request, user=user)
+    assert QuizEventsView.as_view()(request, pk=quiz.id).status_code == 406
+
+
+def test_events_are_only_visible_to_the_quiz_creator(api_rf, user, other_user, create_quiz):
+    quiz = create_quiz(user)
+    QuizJob.objects.create(quiz=quiz)
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/events/')
+    force_authenticate(request, user=other_user)
+    response = QuizEventsView.as_view()(request, pk=quiz.id)
+
+    assert response.status_code == 404
+
+
+def test_async_events_stream_ends_with_failed_event(api_rf, user, create_quiz):
+    quiz = create_quiz(user)
+    QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.FAILED, error='download failed')
+
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/events/', HTTP_ACCEPT='text/event-stream')
+    force_authenticate(request, user=user)
+    response = async_to_sync(AsyncQuizEventsView.as_view())(request, pk=quiz.id)
+
+    async def collect():
+        return [chunk.decode() async for chunk in response.streaming_content]
+
+    assert parse_events(async_to_sync(collect)()) == [
+        ('failed', {'id': quiz.jobs.get().id, 'quiz': quiz.id, 'status': 'failed', 'progress': 0, 'error': 'download failed'}),
+    ]
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from django.conf import settings
+
+from quiz_app.utils import genai_utils
+from quiz_app.utils.quiz_schema import QuestionsResponse, QuizResponse, validate_questions, validate_quiz
+
+
+def make_question(i, **overrides):
+    question = {
+        'question_title': f'Question {i}?',
+        'question_options': [f'A{i}', f'B{i}', f'C{i}', f'D{i}'],
+        'answer': f'B{i}',
+    }
+    question.update(overrides)
+    return question
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Answer each Gemini request with the next queued JSON payload and record the requests."""
+    monkeypatch.setattr(genai_utils, 'count_tokens', lambda text: len(text.split()))
+    monkeypatch.setattr('quiz_app.utils.genai_utils.condense_transcript', lambda transcript: transcript)
+    replies, requests = [], []
+
+    class FakeModels:
+        def generate_content(self, model, contents, config=None):
+            requests.append({'prompt': contents, 'config': config})
+            return type('Response', (), {'text': json.dumps(replies.pop(0))})()
+
+    monkeypatch.setattr(genai_utils, 'client', type('Client', (), {'models': FakeModels()})())
+    return replies, requests
+
+
+def test_validate_questions_rejects_bad_options_and_answers():
+    questions = [
+        make_question(1),
+        make_question(2, question_options=['x', 'y', 'z']),
+        make_question(3, question_options=['x', 'X ', 'y', 'z'], answer='x'),
+        make_question(4, answer='not an option'),
+        make_question(5, answer=' c5 '),
+        make_question(1),
+        'not a question',
+    ]
+
+    valid, rejected = validate_questions(questions)
+
+    assert [q['question_title'] for q in valid] == ['Question 1?', 'Question 5?']
+    assert valid[1]['answer'] == 'C5'
+    reasons = [reason for _, reason in rejected]
+    assert 'expected 4 options' in reasons[0]
+    assert 'distinct' in reasons[1]
+    assert 'answer must be one of the options' in reasons[2]
+    assert reasons[3] == 'duplicate question'
+    assert len(rejected) == 5
+
+
+def test_validate_questions_rejects_texts_longer_than_the_model_columns():
+    long_text = 'x' * 201
+    questions = [
+        make_question(1, question_options=['A1', 'B1', 'C1', long_text], answer=long_text),
+        make_question(2, question_options=['A2', long_text, 'C2', 'D2']),
+        make_question(3, question_options=['A3', 'B3', 'C3', 'x' * 200], answer='x' * 200),
+    ]
+
+    valid, rejected = validate_questions(questions)
+
+    assert [q['question_title'] for q in valid] == ['Question 3?']
+    assert all('at most 200 characters' in reason for _, reason in rejected)
+    assert len(rejected) == 2
+
+
+def test_validate_quiz_keeps_valid_questions():
+    quiz, rejected = validate_quiz({'title': 'T', 'description': 'D', 'questions': [make_question(1), {}]})
+
+    assert quiz == {'title': 'T', 'description': 'D', 'questions': [make_question(1)]}
+    assert len(rejected) == 1
+
+
+def test_generate_questions_uses_response_schema(db, fake_gemini, monkeypatch):
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 3)
+    replies, requests = fake_gemini
+    replies.append({'title': 'T', 'description': 'D', 'questions': [make_question(i) for i in range(3)]})
+
+    quiz = genai_utils.generate_questions('transcript')
+
+    assert quiz['questions'] == [make_question(i) for i in range(3)]
+    assert requests[0]['config']['response_mime_type'] == 'application/json'
+    assert requests[0]['config']['response_schema'] is QuizResponse
+    assert 'Exactly 3 questions' in requests[0]['prompt']
+
+
+def test_generate_questions_repairs_only_invalid_questions(db, fake_gemini, monkeypatch):
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 4)
+    replies, requests = fake_gemini
+    replies.append({
+        'title': 'T',
+        'description': 'D',
+        'questions': [make_question(0), make_question(1, answer='wrong'), make_question(2)],
+    })
+    replies.append({'questions': [make_question(0), make_question(7), make_question(8)]})
+
+    quiz = genai_utils.generate_questions('transcript')
+
+    assert quiz['questions'] == [make_question(0), make_question(2), make_question(7), make_question(8)]
+    assert len(requests) == 2
+    assert requests[1]['config']['response_schema'] is QuestionsResponse
+    assert 'generate exactly 2 new quiz questions' in requests[1]['prompt']
+    assert '- Question 0?' in requests[1]['prompt']
+    assert 'the answer must be one of the options' in requests[1]['prompt']
+
+
+def test_generate_questions_fails_after_repair_attempts(db, fake_gemini, monkeypatch):
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 2)
+    monkeypatch.setattr(settings, 'GENERATION_REPAIR_ATTEMPTS', 1)
+    replies, requests = fake_gemini
+    replies.append({'title': 'T', 'description': 'D', 'questions': [make_question(0)]})
+    replies.append({'questions': [make_question(1, question_options=['a'])]})
+
+    with pytest.raises(genai_utils.QuizGenerationError):
+        genai_utils.generate_questions('transcript')
+    assert len(requests) == 2
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+import pytest
+
+from quiz_app import tasks
+from quiz_app.utils.progress import progress_reporter, report_stage
+from quiz_app.utils.single_flight import SingleFlight
+
+
+def wait_for(semaphore, count):
+    """Wait until semaphore was released count times."""
+    for _ in range(count):
+        assert semaphore.acquire(timeout=5)
+
+
+def test_concurrent_calls_share_one_execution_and_its_progress():
+    flights = SingleFlight()
+    release = threading.Event()
+    joined = threading.Semaphore(0)
+    calls, results, reports = [], {}, {}
+
+    def work(value):
+        calls.append(value)
+        report_stage('downloading')
+        release.wait(5)
+        report_stage('transcribing')
+        return f'result {value}'
+
+    def caller(name):
+        reports[name] = []
+
+        def reporter(stage, percent):
+            reports[name].append(stage)
+            if stage == 'downloading':
+                joined.release()
+
+        with progress_reporter(reporter):
+            results[name] = flights.do('video', work, name)
+
+    # The leader reports its first stage while running; followers receive it as soon as they joined the flight.
+    leader = threading.Thread(target=caller, args=('leader',))
+    leader.start()
+    wait_for(joined, 1)
+    followers = [threading.Thread(target=caller, args=(f'follower{i}',)) for i in range(3)]
+    for thread in followers:
+        thread.start()
+    wait_for(joined, 3)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == ['leader']
+    assert set(results.values()) == {'result leader'}
+    assert all(stages == ['downloading', 'transcribing'] for stages in reports.values())
+    assert not flights.in_flight('video')
+    assert flights.do('video', lambda value: value, 'again') == 'again'
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+    joined = threading.Semaphore(0)
+    errors = []
+
+    def fail():
+        report_stage('downloading')
+        release.wait(5)
+        raise RuntimeError('download failed')
+
+    def caller():
+        try:
+            with progress_reporter(lambda stage, percent: joined.release()):
+                flights.do('video', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=caller) for _ in range(2)]
+    threads[0].start()
+    wait_for(joined, 1)
+    threads[1].start()
+    wait_for(joined, 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ['download failed', 'download failed']
+
+
+def test_async_calls_for_the_same_key_are_coalesced():
+    flights = SingleFlight()
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def run_all():
+        same = await asyncio.gather(*(flights.ado('a', work, 1) for _ in range(5)))
+        other = await flights.ado('b', work, 2)
+        return same, other
+
+    assert asyncio.run(run_all()) == ([2] * 5, 4)
+    assert calls == [1, 2]
+
+
+@pytest.mark.parametrize('coalescing', [True, False])
+def test_generate_for_video_coalesces_url_variants_of_a_video(settings, monkeypatch, coalescing):
+    settings.GENERATION_COALESCING = coalescing
+    settings.GENERATION_LEASE_TIMEOUT = 0
+    release = threading.Event()
+    joined = threading.Semaphore(0)
+    transcribed = []
+
+    def fake_acquire(video_url):
+        transcribed.append(video_url)
+        report_stage('downloading')
+        release.wait(5)
+        return 'transcript', 'captions'
+
+    def generate(url):
+        with progress_reporter(lambda stage, percent: joined.release()):
+            results.append(tasks.generate_for_video(url))
+
+    monkeypatch.setattr(tasks, 'acquire_transcript', fake_acquire)
+    monkeypatch.setattr(tasks, 'generate_questions', lambda transcript, use_cache=True, quiz_id=None: {'questions': []})
+
+    urls = ['https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'https://youtu.be/dQw4w9WgXcQ', 'https://youtube.com/watch?v=dQw4w9WgXcQ&t=3']
+    results = []
+    threads = [threading.Thread(target=generate, args=(url,)) for url in urls]
+    # Each thread has either started its own pipeline or joined the running one once it received a report.
+    for thread in threads:
+        thread.start()
+        wait_for(joined, 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(transcribed) == (1 if coalescing else 3)
+    assert results == [({'questions': []}, 'captions')] * 3
@@ -1,14 +1,14 @@
 import pytest
 
-from quiz_app.tasks import generate_quiz, update_generated_quiz
+from quiz_app.api.conditional import payload_cache
+from quiz_app.tasks import generate_quiz, save_questions, update_generated_quiz
 
 
 def test_generate_quiz_creates_questions_and_sets_title_description(db, create_quiz, user, monkeypatch):
     quiz = create_quiz(user, title=None, video_url='http://video/')
 
     mock_transcript = 'transcribed text'
-    mock_transcript_file = 'transcript.srt'
-    monkeypatch.setattr('quiz_app.tasks.whisper_transcribe', lambda url: (mock_transcript, mock_transcript_file))
+    monkeypatch.setattr('quiz_app.tasks.acquire_transcript', lambda url: (mock_transcript, 'captions'))
 
     gen_output = {
         'title': 'Generated Quiz Title',
@@ -18,7 +18,7 @@ def test_generate_quiz_creates_questions_and_sets_title_description(db, create_q
             {'question_title': 'Q2', 'question_options': ['x', 'y', 'z'], 'answer': 'y'},
         ],
     }
-    monkeypatch.setattr('quiz_app.tasks.generate_questions', lambda transcript, tf: gen_output)
+    monkeypatch.setattr('quiz_app.tasks.generate_questions', lambda transcript, use_cache=True, quiz_id=None: gen_output)
 
     returned_id = generate_quiz(quiz.id)
 
@@ -28,6 +28,7 @@ def test_generate_quiz_creates_questions_and_sets_title_description(db, create_q
     assert returned_id == quiz.id
     assert quiz.title == gen_output['title']
     assert quiz.description == gen_output['description']
+    assert quiz.transcript_source == 'captions'
 
     questions = list(Question.objects.filter(quiz=quiz))
     assert len(questions) == 2
@@ -42,13 +43,13 @@ def test_update_generated_quiz_replaces_questions(db, create_quiz, user, monkeyp
     Question.objects.create(quiz=quiz, question_title='Old', question_options=['o'], answer='o')
     assert Question.objects.filter(quiz=quiz).count() == 1
 
-    monkeypatch.setattr('quiz_app.tasks.whisper_transcribe', lambda url: ('t', 'f'))
+    monkeypatch.setattr('quiz_app.tasks.acquire_transcript', lambda url: ('t', 'whisper'))
     new_output = {
         'questions': [
             {'question_title': 'New1', 'question_options': ['n1'], 'answer': 'n1'},
         ]
     }
-    monkeypatch.setattr('quiz_app.tasks.generate_questions', lambda transcript, tf: new_output)
+    monkeypatch.setattr('quiz_app.tasks.generate_questions', lambda transcript, use_cache=True, quiz_id=None: new_output)
 
     returned = update_generated_quiz(quiz.id)
     assert returned == quiz.id
@@ -56,3 +57,108 @@ def test_update_generated_quiz_replaces_questions(db, create_quiz, user, monkeyp
     qs = list(Question.objects.filter(quiz=quiz))
     assert len(qs) == 1
     assert qs[0].question_title == 'New1'
+    quiz.refresh_from_db()
+    assert quiz.transcript_source == 'whisper'
+
+
+def test_save_questions_uses_constant_number_of_queries(db, create_quiz, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from quiz_app.models import Question
+    from quiz_app.tasks import save_questions
+
+    def questions(count):
+        return [{'question_title': f'Q{i}', 'question_options': ['a', 'b'], 'answer': 'a'} for i in range(count)]
+
+    quiz = create_quiz(user)
+    with CaptureQueriesContext(connection) as few:
+        save_questions(quiz, questions(2), replace=True)
+    with CaptureQueriesContext(connection) as many:
+        save_questions(quiz, questions(10), replace=True)
+
+    assert len(few.captured_queries) == len(many.captured_queries)
+    assert Question.objects.filter(quiz=quiz).count() == 10
+
+
+def test_save_questions_keeps_old_questions_if_insert_fails(db, create_quiz, user, monkeypatch):
+    from quiz_app.models import Question
+    from quiz_app.tasks import save_questions
+
+    quiz = create_quiz(user)
+    Question.objects.create(quiz=quiz, question_title='Old', question_options=['o'], answer='o')
+
+    def failing_bulk_create(objs):
+        raise RuntimeError('insert failed')
+
+    monkeypatch.setattr(Question.objects, 'bulk_create', failing_bulk_create)
+    with pytest.raises(RuntimeError):
+        save_questions(quiz, [{'question_title': 'New', 'question_options': ['n'], 'answer': 'n'}], replace=True)
+
+    assert list(Question.objects.filter(quiz=quiz).values_list('question_title', flat=True)) == ['Old']
+
+
+def test_save_questions_keeps_fields_changed_during_generation(db, create_quiz, user):
+    from quiz_app.models import Question, Quiz
+    from quiz_app.tasks import save_questions
+
+    quiz = create_quiz(user, title='Before', video_url='http://video/')
+    Quiz.objects.filter(pk=quiz.pk).update(title='Edited by user', description='Edited')
+
+    saved = save_questions(
+        quiz, [{'question_title': 'Q1', 'question_options': ['a'], 'answer': 'a'}],
+        replace=True, transcript_source='captions',
+    )
+
+    quiz.refresh_from_db()
+    assert saved is True
+    assert (quiz.title, quiz.description, quiz.transcript_source) == ('Edited by user', 'Edited', 'captions')
+    assert Question.objects.filter(quiz=quiz).count() == 1
+
+
+def test_save_questions_drops_the_cached_payload_after_commit(db, create_quiz, user, django_capture_on_commit_callbacks):
+    quiz = create_quiz(user)
+    payload_cache.set_many({quiz.pk: ('etag', {'id': quiz.pk})})
+    assert payload_cache.get_many({quiz.pk: 'etag'}) == {quiz.pk: {'id': quiz.pk}}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        save_questions(quiz, [{'question_title': 'Q1', 'question_options': ['a'], 'answer': 'a'}], replace=True)
+
+    assert payload_cache.get_many({quiz.pk: 'etag'}) == {}
+
+
+def test_save_questions_skips_results_for_a_replaced_video(db, create_quiz, user):
+    from quiz_app.models import Question, Quiz
+    from quiz_app.tasks import save_questions
+
+    quiz = create_quiz(user, title='Before', video_url='http://video/old')
+    Question.objects.create(quiz=quiz, question_title='Old', question_options=['o'], answer='o')
+    Quiz.objects.filter(pk=quiz.pk).update(video_url='http://video/new')
+
+    saved = save_questions(
+        quiz, [{'question_title': 'Stale', 'question_options': ['s'], 'answer': 's'}],
+        replace=True, title='Stale title',
+    )
+
+    quiz.refresh_from_db()
+    assert saved is False
+    assert quiz.title == 'Before'
+    assert list(Question.objects.filter(quiz=quiz).values_list('question_title', flat=True)) == ['Old']
+
+
+def test_generate_quiz_rerun_after_recovery_does_not_duplicate_questions(db, create_quiz, user, monkeypatch):
+    from quiz_app.models import Question
+
+    quiz = create_quiz(user, title=None, video_url='http://video/')
+    monkeypatch.setattr('quiz_app.tasks.acquire_transcript', lambda url: ('t', 'captions'))
+    gen_output = {
+        'title': 'T',
+        'description': 'D',
+        'questions': [{'question_title': f'Q{i}', 'question_options': ['a', 'b'], 'answer': 'a'} for i in range(3)],
+    }
+    monkeypatch.setattr('quiz_app.tasks.generate_questions', lambda transcript, use_cache=True, quiz_id=None: gen_output)
+
+    # The worker died after the questions were committed; the recovered job runs again.
+    generate_quiz(quiz.id)
+    generate_quiz(quiz.id)
+
+    assert Question.objects.filter(quiz=quiz).count() == 3
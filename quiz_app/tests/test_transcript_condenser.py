@@ -0,0 +1,81 @@
+import logging
+
+import pytest
+from django.conf import settings
+
+from quiz_app.utils import genai_utils, transcript_condenser
+from quiz_app.utils.transcript_condenser import condense_transcript
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    """Count one token per word, so the tests do not depend on downloading a tiktoken encoding."""
+    monkeypatch.setattr(transcript_condenser, 'count_tokens', lambda text: len(text.split()))
+    monkeypatch.setattr(genai_utils, 'count_tokens', lambda text: len(text.split()))
+
+
+def test_condense_transcript_removes_fillers_and_repeated_segments():
+    transcript = (
+        'Um, so today we, uh, talk about the the cell membrane. '
+        'Subscribe to the channel. The membrane, you know, controls transport. '
+        'Subscribe to the channel! Mhm.'
+    )
+
+    assert condense_transcript(transcript, token_budget=0) == (
+        'so today we, talk about the cell membrane. Subscribe to the channel. The membrane, controls transport.'
+    )
+
+
+def test_condense_transcript_keeps_short_transcripts():
+    transcript = 'Photosynthesis turns light into chemical energy. Plants store it as sugar.'
+
+    assert condense_transcript(transcript, token_budget=100) == transcript
+
+
+def test_condense_transcript_samples_across_the_whole_timeline(monkeypatch):
+    monkeypatch.setattr(settings, 'PROMPT_EXTRACTIVE_SAMPLING', True)
+    monkeypatch.setattr(settings, 'PROMPT_SAMPLING_SEGMENTS', 4)
+    topics = ['mitochondria', 'ribosomes', 'chloroplasts', 'lysosomes']
+    sentences = [f'Part {i} is about {topics[i * 4 // 40]} and detail number {i}.' for i in range(40)]
+
+    condensed = condense_transcript(' '.join(sentences), token_budget=80)
+
+    assert len(condensed.split()) <= 80
+    assert all(topic in condensed for topic in topics)
+    positions = [condensed.index(f'Part {i} ') for i in range(40) if f'Part {i} ' in condensed]
+    assert positions == sorted(positions)
+
+
+def test_condense_transcript_truncates_without_sampling(monkeypatch):
+    monkeypatch.setattr(settings, 'PROMPT_EXTRACTIVE_SAMPLING', False)
+    sentences = [f'Sentence number {i} of the lecture.' for i in range(20)]
+
+    condensed = condense_transcript(' '.join(sentences), token_budget=30)
+
+    assert condensed == ' '.join(sentences[:4])
+
+
+def test_count_tokens_falls_back_to_character_estimate(monkeypatch):
+    monkeypatch.undo()
+    monkeypatch.setattr(transcript_condenser, 'get_encoding', lambda: None)
+
+    assert transcript_condenser.count_tokens('a' * 40) == 10
+
+
+def test_generate_questions_sends_condensed_transcript_and_logs_tokens(db, monkeypatch, caplog):
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 0)
+    prompts = []
+
+    class FakeModels:
+        def generate_content(self, model, contents, config=None):
+            prompts.append(contents)
+            return type('Response', (), {'text': '{"title": "T", "description": "D", "questions": []}'})()
+
+    monkeypatch.setattr(genai_utils, 'client', type('Client', (), {'models': FakeModels()})())
+
+    with caplog.at_level(logging.INFO, logger='quiz_app'):
+        genai_utils.generate_questions('Um, the cell is the unit of life.', quiz_id=7)
+
+    assert 'the cell is the unit of life.' in prompts[0]
+    assert 'Um,' not in prompts[0]
+    assert 'Quiz 7 prompt: 8 transcript tokens condensed to 7' in caplog.text
@@ -0,0 +1,55 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from quiz_app.utils import transcription_backends
+from quiz_app.utils.transcription_backends import get_backend
+
+
+def test_get_backend_uses_setting_and_rejects_unknown_names(settings):
+    settings.TRANSCRIPTION_BACKEND = 'whisper-int8'
+    assert isinstance(get_backend(), transcription_backends.WhisperInt8Backend)
+    assert isinstance(get_backend('faster-whisper'), transcription_backends.FasterWhisperBackend)
+
+    with pytest.raises(ImproperlyConfigured):
+        get_backend('does-not-exist')
+
+
+def test_whisper_int8_backend_quantizes_linear_layers(monkeypatch):
+    import torch
+
+    class TinyWhisper(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.proj = torch.nn.Linear(8, 8)
+
+        def transcribe(self, audio, **options):
+            return {'text': f'fp16={options["fp16"]}', 'segments': []}
+
+    monkeypatch.setattr(transcription_backends.whisper, 'load_model', lambda size, device: TinyWhisper())
+
+    model = get_backend('whisper-int8').load('base', 'cpu')
+
+    assert 'quantized' in type(model.model.proj).__module__
+    assert model.transcribe('audio.m4a') == {'text': 'fp16=False', 'segments': []}
+    with pytest.raises(ImproperlyConfigured):
+        get_backend('whisper-int8').load('base', 'cuda')
+
+
+def test_faster_whisper_results_match_whisper_format():
+    from types import SimpleNamespace
+
+    from quiz_app.utils.progress import progress_reporter
+
+    class FakeFasterWhisper:
+        def transcribe(self, audio, **options):
+            segments = (SimpleNamespace(start=i * 2.0, end=i * 2.0 + 2, text=f' part{i}') for i in range(2))
+            return segments, SimpleNamespace(language=options.get('language', 'en'), duration=4.0)
+
+    reports = []
+    with progress_reporter(lambda stage, percent: reports.append((stage, percent))):
+        result = transcription_backends._FasterWhisperModel(FakeFasterWhisper()).transcribe('audio', language='de')
+
+    assert result['text'] == ' part0 part1'
+    assert result['language'] == 'de'
+    assert [segment['start'] for segment in result['segments']] == [0.0, 2.0]
+    assert reports == [('transcribing', 45), ('transcribing', 70)]
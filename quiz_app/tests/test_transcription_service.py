@@ -0,0 +1,129 @@
+import socket
+import threading
+from multiprocessing.connection import Listener
+
+import pytest
+
+from quiz_app.utils.progress import TRANSCRIBING, progress_reporter, report_progress
+from quiz_app.utils.transcription_service import (
+    TranscriptionClient,
+    TranscriptionService,
+    TranscriptionServiceBusy,
+    TranscriptionServiceError,
+    parse_address,
+    parse_devices,
+)
+from quiz_app.utils.whisper_registry import WhisperModelRegistry
+
+AUTHKEY = b'test-key'
+
+
+class StubModel:
+    def __init__(self, device, release=None, started=None):
+        self.device = device
+        self.release = release
+        self.started = started
+
+    def transcribe(self, audio, **options):
+        if self.started is not None:
+            self.started.set()
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if audio == 'broken':
+            raise RuntimeError('cannot decode')
+        report_progress(TRANSCRIBING, 0.5)
+        return {'text': f'{audio} on {self.device} {options.get("language", "auto")}'}
+
+
+@pytest.fixture
+def start_service():
+    services = []
+
+    def _start(devices, queue_size=4, release=None, started=None):
+        registry = WhisperModelRegistry(loader=lambda size, device: StubModel(device, release, started))
+        service = TranscriptionService(
+            ('127.0.0.1', 0), devices, queue_size, registry=registry,
+            decode=lambda source, headers: source, authkey=AUTHKEY,
+        )
+        service.start()
+        services.append(service)
+        return service
+
+    yield _start
+    for service in services:
+        service.stop()
+
+
+def test_parse_address_and_devices():
+    assert parse_address('127.0.0.1:8765') == ('127.0.0.1', 8765)
+    assert parse_address('/tmp/transcribe.sock') == '/tmp/transcribe.sock'
+    assert parse_devices('cuda:0=1, cpu=2') == {'cuda:0': 1, 'cpu': 2}
+    assert parse_devices('cpu') == {'cpu': 1}
+
+
+def test_client_transcribes_through_service(start_service):
+    service = start_service({'cpu': 1})
+    client = TranscriptionClient(service.address, authkey=AUTHKEY, busy_timeout=0)
+
+    assert client.transcribe('audio.m4a', language='de') == 'audio.m4a on cpu de'
+    with pytest.raises(TranscriptionServiceError, match='cannot decode'):
+        client.transcribe('broken')
+
+
+def test_client_relays_progress_of_the_service(start_service):
+    service = start_service({'cpu': 1})
+    client = TranscriptionClient(service.address, authkey=AUTHKEY, busy_timeout=0)
+    reports = []
+
+    with progress_reporter(lambda stage, percent: reports.append((stage, percent))):
+        assert client.transcribe('audio.m4a') == 'audio.m4a on cpu auto'
+
+    assert reports == [('transcribing', 45)]
+
+
+def test_service_rejects_jobs_when_queue_is_full(start_service):
+    release = threading.Event()
+    started = threading.Event()
+    service = start_service({'cpu': 1}, queue_size=1, release=release, started=started)
+    client = TranscriptionClient(service.address, authkey=AUTHKEY, busy_timeout=0)
+
+    results = []
+    running = [threading.Thread(target=lambda i=i: results.append(client.transcribe(f'job{i}'))) for i in range(2)]
+    running[0].start()
+    assert started.wait(timeout=5)
+    running[1].start()
+    while not service._jobs.qsize():
+        pass
+
+    with pytest.raises(TranscriptionServiceBusy):
+        client.transcribe('job2')
+
+    release.set()
+    for thread in running:
+        thread.join(timeout=5)
+    assert sorted(results) == ['job0 on cpu auto', 'job1 on cpu auto']
+
+
+def test_service_keeps_accepting_after_broken_connections(start_service):
+    service = start_service({'cpu': 1})
+    with socket.create_connection(service.address):
+        pass
+    with pytest.raises(TranscriptionServiceError):
+        TranscriptionClient(service.address, authkey=b'wrong-key', busy_timeout=0).transcribe('audio.m4a')
+
+    client = TranscriptionClient(service.address, authkey=AUTHKEY, busy_timeout=0)
+    assert client.transcribe('audio.m4a') == 'audio.m4a on cpu auto'
+
+
+def test_client_gives_up_when_the_service_does_not_answer():
+    listener = Listener(('127.0.0.1', 0), authkey=AUTHKEY)
+    accepted = []
+    thread = threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True)
+    thread.start()
+    client = TranscriptionClient(listener.address, authkey=AUTHKEY, busy_timeout=0, timeout=0.1)
+
+    with pytest.raises(TranscriptionServiceError, match='did not answer'):
+        client.transcribe('audio.m4a')
+    thread.join(timeout=5)
+    accepted[0].close()
+    listener.close()
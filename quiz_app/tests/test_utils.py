@@ -1,10 +1,25 @@
-import os
+import io
 import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
+import numpy as np
 import pytest
 from django.conf import settings
+from django.utils import timezone
 
-from quiz_app.utils import whisper_utils, genai_utils
+from quiz_app.models import TranscriptCacheEntry
+from quiz_app.utils import chunked_transcription, genai_utils, transcript_cache, whisper_registry, whisper_utils
+from quiz_app.utils.chunked_transcription import SAMPLE_RATE, read_chunks, stitch_texts
+from quiz_app.utils.progress import progress_reporter
+from quiz_app.utils.transcription_backends import _QuantizedWhisperModel
+from quiz_app.utils.vad import detect_speech, transcribe_with_vad
+from quiz_app.utils.whisper_registry import WhisperModelRegistry, estimate_model_bytes
 
 
 def test_download_audio_uses_yt_dlp(monkeypatch, tmp_path):
@@ -21,31 +36,88 @@ def test_download_audio_uses_yt_dlp(monkeypatch, tmp_path):
         def extract_info(self, video_url, download=True):
             return {'id': 'abc123'}
 
+        def process_ie_result(self, info, download=True):
+            assert download is True
+            return info
+
     monkeypatch.setattr('quiz_app.utils.whisper_utils.yt_dlp.YoutubeDL', FakeYDL)
 
     out = whisper_utils.download_audio('http://example.com/watch?v=1', str(tmp_path))
     assert out.endswith(os.path.join(str(tmp_path), 'abc123.m4a'))
+    probed = whisper_utils.download_audio('http://example.com/watch?v=1', str(tmp_path), info={'id': 'probed'})
+    assert probed.endswith(os.path.join(str(tmp_path), 'probed.m4a'))
 
 
-def test_whisper_transcribe_writes_file_and_cleans_audio(monkeypatch, tmp_path):
+def test_whisper_transcribe_returns_text_and_cleans_audio(monkeypatch, tmp_path):
     audio_file = tmp_path / 'file.m4a'
     audio_file.write_text('audiobin', encoding='utf-8')
 
-    monkeypatch.setattr('quiz_app.utils.whisper_utils.download_audio', lambda url, out: str(audio_file))
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.download_audio', lambda url, out, info: str(audio_file))
+    monkeypatch.setattr(settings, 'AUDIO_STREAMING', False)
 
     class FakeModel:
         def transcribe(self, audio_path):
             return {'text': 'transcribed text'}
 
-    monkeypatch.setattr('quiz_app.utils.whisper_utils.whisper.load_model', lambda size: FakeModel())
+    monkeypatch.setattr('quiz_app.utils.transcription_backends.whisper.load_model', lambda size, device=None: FakeModel())
 
-    monkeypatch.setattr(settings, 'TMP_TRANSCRIPTS_DIR', str(tmp_path))
     monkeypatch.setattr(settings, 'TMP_AUDIO_DIR', str(tmp_path))
 
-    transcript, transcript_file = whisper_utils.whisper_transcribe('http://example.com')
+    transcript = whisper_utils.whisper_transcribe('http://example.com')
     assert transcript == 'transcribed text'
-    assert os.path.exists(transcript_file)
     assert not os.path.exists(str(audio_file))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_resolved_audio_stream_is_decoded_in_memory(monkeypatch):
+    class FakeYDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def extract_info(self, video_url, download=True):
+            assert download is False
+            return {'id': 'abc123', 'url': 'https://media/abc123', 'http_headers': {'User-Agent': 'UA'}}
+
+    commands = []
+
+    def fake_run(cmd, capture_output, check):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=np.array([0.5, -0.5], dtype=np.float32).tobytes())
+
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.yt_dlp.YoutubeDL', FakeYDL)
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.subprocess.run', fake_run)
+
+    audio = whisper_utils.decode_audio(*whisper_utils.resolve_audio_stream('http://example.com/watch?v=1'))
+
+    assert audio.dtype == np.float32
+    assert list(audio) == [0.5, -0.5]
+    cmd = commands[0]
+    assert cmd[cmd.index('-i') + 1] == 'https://media/abc123'
+    assert cmd[cmd.index('-ar') + 1] == '16000'
+    assert cmd[-1] == '-'
+
+
+def test_transcribe_audio_streams_without_temp_files(monkeypatch, tmp_path):
+    audio = np.zeros(16000, dtype=np.float32)
+    monkeypatch.setattr(settings, 'AUDIO_STREAMING', True)
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.resolve_audio_stream', lambda url, info: ('https://media/1', ''))
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.decode_audio', lambda source, headers: audio)
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.download_audio', lambda url, out, info: pytest.fail('downloaded'))
+
+    class FakeModel:
+        def transcribe(self, audio_input):
+            assert audio_input is audio
+            return {'text': 'streamed text'}
+
+    monkeypatch.setattr('quiz_app.utils.transcription_backends.whisper.load_model', lambda size, device=None: FakeModel())
+
+    assert whisper_utils.transcribe_audio('http://example.com') == 'streamed text'
 
 
 def test_parse_genai_json_handles_code_fence():
@@ -54,18 +126,16 @@ def test_parse_genai_json_handles_code_fence():
     assert result == {"a": 1, "b": 2}
 
 
-def test_generate_questions_calls_genai_and_cleans_files(monkeypatch, tmp_path):
-    transcript_file = tmp_path / 'transcript.txt'
-    transcript_file.write_text('some transcript')
-
-    monkeypatch.setattr(settings, 'TMP_PROMPT_DIR', str(tmp_path))
+def test_generate_questions_calls_genai_without_writing_files(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'DEBUG_CAPTURE_DIR', str(tmp_path / 'capture'))
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 0)
 
     class FakeResponse:
         def __init__(self, text):
             self.text = text
 
     class FakeModels:
-        def generate_content(self, model, contents):
+        def generate_content(self, model, contents, config=None):
             return FakeResponse('```json\n{"title": "T", "description": "D", "questions": []}\n```')
 
     class FakeClient:
@@ -74,10 +144,281 @@ def test_generate_questions_calls_genai_and_cleans_files(monkeypatch, tmp_path):
 
     monkeypatch.setattr('quiz_app.utils.genai_utils.client', FakeClient())
 
-    result = genai_utils.generate_questions('transcript text', str(transcript_file))
+    result = genai_utils.generate_questions('transcript text')
     assert result['title'] == 'T'
     assert result['description'] == 'D'
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_whisper_registry_loads_each_model_once():
+    loads = []
+    registry = WhisperModelRegistry(loader=lambda size, device: loads.append((size, device)) or object())
+
+    first = registry.get_model('base', 'cpu')
+    second = registry.get_model('base', 'cpu')
+    registry.get_model('small', 'cpu')
+
+    assert first is second
+    assert loads == [('base', 'cpu'), ('small', 'cpu')]
+    stats = registry.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['loaded_models'] == 2
+
+
+def test_whisper_registry_evicts_idle_models_over_budget(monkeypatch):
+    monkeypatch.setattr(whisper_registry, 'estimate_model_bytes', lambda model: 100)
+    registry = whisper_registry.WhisperModelRegistry(memory_budget_bytes=150, loader=lambda size, device: object())
+
+    with registry.acquire('base', 'cpu'):
+        registry.get_model('small', 'cpu')
+        assert registry.loaded() == [('base', 'cpu'), ('small', 'cpu')]
+
+    registry.get_model('tiny', 'cpu')
+    assert registry.loaded() == [('tiny', 'cpu')]
+    assert registry.stats()['evictions'] == 2
+
+
+def test_whisper_registry_evicts_models_after_the_idle_timeout():
+    registry = WhisperModelRegistry(idle_timeout=0.05, loader=lambda size, device: object())
+    registry.get_model('base', 'cpu')
+    assert registry.loaded() == [('base', 'cpu')]
+
+    sweep = registry._sweep_timer
+    sweep.join(timeout=5)
+
+    assert registry.loaded() == []
+    assert registry.stats()['evictions'] == 1
+    assert registry._sweep_timer is None
+
+
+def test_whisper_registry_serializes_transcriptions_on_a_shared_model():
+    class RecordingModel:
+        def __init__(self, barrier=None):
+            self.barrier = barrier
+            self.active = 0
+            self.max_active = 0
+
+        def transcribe(self, audio):
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            if self.barrier is not None:
+                self.barrier.wait(timeout=5)
+            else:
+                time.sleep(0.05)
+            self.active -= 1
+            return {'text': audio}
+
+    def run_two(registry):
+        results = []
+
+        def transcribe(audio):
+            with registry.acquire('base', 'cpu') as model:
+                results.append(model.transcribe(audio)['text'])
+
+        threads = [threading.Thread(target=transcribe, args=(audio,)) for audio in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(results)
+
+    model = RecordingModel()
+    registry = WhisperModelRegistry(loader=lambda size, device: model)
+    assert run_two(registry) == ['a', 'b']
+    assert registry.stats()['loads'] == 1
+    assert model.max_active == 1
+
+    # Thread-safe backends (faster-whisper) run both calls at once; the barrier only opens for two callers.
+    model = RecordingModel(barrier=threading.Barrier(2))
+    registry = WhisperModelRegistry(loader=lambda size, device: model, thread_safe=True)
+    assert run_two(registry) == ['a', 'b']
+    assert model.max_active == 2
+
+
+def test_estimate_model_bytes_counts_packed_int8_weights():
+    torch = pytest.importorskip('torch')
+
+    model = torch.nn.Sequential(torch.nn.Linear(100, 50), torch.nn.LayerNorm(50))
+    float_bytes = estimate_model_bytes(model)
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    int8_bytes = estimate_model_bytes(_QuantizedWhisperModel(quantized))
+
+    assert float_bytes == (100 * 50 + 50 + 2 * 50) * 4
+    # int8 weights, float32 bias and LayerNorm, and the scale and zero point of the layer
+    assert 100 * 50 + (50 + 2 * 50) * 4 <= int8_bytes < float_bytes
+
+
+def test_canonical_video_id_matches_url_variants():
+    long_url = whisper_utils.canonical_video_id('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10')
+    short_url = whisper_utils.canonical_video_id('https://youtu.be/dQw4w9WgXcQ')
+    assert long_url == short_url == 'Youtube:dQw4w9WgXcQ'
+    assert whisper_utils.canonical_video_id('http://example.com/video') is None
+
+
+def test_acquire_transcript_uses_transcript_cache(db, monkeypatch):
+    calls = []
+
+    def fake_transcribe_audio(url, model_size, language, info):
+        calls.append(url)
+        return 'cached text'
+
+    monkeypatch.setattr(settings, 'CAPTIONS_ENABLED', False)
+    monkeypatch.setattr('quiz_app.utils.whisper_utils.transcribe_audio', fake_transcribe_audio)
+
+    first = whisper_utils.acquire_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    second = whisper_utils.acquire_transcript('https://youtu.be/dQw4w9WgXcQ')
+    other_model = whisper_utils.acquire_transcript('https://youtu.be/dQw4w9WgXcQ', model_size='small')
+
+    assert first == second == other_model == ('cached text', 'whisper')
+    assert len(calls) == 2
+
+
+def test_transcript_cache_evicts_expired_and_least_recently_used(db, monkeypatch):
+    transcript_cache.store_transcript('Youtube:old', 'base', None, 'old')
+    TranscriptCacheEntry.objects.filter(video_id='Youtube:old').update(created_at=timezone.now() - timedelta(days=365))
+    assert transcript_cache.get_cached_transcript('Youtube:old', 'base') is None
+
+    monkeypatch.setattr(settings, 'TRANSCRIPT_CACHE_MAX_MB', 1)
+    big = 'x' * (600 * 1024)
+    transcript_cache.store_transcript('Youtube:a', 'base', None, big)
+    transcript_cache.store_transcript('Youtube:b', 'base', None, big)
+
+    assert transcript_cache.get_cached_transcript('Youtube:a', 'base') is None
+    assert transcript_cache.get_cached_transcript('Youtube:b', 'base') == big
+
+
+def test_generate_questions_reuses_cached_result_unless_bypassed(db, monkeypatch):
+    monkeypatch.setattr(settings, 'QUIZ_QUESTION_COUNT', 0)
+    calls = []
+
+    class FakeResponse:
+        text = '{"title": "T", "description": "D", "questions": []}'
+
+    class FakeModels:
+        def generate_content(self, model, contents, config=None):
+            calls.append(model)
+            return FakeResponse()
+
+    class FakeClient:
+        models = FakeModels()
+
+    monkeypatch.setattr('quiz_app.utils.genai_utils.client', FakeClient())
+
+    first = genai_utils.generate_questions('same transcript')
+    second = genai_utils.generate_questions('same transcript')
+    assert first == second == {'title': 'T', 'description': 'D', 'questions': []}
+    assert len(calls) == 1
+
+    genai_utils.generate_questions('same transcript', use_cache=False)
+    genai_utils.generate_questions('other transcript')
+    assert len(calls) == 3
+
+    monkeypatch.setattr(genai_utils, 'PROMPT_VERSION', genai_utils.PROMPT_VERSION + '-next')
+    genai_utils.generate_questions('same transcript')
+    assert len(calls) == 4
+
+    monkeypatch.setattr(settings, 'PROMPT_TRANSCRIPT_TOKEN_BUDGET', settings.PROMPT_TRANSCRIPT_TOKEN_BUDGET + 1)
+    genai_utils.generate_questions('same transcript')
+    assert len(calls) == 5
+
+    monkeypatch.setattr(genai_utils, 'SCHEMA_VERSION', genai_utils.SCHEMA_VERSION + '-next')
+    genai_utils.generate_questions('same transcript')
+    genai_utils.generate_questions('same transcript')
+    assert len(calls) == 6
+
+
+def test_read_chunks_yields_overlapping_windows():
+    samples = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    chunks = list(read_chunks(io.BytesIO(samples.tobytes()), 4, 1, split_on_silence=False))
+
+    assert [offset for offset, _ in chunks] == [0, 3, 6]
+    assert all(len(chunk) == 4 * SAMPLE_RATE for _, chunk in chunks[:2])
+    assert chunks[1][1][0] == 3 * SAMPLE_RATE
+    assert chunks[-1][1][-1] == samples[-1]
+
+
+def test_read_chunks_cuts_at_silence():
+    samples = np.ones(12 * SAMPLE_RATE, dtype=np.float32)
+    samples[int(8.5 * SAMPLE_RATE):int(8.7 * SAMPLE_RATE)] = 0
+    first_offset, first = next(read_chunks(io.BytesIO(samples.tobytes()), 9, 0))
+
+    assert first_offset == 0
+    assert 8.5 * SAMPLE_RATE <= len(first) <= 8.7 * SAMPLE_RATE
+
+
+def test_stitch_texts_removes_overlap_duplicates():
+    texts = [
+        'The mitochondria is the powerhouse of the ce',
+        'powerhouse of the cell. It produces energy',
+        'energy for the whole organism.',
+    ]
+    assert stitch_texts(texts) == 'The mitochondria is the powerhouse of the cell. It produces energy for the whole organism.'
+    assert stitch_texts(['no overlap here', 'completely different']) == 'no overlap here completely different'
+
+
+def test_transcribe_stream_runs_chunks_in_parallel_and_stitches(monkeypatch):
+    monkeypatch.setattr(settings, 'WHISPER_CHUNK_WORKERS', 2)
+    monkeypatch.setattr(settings, 'WHISPER_CHUNK_SECONDS', 4)
+    monkeypatch.setattr(settings, 'WHISPER_CHUNK_OVERLAP_SECONDS', 1)
+    monkeypatch.setattr(settings, 'WHISPER_CHUNK_SPLIT_ON_SILENCE', False)
+
+    def fake_transcribe_chunk(samples, model_size, language):
+        start = int(samples[0]) // chunked_transcription.SAMPLE_RATE
+        end = int(samples[-1]) // chunked_transcription.SAMPLE_RATE
+        return ' '.join(f'second{i}' for i in range(start, end + 1))
+
+    monkeypatch.setattr(chunked_transcription, '_transcribe_chunk', fake_transcribe_chunk)
+    samples = np.arange(10 * chunked_transcription.SAMPLE_RATE, dtype=np.float32)
+
+    reports = []
+    with ThreadPoolExecutor(max_workers=2) as executor, progress_reporter(lambda stage, percent: reports.append(percent)):
+        text = chunked_transcription.transcribe_stream(io.BytesIO(samples.tobytes()), executor=executor, duration=10)
+
+    assert text == ' '.join(f'second{i}' for i in range(10))
+    assert reports == sorted(reports)
+    assert reports[-1] == 70
+
+
+def test_detect_speech_finds_voiced_regions():
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 0.001, 10 * SAMPLE_RATE).astype(np.float32)
+    audio[2 * SAMPLE_RATE:4 * SAMPLE_RATE] += np.sin(np.arange(2 * SAMPLE_RATE) * 0.1).astype(np.float32) * 0.3
+    audio[7 * SAMPLE_RATE:8 * SAMPLE_RATE] += np.sin(np.arange(SAMPLE_RATE) * 0.1).astype(np.float32) * 0.3
+
+    regions = detect_speech(audio, threshold_db=12, min_silence_ms=500, padding_ms=0)
+
+    assert len(regions) == 2
+    assert abs(regions[0][0] - 2 * SAMPLE_RATE) < 0.05 * SAMPLE_RATE
+    assert abs(regions[1][1] - 8 * SAMPLE_RATE) < 0.05 * SAMPLE_RATE
+
+
+def test_transcribe_with_vad_skips_silence_and_remaps_timestamps(monkeypatch):
+    monkeypatch.setattr(settings, 'VAD_ENABLED', True)
+    monkeypatch.setattr(settings, 'VAD_PADDING_MS', 0)
+    audio = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+    audio[6 * SAMPLE_RATE:8 * SAMPLE_RATE] = 0.5
+
+    class FakeModel:
+        def transcribe(self, audio_input, **options):
+            self.seconds = len(audio_input) / SAMPLE_RATE
+            return {'text': 'speech', 'segments': [{'start': 0.5, 'end': 1.5}]}
+
+    model = FakeModel()
+    result = transcribe_with_vad(model, audio)
+
+    assert model.seconds == pytest.approx(2, abs=0.05)
+    assert result['segments'][0]['start'] == pytest.approx(6.5, abs=0.05)
+    assert result['segments'][0]['end'] == pytest.approx(7.5, abs=0.05)
+    assert transcribe_with_vad(model, np.zeros(SAMPLE_RATE, dtype=np.float32)) == {'text': '', 'segments': []}
+
 
-    assert not os.path.exists(str(transcript_file))
-    prompt_files = list(tmp_path.glob('prompt_*.txt'))
-    assert len(prompt_files) == 0
+def test_loading_urls_and_admin_does_not_import_ml_stacks():
+    code = (
+        "import django, sys; django.setup(); "
+        "from django.urls import get_resolver; get_resolver().url_patterns; import quiz_app.admin; "
+        "heavy = [name for name in ('torch', 'whisper', 'yt_dlp', 'google.genai') if name in sys.modules]; "
+        "print(','.join(heavy))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR)
+    assert result.stdout.strip() == ''
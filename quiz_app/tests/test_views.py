@@ -2,15 +2,16 @@ import pytest
 from unittest.mock import Mock
 from rest_framework.test import force_authenticate
 
-from quiz_app.models import Quiz
+from quiz_app.models import Question, Quiz, QuizJob
 from quiz_app.api.views import (
     CreateQuizView,
     QuizListView,
     QuizReviewPutPatchDeleteView,
+    QuizJobDetailView,
 )
 
 
-def test_create_quiz_calls_generate_and_returns_201(api_rf, user, sample_quiz_data, monkeypatch):
+def test_create_quiz_queues_job_and_returns_202(api_rf, user, sample_quiz_data, monkeypatch):
     class FakeCreateSerializer:
         def __init__(self, data=None, context=None):
             self.data = data or {}
@@ -34,18 +35,19 @@ def test_create_quiz_calls_generate_and_returns_201(api_rf, user, sample_quiz_da
 
             return Quiz.objects.create(**create_kwargs)
 
-    mock_generate = Mock()
     monkeypatch.setattr('quiz_app.api.views.CreateQuizSerializer', FakeCreateSerializer)
-    monkeypatch.setattr('quiz_app.api.views.generate_quiz', mock_generate)
 
     request = api_rf.post('/api/quizzes/', sample_quiz_data, format='json')
     force_authenticate(request, user=user)
     response = CreateQuizView.as_view()(request)
 
-    assert response.status_code == 201
+    assert response.status_code == 202
     assert Quiz.objects.filter(title=sample_quiz_data['title']).exists()
     created = Quiz.objects.get(title=sample_quiz_data['title'])
-    mock_generate.assert_called_once_with(created.id)
+    job = QuizJob.objects.get(quiz=created)
+    assert response.data['id'] == job.id
+    assert response.data['status'] == QuizJob.Status.QUEUED
+    assert job.kind == QuizJob.Kind.CREATE
 
 
 def test_list_quizzes_returns_200_and_includes_created(api_rf, user, create_quiz):
@@ -57,12 +59,91 @@ def test_list_quizzes_returns_200_and_includes_created(api_rf, user, create_quiz
     response = QuizListView.as_view()(request)
 
     assert response.status_code == 200
-    returned_titles = {item.get('title') for item in response.data}
+    returned_titles = {item.get('title') for item in response.data['results']}
     assert 'List Quiz 1' in returned_titles
     assert 'List Quiz 2' in returned_titles
 
 
-def test_retrieve_update_partial_delete_work_and_call_update_task(api_rf, user, create_quiz, monkeypatch):
+def test_list_quizzes_prefetches_questions_and_paginates(api_rf, user, create_quiz, django_assert_num_queries):
+    from quiz_app.models import Question
+
+    for i in range(5):
+        quiz = create_quiz(user, title=f'Quiz {i}')
+        for j in range(3):
+            Question.objects.create(quiz=quiz, question_title=f'Q{j}', question_options=['a'], answer='a')
+
+    request = api_rf.get('/api/quizzes/', {'page_size': 2})
+    force_authenticate(request, user=user)
+    with django_assert_num_queries(2):
+        response = QuizListView.as_view()(request)
+        response.render()
+
+    assert response.status_code == 200
+    assert [item['title'] for item in response.data['results']] == ['Quiz 4', 'Quiz 3']
+    assert all(len(item['questions']) == 3 for item in response.data['results'])
+    assert response.data['next'] is not None
+
+    request = api_rf.get(response.data['next'])
+    force_authenticate(request, user=user)
+    response = QuizListView.as_view()(request)
+    assert [item['title'] for item in response.data['results']] == ['Quiz 2', 'Quiz 1']
+
+
+def test_list_quizzes_defaults_to_own_quizzes(api_rf, user, other_user, create_quiz):
+    create_quiz(user, title='Mine')
+    create_quiz(other_user, title='Theirs')
+
+    request = api_rf.get('/api/quizzes/')
+    force_authenticate(request, user=user)
+    response = QuizListView.as_view()(request)
+    assert [item['title'] for item in response.data['results']] == ['Mine']
+
+    request = api_rf.get('/api/quizzes/', {'scope': 'all'})
+    force_authenticate(request, user=user)
+    response = QuizListView.as_view()(request)
+    assert {item['title'] for item in response.data['results']} == {'Mine', 'Theirs'}
+
+
+def test_own_quiz_list_uses_index_at_100k_quizzes(api_rf, user, other_user, django_assert_num_queries):
+    from datetime import timedelta
+    from django.utils import timezone
+
+    now = timezone.now()
+    quizzes = [
+        Quiz(title=f'Quiz {i}', video_url='http://example.com/video', quiz_creator=user if i % 10 == 0 else other_user)
+        for i in range(100_000)
+    ]
+    Quiz.objects.bulk_create(quizzes, batch_size=5000)
+    Quiz.objects.update(created_at=now - timedelta(days=1))
+
+    plan = Quiz.objects.filter(quiz_creator=user).order_by('-created_at', '-id')[:21].explain()
+    assert 'quiz_creator_created_idx' in plan
+
+    request = api_rf.get('/api/quizzes/', {'summary': 'true'})
+    force_authenticate(request, user=user)
+    with django_assert_num_queries(1):
+        response = QuizListView.as_view()(request)
+        response.render()
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == 20
+
+
+def test_list_quizzes_summary_mode_omits_questions(api_rf, user, create_quiz, django_assert_num_queries):
+    create_quiz(user, title='Summary Quiz')
+
+    request = api_rf.get('/api/quizzes/', {'summary': 'true'})
+    force_authenticate(request, user=user)
+    with django_assert_num_queries(1):
+        response = QuizListView.as_view()(request)
+        response.render()
+
+    assert response.status_code == 200
+    assert response.data['results'][0]['title'] == 'Summary Quiz'
+    assert 'questions' not in response.data['results'][0]
+
+
+def test_retrieve_update_partial_delete_work_and_queue_update_job(api_rf, user, create_quiz, monkeypatch):
     quiz = create_quiz(user, title='To Be Updated', video_url='http://old-url/')
 
     class FakeUpdatedSerializer:
@@ -80,9 +161,9 @@ def test_retrieve_update_partial_delete_work_and_call_update_task(api_rf, user,
             self.instance.save()
             return self.instance
 
-    mock_update_task = Mock()
+    mock_enqueue = Mock()
     monkeypatch.setattr('quiz_app.api.views.UpdatedQuizSerializer', FakeUpdatedSerializer)
-    monkeypatch.setattr('quiz_app.api.views.update_generated_quiz', mock_update_task)
+    monkeypatch.setattr('quiz_app.api.views.enqueue_job', mock_enqueue)
 
     req_get = api_rf.get(f'/api/quizzes/{quiz.id}/')
     force_authenticate(req_get, user=user)
@@ -92,19 +173,194 @@ def test_retrieve_update_partial_delete_work_and_call_update_task(api_rf, user,
     update_data = {'title': 'Updated Title'}
     req_put = api_rf.put(f'/api/quizzes/{quiz.id}/', update_data, format='json')
     force_authenticate(req_put, user=user)
+    mock_enqueue.return_value = QuizJob.objects.create(quiz=quiz, kind=QuizJob.Kind.UPDATE)
     resp_put = QuizReviewPutPatchDeleteView.as_view()(req_put, pk=quiz.id)
-    assert resp_put.status_code == 200
-    mock_update_task.assert_called_with(quiz.id)
+    assert resp_put.status_code == 202
+    mock_enqueue.assert_called_with(quiz, QuizJob.Kind.UPDATE, force_regenerate=False)
 
     patch_data = {'video_url': 'http://new-url/'}
-    req_patch = api_rf.patch(f'/api/quizzes/{quiz.id}/', patch_data, format='json')
+    req_patch = api_rf.patch(f'/api/quizzes/{quiz.id}/?force=true', patch_data, format='json')
     force_authenticate(req_patch, user=user)
     resp_patch = QuizReviewPutPatchDeleteView.as_view()(req_patch, pk=quiz.id)
-    assert resp_patch.status_code == 200
-    mock_update_task.assert_called_with(quiz.id)
+    assert resp_patch.status_code == 202
+    mock_enqueue.assert_called_with(quiz, QuizJob.Kind.UPDATE, force_regenerate=True)
+
+    req_patch_title = api_rf.patch(f'/api/quizzes/{quiz.id}/', {'title': 'Only Title'}, format='json')
+    force_authenticate(req_patch_title, user=user)
+    resp_patch_title = QuizReviewPutPatchDeleteView.as_view()(req_patch_title, pk=quiz.id)
+    assert resp_patch_title.status_code == 200
+    assert resp_patch_title.data['title'] == 'Only Title'
+    assert mock_enqueue.call_count == 2
 
     req_del = api_rf.delete(f'/api/quizzes/{quiz.id}/')
     force_authenticate(req_del, user=user)
     resp_del = QuizReviewPutPatchDeleteView.as_view()(req_del, pk=quiz.id)
     assert resp_del.status_code == 204
     assert not Quiz.objects.filter(pk=quiz.id).exists()
+
+
+def test_job_detail_is_only_visible_to_quiz_creator(api_rf, user, other_user, create_quiz):
+    quiz = create_quiz(user)
+    job = QuizJob.objects.create(quiz=quiz, status=QuizJob.Status.TRANSCRIBING)
+
+    request = api_rf.get(f'/api/jobs/{job.id}/')
+    force_authenticate(request, user=user)
+    response = QuizJobDetailView.as_view()(request, pk=job.id)
+    assert response.status_code == 200
+    assert response.data['status'] == 'transcribing'
+    assert response.data['quiz'] == quiz.id
+
+    request = api_rf.get(f'/api/jobs/{job.id}/')
+    force_authenticate(request, user=other_user)
+    response = QuizJobDetailView.as_view()(request, pk=job.id)
+    assert response.status_code == 404
+
+
+def test_create_quiz_with_idempotency_key_returns_existing_job(api_rf, user, other_user, settings):
+    settings.QUIZ_JOBS_RUN_IN_PROCESS = False
+    view = CreateQuizView.as_view()
+
+    def post(data, creator, key='retry-1'):
+        request = api_rf.post('/api/createQuiz/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(request, user=creator)
+        return view(request)
+
+    first = post({'url': 'https://youtu.be/abc'}, user)
+    retry = post({'url': 'https://youtu.be/abc'}, user)
+    other = post({'url': 'https://youtu.be/abc'}, other_user)
+    reused = post({'url': 'https://youtu.be/other'}, user)
+    invalid = post({'url': 'https://youtu.be/abc'}, user, key='x' * 256)
+
+    assert first.status_code == retry.status_code == 202
+    assert retry.data['id'] == first.data['id']
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert not first.has_header('Idempotent-Replayed')
+    assert other.data['id'] != first.data['id']
+    assert reused.status_code == 422
+    assert invalid.status_code == 400
+    assert Quiz.objects.filter(quiz_creator=user).count() == 1
+
+
+@pytest.mark.parametrize('method, data, status_code, queries', [
+    ('get', None, 200, 2),
+    ('patch', {'title': 'Renamed'}, 200, 3),
+    ('put', {'title': 'New', 'video_url': 'https://youtu.be/new'}, 202, 3),
+    ('delete', None, 204, 4),
+])
+def test_quiz_detail_loads_the_quiz_once(api_rf, user, create_quiz, settings, django_assert_num_queries, method, data, status_code, queries):
+    settings.QUIZ_JOBS_RUN_IN_PROCESS = False
+    quiz = create_quiz(user)
+    Question.objects.create(quiz=quiz, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a')
+    request = getattr(api_rf, method)(f'/api/quizzes/{quiz.id}/', data, format='json')
+    force_authenticate(request, user=user)
+
+    with django_assert_num_queries(queries) as captured:
+        response = QuizReviewPutPatchDeleteView.as_view()(request, pk=quiz.id)
+
+    assert response.status_code == status_code
+    quiz_selects = [q for q in captured.captured_queries if q['sql'].startswith('SELECT') and 'FROM "quiz_app_quiz"' in q['sql']]
+    assert len(quiz_selects) == 1
+
+
+def get_detail(api_rf, user, quiz, **headers):
+    request = api_rf.get(f'/api/quizzes/{quiz.id}/', **headers)
+    force_authenticate(request, user=user)
+    return QuizReviewPutPatchDeleteView.as_view()(request, pk=quiz.id)
+
+
+def test_quiz_detail_answers_conditional_requests_with_304(api_rf, user, create_quiz, django_assert_num_queries):
+    from datetime import timedelta
+    from django.utils import timezone
+
+    quiz = create_quiz(user)
+    question = Question.objects.create(quiz=quiz, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a')
+    earlier = timezone.now() - timedelta(minutes=1)
+    Quiz.objects.filter(pk=quiz.pk).update(updated_at=earlier)
+    Question.objects.filter(pk=question.pk).update(updated_at=earlier)
+
+    response = get_detail(api_rf, user, quiz)
+    etag, last_modified = response['ETag'], response['Last-Modified']
+    assert response.status_code == 200
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert 'no-cache' in response['Cache-Control'] and 'private' in response['Cache-Control']
+
+    with django_assert_num_queries(1):
+        response = get_detail(api_rf, user, quiz, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert get_detail(api_rf, user, quiz, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    question.delete()
+    response = get_detail(api_rf, user, quiz, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.data['questions'] == []
+
+
+def test_quiz_detail_compares_last_modified_in_whole_seconds(api_rf, user, create_quiz, monkeypatch):
+    from datetime import datetime, timedelta, timezone as dt_timezone
+    from django.utils import timezone
+    from django.utils.http import http_date
+
+    quiz = create_quiz(user)
+    changed = datetime(2026, 1, 5, 12, 0, 0, 700000, tzinfo=dt_timezone.utc)
+    Quiz.objects.filter(pk=quiz.pk).update(updated_at=changed)
+    same_second = http_date(changed.replace(microsecond=0).timestamp())
+
+    monkeypatch.setattr(timezone, 'now', lambda: changed + timedelta(microseconds=100000))
+    response = get_detail(api_rf, user, quiz)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response
+
+    monkeypatch.setattr(timezone, 'now', lambda: changed + timedelta(seconds=1))
+    response = get_detail(api_rf, user, quiz)
+    assert response['Last-Modified'] == same_second
+    assert get_detail(api_rf, user, quiz, HTTP_IF_MODIFIED_SINCE=same_second).status_code == 304
+    # The ETag decides when both validators are sent.
+    assert get_detail(api_rf, user, quiz, HTTP_IF_MODIFIED_SINCE=same_second, HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+
+
+def test_quiz_detail_reuses_cached_payload_until_the_quiz_changes(api_rf, user, create_quiz, django_assert_num_queries, monkeypatch):
+    quiz = create_quiz(user, title='Cached')
+    Question.objects.create(quiz=quiz, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a')
+    first = get_detail(api_rf, user, quiz)
+
+    serializer = Mock(side_effect=AssertionError('quiz serialized again'))
+    monkeypatch.setattr(QuizReviewPutPatchDeleteView, 'get_serializer', serializer)
+    with django_assert_num_queries(1):
+        cached = get_detail(api_rf, user, quiz)
+    assert cached.data == first.data
+    assert cached['ETag'] == first['ETag']
+
+    monkeypatch.undo()
+    quiz.title = 'Renamed'
+    quiz.save()
+    response = get_detail(api_rf, user, quiz)
+    assert response.data['title'] == 'Renamed'
+    assert response['ETag'] != first['ETag']
+
+
+def test_quiz_list_answers_conditional_requests_with_304(api_rf, user, create_quiz, django_assert_num_queries):
+    quiz = create_quiz(user, title='Listed')
+    Question.objects.create(quiz=quiz, question_title='Q?', question_options=['a', 'b', 'c', 'd'], answer='a')
+
+    def get_list(**headers):
+        request = api_rf.get('/api/quizzes/', **headers)
+        force_authenticate(request, user=user)
+        return QuizListView.as_view()(request)
+
+    etag = get_list()['ETag']
+    with django_assert_num_queries(1):
+        response = get_list(HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    with django_assert_num_queries(1):
+        response = get_list()
+    assert response.status_code == 200
+    assert response['ETag'] == etag
+    assert response.data['results'][0]['questions'][0]['question_title'] == 'Q?'
+
+    create_quiz(user, title='New')
+    response = get_list(HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert [item['title'] for item in response.data['results']] == ['New', 'Listed']
@@ -0,0 +1,150 @@
+import html
+import json
+import re
+
+from django.conf import settings
+
+from quiz_app.utils.lazy_import import LazyModule
+
+yt_dlp = LazyModule("yt_dlp")
+
+MANUAL = "captions"
+AUTOMATIC = "auto_captions"
+CAPTION_FORMATS = ("json3", "vtt", "srt")
+ANNOTATION = re.compile(r"\[[^\]]*\]|\([^)]*\)|♪")
+# Selects the audio format, so the info dict of the probe can also be used to stream or download the audio.
+PROBE_OPTIONS = {"format": "bestaudio/best", "skip_download": True, "quiet": True, "no_warnings": True}
+
+
+def _language_matches(track_language: str, language: str) -> bool:
+    """Match "en" with "en", "en-US" or "en-orig", but not with "es"."""
+    return track_language.split("-")[0].lower() == language.split("-")[0].lower()
+
+
+def _pick_format(formats: list) -> dict | None:
+    """Return the best parseable format of a caption track, skipping machine translations."""
+    formats = [f for f in formats if f.get("url") and "tlang=" not in f["url"]]
+    for ext in CAPTION_FORMATS:
+        for caption_format in formats:
+            if caption_format.get("ext") == ext:
+                return caption_format
+    return None
+
+
+def _pick_track(tracks: dict, language: str | None, automatic: bool) -> dict | None:
+    """
+    Pick the caption track in the video's language from a yt-dlp subtitles dict.
+    Without a known language, manual captions are only used if there is exactly one track,
+    automatic captions only if YouTube marks the original ("-orig") track.
+    """
+    tracks = {key: formats for key, formats in tracks.items() if key != "live_chat"}
+    if language:
+        candidates = [key for key in tracks if _language_matches(key, language)]
+        candidates.sort(key=lambda key: (key.endswith("-orig") is not automatic, key != language))
+    elif automatic:
+        candidates = [key for key in tracks if key.endswith("-orig")]
+    else:
+        candidates = list(tracks) if len(tracks) == 1 else []
+    for key in candidates:
+        caption_format = _pick_format(tracks[key])
+        if caption_format:
+            return caption_format
+    return None
+
+
+def select_caption_track(info: dict, language: str | None = None) -> tuple[dict, str] | None:
+    """
+    Select the caption track to use from a yt-dlp info dict.
+    Manual captions are preferred over automatic ones; automatic captions are only considered
+    with CAPTIONS_ALLOW_AUTOMATIC.
+
+    Args:
+        info (dict): The info dict returned by extract_info(download=False).
+        language (str): The requested language, defaults to the language of the video.
+
+    Returns:
+        tuple: The caption format dict and its source (MANUAL or AUTOMATIC), or None.
+    """
+    language = language or info.get("language")
+    caption_format = _pick_track(info.get("subtitles") or {}, language, automatic=False)
+    if caption_format:
+        return caption_format, MANUAL
+    if settings.CAPTIONS_ALLOW_AUTOMATIC:
+        caption_format = _pick_track(info.get("automatic_captions") or {}, language, automatic=True)
+        if caption_format:
+            return caption_format, AUTOMATIC
+    return None
+
+
+def _parse_json3(data: str) -> list:
+    lines = []
+    for event in json.loads(data).get("events", []):
+        text = "".join(segment.get("utf8", "") for segment in event.get("segs") or [])
+        lines.append(text)
+    return " ".join(lines).split("\n")
+
+
+def _parse_timed_text(data: str) -> list:
+    """Return the text lines of a WebVTT or SRT file, without cue numbers, timings and tags."""
+    lines = []
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or "-->" in line or line.isdigit() or line.startswith(("WEBVTT", "Kind:", "Language:", "NOTE")):
+            continue
+        lines.append(re.sub(r"<[^>]+>", "", line))
+    return lines
+
+
+def parse_captions(data: str, ext: str) -> str:
+    """
+    Convert a json3, vtt or srt caption file into plain transcript text.
+    Lines repeated by rolling automatic captions are dropped and annotations like [Music] removed.
+    """
+    lines = _parse_json3(data) if ext == "json3" else _parse_timed_text(data)
+    text_lines = []
+    for line in lines:
+        line = " ".join(ANNOTATION.sub(" ", html.unescape(line)).split())
+        if line and (not text_lines or text_lines[-1] != line):
+            text_lines.append(line)
+    return " ".join(text_lines)
+
+
+def captions_pass_quality(text: str, duration: float | None) -> bool:
+    """Check that the captions cover the spoken content and are not just a few annotations."""
+    words = len(text.split())
+    if not words:
+        return False
+    if not duration:
+        return True
+    return words / (duration / 60) >= settings.CAPTIONS_MIN_WORDS_PER_MINUTE
+
+
+def probe_video(video_url: str) -> dict:
+    """Return the yt-dlp info dict of a video, with its audio format selected, without downloading any media."""
+    with yt_dlp.YoutubeDL(PROBE_OPTIONS) as ydl:
+        return ydl.extract_info(video_url, download=False)
+
+
+def captions_from_info(info: dict, language: str | None = None) -> tuple[str, str] | None:
+    """
+    Return the transcript of a video from the captions listed in its info dict.
+    Only the selected caption file is fetched.
+
+    Args:
+        info (dict): The info dict returned by probe_video.
+        language (str): The requested language, defaults to the language of the video.
+
+    Returns:
+        tuple: The transcript and its source (MANUAL or AUTOMATIC), or None if the video has no
+        captions that pass the quality rules.
+    """
+    selected = select_caption_track(info, language)
+    if selected is None:
+        return None
+    caption_format, source = selected
+    with yt_dlp.YoutubeDL(PROBE_OPTIONS) as ydl:
+        data = ydl.urlopen(caption_format["url"]).read().decode("utf-8", errors="replace")
+    text = parse_captions(data, caption_format["ext"])
+    if not captions_pass_quality(text, info.get("duration")):
+        return None
+    return text, source
@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from django.conf import settings
+
+from quiz_app.utils.progress import report_progress, TRANSCRIBING
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4
+FRAME_SECONDS = 0.1
+
+
+def find_quiet_cut(samples: np.ndarray, search_samples: int) -> int:
+    """
+    Return the index of the quietest 100 ms frame within the last search_samples of samples.
+    Cutting there avoids splitting words in the middle.
+    """
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    start = max(len(samples) - search_samples, 0)
+    window = samples[start:]
+    frames = len(window) // frame
+    if frames < 2:
+        return len(samples)
+    energy = np.square(window[:frames * frame].reshape(frames, frame)).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return start + quietest * frame + frame // 2
+
+
+def read_chunks(stream, chunk_seconds: float, overlap_seconds: float, split_on_silence: bool = True):
+    """
+    Yield (offset_seconds, samples) windows from a raw 16 kHz mono float32 PCM stream.
+    Consecutive windows overlap by overlap_seconds. With split_on_silence, each window ends at
+    the quietest frame of its last fifth instead of at the fixed window length.
+    Only one window is read into memory at a time.
+    """
+    chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+    overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+    buffer = np.empty(0, dtype=np.float32)
+    offset = 0
+    carried = 0
+    while True:
+        data = stream.read((chunk_samples - len(buffer)) * BYTES_PER_SAMPLE)
+        usable = len(data) - len(data) % BYTES_PER_SAMPLE
+        if usable:
+            buffer = np.concatenate([buffer, np.frombuffer(data[:usable], dtype=np.float32)])
+        if len(buffer) < chunk_samples:
+            if data:
+                continue
+            if len(buffer) > carried:
+                yield offset / SAMPLE_RATE, buffer
+            return
+
+        cut = find_quiet_cut(buffer, chunk_samples // 5) if split_on_silence else chunk_samples
+        yield offset / SAMPLE_RATE, buffer[:cut]
+        next_start = max(cut - overlap_samples, 1)
+        carried = cut - next_start
+        buffer = buffer[next_start:].copy()
+        offset += next_start
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _boundary_overlap(previous: list, following: list, max_words: int) -> tuple[int, int]:
+    """
+    Find where the start of following repeats the end of previous.
+    Returns the number of trailing words to drop from previous (partial words cut by the chunk border)
+    and the number of leading words to drop from following.
+    """
+    tail = [_normalize(word) for word in previous[-max_words:]]
+    head = [_normalize(word) for word in following[:max_words]]
+    best = (0, 0, 0)
+    for i in range(len(tail)):
+        for j in range(min(3, len(head))):
+            length = 0
+            while i + length < len(tail) and j + length < len(head) and tail[i + length] == head[j + length]:
+                length += 1
+            reaches_end = i + length >= len(tail) - 2
+            if length and reaches_end and length > best[0]:
+                best = (length, len(tail) - (i + length), j + length)
+    length, drop_previous, drop_following = best
+    exact = drop_previous == 0 and drop_following == length
+    if length >= 2 or (length == 1 and exact):
+        return drop_previous, drop_following
+    return 0, 0
+
+
+def stitch_texts(texts: list, max_overlap_words: int = 40) -> str:
+    """Join chunk transcripts and remove the words repeated in the overlap of consecutive chunks."""
+    words = []
+    for text in texts:
+        following = text.split()
+        drop_previous, drop_following = _boundary_overlap(words, following, max_overlap_words)
+        if drop_previous:
+            del words[-drop_previous:]
+        words.extend(following[drop_following:])
+    return " ".join(words)
+
+
+def _init_worker(threads: int) -> None:
+    """Split the CPU cores between the worker processes instead of oversubscribing them."""
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _transcribe_chunk(samples: np.ndarray, model_size: str, language: str | None) -> str:
+    """Transcribe one chunk with the model registry of the worker process."""
+    from quiz_app.utils.vad import transcribe_with_vad
+    from quiz_app.utils.whisper_registry import registry
+
+    options = {"language": language} if language else {}
+    with registry.acquire(model_size) as model:
+        return transcribe_with_vad(model, samples, **options)["text"]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_chunk_pool() -> ProcessPoolExecutor:
+    """Return the process pool for chunk transcription, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.WHISPER_CHUNK_WORKERS
+            threads = max((os.cpu_count() or 1) // workers, 1)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+        return _pool
+
+
+def _report_finished_chunks(chunks: list, duration: float | None, read_all: bool) -> None:
+    """
+    Report the transcribed share of the audio as TRANSCRIBING progress.
+    Without the duration of the audio, the share is only known once all chunks have been read.
+    """
+    finished = sum(seconds for future, seconds in chunks if future.done())
+    if duration:
+        report_progress(TRANSCRIBING, finished / duration)
+    elif read_all and chunks:
+        report_progress(TRANSCRIBING, finished / sum(seconds for _, seconds in chunks))
+
+
+def transcribe_stream(stream, model_size: str = "base", language: str | None = None, executor=None, duration: float | None = None) -> str:
+    """
+    Split a raw PCM stream into overlapping chunks and transcribe them across a process pool.
+    At most two chunks per worker are in flight, so memory stays bounded for long videos.
+    Progress is reported from the calling thread whenever chunks finish.
+
+    Args:
+        stream: Binary file-like object with 16 kHz mono float32 PCM.
+        model_size (str): The Whisper model size.
+        language (str): Optional language code passed to Whisper.
+        executor: Optional executor to use instead of the shared process pool.
+        duration (float): Optional length of the audio in seconds, used for progress reports.
+
+    Returns:
+        str: The stitched transcript.
+    """
+    executor = executor or get_chunk_pool()
+    max_in_flight = max(settings.WHISPER_CHUNK_WORKERS, 1) * 2
+    submitted = []
+    chunks = read_chunks(
+        stream,
+        settings.WHISPER_CHUNK_SECONDS,
+        settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+        settings.WHISPER_CHUNK_SPLIT_ON_SILENCE,
+    )
+    try:
+        for _, samples in chunks:
+            pending = [future for future, _ in submitted if not future.done()]
+            if len(pending) >= max_in_flight:
+                wait(pending, return_when=FIRST_COMPLETED)
+                _report_finished_chunks(submitted, duration, read_all=False)
+            future = executor.submit(_transcribe_chunk, samples, model_size, language)
+            submitted.append((future, len(samples) / SAMPLE_RATE))
+        while True:
+            _report_finished_chunks(submitted, duration, read_all=True)
+            pending = [future for future, _ in submitted if not future.done()]
+            if not pending:
+                break
+            wait(pending, return_when=FIRST_COMPLETED)
+        texts = [future.result() for future, _ in submitted]
+    except BaseException:
+        for future, _ in submitted:
+            future.cancel()
+        raise
+    return stitch_texts(texts)
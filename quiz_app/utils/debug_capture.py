@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_rotate_lock = threading.Lock()
+
+
+def capture_artifact(kind: str, text: str, quiz_id: int | None = None) -> str | None:
+    """
+    Write a pipeline artifact (e.g. the transcript or the prompt) to DEBUG_CAPTURE_DIR for debugging.
+    Does nothing unless DEBUG_CAPTURE_ENABLED is set. File names are unique per call, so concurrent
+    jobs never overwrite each other; each file is cut to DEBUG_CAPTURE_MAX_BYTES and only the
+    DEBUG_CAPTURE_MAX_FILES newest files are kept.
+
+    Args:
+        kind (str): The artifact type, used as file name prefix.
+        text (str): The content to write.
+        quiz_id (int): The ID of the quiz the artifact belongs to.
+
+    Returns:
+        str: The path of the written file, or None if capturing is disabled.
+    """
+    if not settings.DEBUG_CAPTURE_ENABLED:
+        return None
+    os.makedirs(settings.DEBUG_CAPTURE_DIR, exist_ok=True)
+    name = f"{kind}_quiz{quiz_id if quiz_id is not None else '-'}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}.txt"
+    path = os.path.join(settings.DEBUG_CAPTURE_DIR, name)
+    data = text.encode("utf-8")[:settings.DEBUG_CAPTURE_MAX_BYTES]
+    with open(path, "xb") as f:
+        f.write(data)
+    rotate_artifacts()
+    return path
+
+
+def rotate_artifacts() -> int:
+    """Delete the oldest captured artifacts beyond DEBUG_CAPTURE_MAX_FILES. Returns the number deleted."""
+    with _rotate_lock:
+        try:
+            entries = [entry for entry in os.scandir(settings.DEBUG_CAPTURE_DIR) if entry.is_file()]
+        except FileNotFoundError:
+            return 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        deleted = 0
+        for entry in entries[settings.DEBUG_CAPTURE_MAX_FILES:]:
+            try:
+                os.remove(entry.path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, stop_before_delay, wait_random_exponential
+
+from quiz_app.utils.lazy_import import LazyModule
+
+genai_errors = LazyModule("google.genai.errors")
+httpx = LazyModule("httpx")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class GenAIDeadlineExceeded(TimeoutError):
+    """Raised when a Gemini call, including its retries, did not finish before its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Retry timeouts, connection errors, rate limits and server errors, but not client errors."""
+    if isinstance(error, GenAIDeadlineExceeded):
+        return False
+    if isinstance(error, TimeoutError):
+        return True
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+class GenAIClient:
+    """
+    Wrapper around the shared google-genai client for synchronous and asynchronous callers.
+    Every call has a deadline that covers waiting for a slot, all attempts and the backoff between them;
+    each attempt is additionally limited to timeout seconds. Transient failures are retried with
+    exponential backoff and full jitter. At most max_concurrency calls are in flight: synchronous callers
+    share a threading semaphore, coroutines an asyncio semaphore of their event loop (an asyncio semaphore
+    cannot be shared between loops). The google-genai client keeps its HTTP connections pooled between calls.
+
+    Attributes:
+        timeout (float): Seconds a single attempt may take.
+        deadline (float): Seconds the whole call may take.
+        max_attempts (int): Maximum number of attempts per call.
+    """
+    def __init__(self, client_factory, max_concurrency: int, timeout: float, deadline: float, max_attempts: int):
+        self._client_factory = client_factory
+        self._max_concurrency = max(max_concurrency, 1)
+        self._semaphore = threading.BoundedSemaphore(self._max_concurrency)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+
+    def _retry_options(self) -> dict:
+        return {
+            "stop": stop_after_attempt(self.max_attempts) | stop_before_delay(self.deadline),
+            "wait": wait_random_exponential(multiplier=1, max=30),
+            "retry": retry_if_exception(is_retryable),
+            "reraise": True,
+        }
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise GenAIDeadlineExceeded("Gemini call exceeded its deadline.")
+        return remaining
+
+    def _request(self, contents, config: dict | None, model: str | None, deadline: float) -> dict:
+        """Return the generate_content arguments of one attempt, limited to the remaining time."""
+        timeout = min(self.timeout, self._remaining(deadline))
+        config = dict(config or {}, http_options={"timeout": int(timeout * 1000)})
+        return {"model": model or settings.GEMINI_MODEL, "contents": contents, "config": config}
+
+    def generate_content(self, contents, config: dict | None = None, model: str | None = None):
+        """Call models.generate_content with deadline, retries and the concurrency limit."""
+        deadline = time.monotonic() + self.deadline
+        for attempt in Retrying(**self._retry_options()):
+            with attempt:
+                if not self._semaphore.acquire(timeout=self._remaining(deadline)):
+                    raise GenAIDeadlineExceeded("No free Gemini slot before the deadline.")
+                try:
+                    request = self._request(contents, config, model, deadline)
+                    return self._client_factory().models.generate_content(**request)
+                finally:
+                    self._semaphore.release()
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.BoundedSemaphore(self._max_concurrency)
+        return semaphore
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, deadline: float) -> None:
+        """Wait for a slot without blocking the event loop, at most until the deadline."""
+        try:
+            async with asyncio.timeout(self._remaining(deadline)):
+                await semaphore.acquire()
+        except TimeoutError:
+            raise GenAIDeadlineExceeded("No free Gemini slot before the deadline.") from None
+
+    async def agenerate_content(self, contents, config: dict | None = None, model: str | None = None):
+        """Async variant of generate_content, using the client's pooled async HTTP connections."""
+        deadline = time.monotonic() + self.deadline
+        semaphore = self._async_semaphore()
+        async for attempt in AsyncRetrying(**self._retry_options()):
+            with attempt:
+                await self._acquire(semaphore, deadline)
+                try:
+                    request = self._request(contents, config, model, deadline)
+                    call = self._client_factory().aio.models.generate_content(**request)
+                    return await asyncio.wait_for(call, timeout=request["config"]["http_options"]["timeout"] / 1000)
+                finally:
+                    semaphore.release()
@@ -1,13 +1,66 @@
-import os
 import json
+import logging
 import re
-import time
+import threading
 
-from google import genai
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from pydantic import ValidationError
 
+from quiz_app.utils.debug_capture import capture_artifact
+from quiz_app.utils.genai_client import GenAIClient
+from quiz_app.utils.generation_cache import generation_cache_key, get_cached_generation, store_generation
+from quiz_app.utils.lazy_import import LazyModule
+from quiz_app.utils.quiz_schema import SCHEMA_VERSION, QuestionsResponse, QuizResponse, validate_questions, validate_quiz
+from quiz_app.utils.transcript_condenser import condense_transcript, condenser_fingerprint, count_tokens
 
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+genai = LazyModule("google.genai")
+httpx = LazyModule("httpx")
+
+logger = logging.getLogger(__name__)
+
+# Created on first use by get_client, so importing this module does not load google-genai.
+client = None
+_client_lock = threading.Lock()
+
+# Bump whenever return_prompt changes so cached generations of the old prompt are not reused.
+PROMPT_VERSION = "3"
+
+
+class QuizGenerationError(Exception):
+    """Raised when Gemini does not return a valid quiz, even after repairing the invalid questions."""
+
+
+def get_client():
+    """
+    Return the shared Google GenAI client, creating it on first use.
+    Its HTTP clients keep up to GEMINI_MAX_CONCURRENCY connections alive between calls.
+    """
+    global client
+    with _client_lock:
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=settings.GEMINI_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.GEMINI_MAX_CONCURRENCY,
+            )
+            client = genai.Client(
+                api_key=settings.GEMINI_API_KEY,
+                http_options={
+                    "timeout": int(settings.GEMINI_TIMEOUT * 1000),
+                    "client_args": {"limits": limits},
+                    "async_client_args": {"limits": limits},
+                },
+            )
+        return client
+
+
+gemini = GenAIClient(
+    get_client,
+    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    timeout=settings.GEMINI_TIMEOUT,
+    deadline=settings.GEMINI_DEADLINE,
+    max_attempts=settings.GEMINI_MAX_ATTEMPTS,
+)
 
 
 def parse_genai_json(text_output:str):
@@ -16,65 +69,200 @@ def parse_genai_json(text_output:str):
     return json.loads(cleaned)
 
 
-def return_prompt(transcript: str):
+def return_prompt(transcript: str, question_count: int = 10):
     """Return the prompt for Google GenAI to generate quiz questions."""
     return f"""
-Based on the following transcript, generate a quiz in valid JSON format.
-
-The quiz must follow this exact structure:
-
-{{
-  "title": "Create a concise quiz title based on the topic of the transcript.",
-  "description": "Summarize the transcript in no more than 150 characters. Do not include any quiz questions or answers.",
-  "questions": [
-    {{
-      "question_title": "The question goes here.",
-      "question_options": ["Option A", "Option B", "Option C", "Option D"],
-      "answer": "The correct answer from the above options"
-    }},
-    ...
-    (exactly 10 questions)
-  ]
-}}
+Based on the following transcript, generate a quiz.
+
+- "title": Create a concise quiz title based on the topic of the transcript.
+- "description": Summarize the transcript in no more than 150 characters. Do not include any quiz questions or answers.
+- "questions": Exactly {question_count} questions.
+
+Requirements:
+- Each question must have exactly 4 distinct answer options.
+- Only one correct answer is allowed per question, and it must be present in 'question_options'.
+
+Transcript:
+{transcript}
+    """
+
+
+def return_repair_prompt(transcript: str, question_count: int, accepted: list, rejected: list):
+    """Return the prompt for Google GenAI to replace questions that failed validation."""
+    accepted_titles = "\n".join(f"- {question['question_title']}" for question in accepted)
+    rejected_questions = "\n".join(f"- {json.dumps(question, ensure_ascii=False)}: {reason}" for question, reason in rejected)
+    return f"""
+Based on the following transcript, generate exactly {question_count} new quiz questions.
 
 Requirements:
 - Each question must have exactly 4 distinct answer options.
 - Only one correct answer is allowed per question, and it must be present in 'question_options'.
-- The output must be valid JSON and parsable as-is (e.g., using Python's json.loads).
-- Do not include explanations, comments, or any text outside the JSON.
+- Do not repeat any of these existing questions:
+{accepted_titles or "- (none)"}
+
+These questions were rejected, do not repeat their mistakes:
+{rejected_questions or "- (none)"}
 
 Transcript:
 {transcript}
     """
 
 
-def generate_questions(transcript: str, transcript_file: str) -> dict:
+def _json_config(schema) -> dict:
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def _parse_response(response):
+    try:
+        return parse_genai_json(response.text)
+    except ValueError as e:
+        raise QuizGenerationError(f"Gemini returned invalid JSON: {e}") from e
+
+
+def request_json(prompt: str, schema):
+    """Send a prompt in JSON response schema mode and return the parsed JSON."""
+    return _parse_response(gemini.generate_content(prompt, config=_json_config(schema)))
+
+
+async def arequest_json(prompt: str, schema):
+    """Async variant of request_json."""
+    return _parse_response(await gemini.agenerate_content(prompt, config=_json_config(schema)))
+
+
+def _repair_prompt(transcript: str, questions: list, rejected: list, question_count: int) -> str | None:
+    """Return the prompt for the missing questions, or None if the quiz is complete."""
+    missing = question_count - len(questions)
+    if missing <= 0:
+        return None
+    logger.info("Requesting %d replacement question(s) for: %s", missing, [reason for _, reason in rejected])
+    return return_repair_prompt(transcript, missing, questions, rejected)
+
+
+def _merge_repair(data, questions: list, question_count: int) -> tuple[list, list]:
+    """Add the valid replacement questions of a repair response to questions."""
+    raw = data.get("questions", []) if isinstance(data, dict) else []
+    new, rejected = validate_questions(raw, existing=questions)
+    return questions + new[:question_count - len(questions)], rejected
+
+
+def _check_complete(questions: list, question_count: int) -> list:
+    if len(questions) < question_count:
+        raise QuizGenerationError(f"Only {len(questions)} of {question_count} generated questions are valid.")
+    return questions
+
+
+def repair_questions(transcript: str, questions: list, rejected: list, question_count: int) -> list:
+    """
+    Bring the questions up to exactly question_count valid questions.
+    Only replacements for the rejected or missing questions are requested, up to
+    GENERATION_REPAIR_ATTEMPTS times; the valid questions are kept as they are.
+    Raises QuizGenerationError if not enough valid questions could be generated.
+    """
+    questions = questions[:question_count]
+    for _ in range(settings.GENERATION_REPAIR_ATTEMPTS):
+        prompt = _repair_prompt(transcript, questions, rejected, question_count)
+        if prompt is None:
+            break
+        questions, rejected = _merge_repair(request_json(prompt, QuestionsResponse), questions, question_count)
+    return _check_complete(questions, question_count)
+
+
+async def arepair_questions(transcript: str, questions: list, rejected: list, question_count: int) -> list:
+    """Async variant of repair_questions."""
+    questions = questions[:question_count]
+    for _ in range(settings.GENERATION_REPAIR_ATTEMPTS):
+        prompt = _repair_prompt(transcript, questions, rejected, question_count)
+        if prompt is None:
+            break
+        questions, rejected = _merge_repair(await arequest_json(prompt, QuestionsResponse), questions, question_count)
+    return _check_complete(questions, question_count)
+
+
+def _validate_quiz(data) -> tuple[dict, list]:
+    try:
+        return validate_quiz(data)
+    except ValidationError as e:
+        raise QuizGenerationError(f"Gemini returned an incomplete quiz: {e}") from e
+
+
+def _build_prompt(transcript: str, question_count: int, quiz_id: int | None) -> tuple[str, str]:
+    """Condense the transcript, build the prompt, log the token counts and capture both for debugging."""
+    condensed = condense_transcript(transcript)
+    prompt = return_prompt(condensed, question_count)
+    logger.info(
+        "Quiz %s prompt: %d transcript tokens condensed to %d, %d prompt tokens",
+        quiz_id, count_tokens(transcript), count_tokens(condensed), count_tokens(prompt),
+    )
+    capture_artifact("transcript", transcript, quiz_id)
+    capture_artifact("prompt", prompt, quiz_id)
+    return condensed, prompt
+
+
+def _cache_key(transcript: str) -> tuple[str, str]:
+    """Return the generation cache key, covering prompt, question count, model, condenser settings and schema."""
+    prompt_version = f"{PROMPT_VERSION}-{settings.QUIZ_QUESTION_COUNT}"
+    key = generation_cache_key(
+        transcript, prompt_version, settings.GEMINI_MODEL, condenser_fingerprint(), f"schema-{SCHEMA_VERSION}",
+    )
+    return key, prompt_version
+
+
+def generate_questions(transcript: str, use_cache: bool = True, quiz_id: int | None = None) -> dict:
     """
-    Generate 10 multiple-choice questions using Google GenAI.
+    Generate QUIZ_QUESTION_COUNT multiple-choice questions using Google GenAI.
     Each question includes a title, four options, and one correct answer.
+    Gemini answers in JSON response schema mode and every question is validated;
+    invalid questions are replaced one by one instead of regenerating the whole quiz.
+    Results are cached by transcript hash, prompt version and model name.
+    The transcript is condensed to the prompt token budget first and the token counts are logged.
+    Transcript and prompt stay in memory; they are only written to disk in debug capture mode.
 
     Args:
         transcript (str): The transcript text to base the questions on.
-        transcript_file (str): The path to the transcript file (for cleanup).
+        use_cache (bool): Set to False to force a new generation.
+        quiz_id (int): The ID of the quiz, used in the log output.
 
     Returns:
         dict: A dictionary containing the quiz title, description, and questions.
     """
-    prompt = return_prompt(transcript)
-
-    prompt_file = os.path.join(settings.TMP_PROMPT_DIR, f"prompt_{int(time.time())}.txt")
-    with open(prompt_file, "w", encoding="utf-8") as f:
-        f.write(prompt)
-    
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
-    )
-    text_output = response.text
-    quiz_data = parse_genai_json(text_output)
+    question_count = settings.QUIZ_QUESTION_COUNT
+    cache_key, prompt_version = _cache_key(transcript)
+    if use_cache:
+        quiz_data = get_cached_generation(cache_key)
+        if quiz_data is not None:
+            return quiz_data
+
+    condensed, prompt = _build_prompt(transcript, question_count, quiz_id)
+    quiz_data, rejected = _validate_quiz(request_json(prompt, QuizResponse))
+    quiz_data["questions"] = repair_questions(condensed, quiz_data["questions"], rejected, question_count)
+    store_generation(cache_key, prompt_version, settings.GEMINI_MODEL, quiz_data)
+    return quiz_data
+
 
-    if os.path.exists(transcript_file) and os.path.exists(prompt_file):
-        os.remove(transcript_file)
-        os.remove(prompt_file)
+async def agenerate_questions(transcript: str, use_cache: bool = True, quiz_id: int | None = None) -> dict:
+    """
+    Async variant of generate_questions for callers running in an event loop.
+    Gemini is called through the async client, so waiting for the response does not block a thread.
+
+    Args:
+        transcript (str): The transcript text to base the questions on.
+        use_cache (bool): Set to False to force a new generation.
+        quiz_id (int): The ID of the quiz, used in the log output.
+
+    Returns:
+        dict: A dictionary containing the quiz title, description, and questions.
+    """
+    question_count = settings.QUIZ_QUESTION_COUNT
+    cache_key, prompt_version = _cache_key(transcript)
+    if use_cache:
+        quiz_data = await sync_to_async(get_cached_generation)(cache_key)
+        if quiz_data is not None:
+            return quiz_data
 
+    # Condensing and token counting are CPU-bound (tiktoken may also download its encoding on first use)
+    # and debug capture writes files, so the prompt is built off the event loop.
+    condensed, prompt = await sync_to_async(_build_prompt, thread_sensitive=False)(transcript, question_count, quiz_id)
+    quiz_data, rejected = _validate_quiz(await arequest_json(prompt, QuizResponse))
+    quiz_data["questions"] = await arepair_questions(condensed, quiz_data["questions"], rejected, question_count)
+    await sync_to_async(store_generation)(cache_key, prompt_version, settings.GEMINI_MODEL, quiz_data)
     return quiz_data
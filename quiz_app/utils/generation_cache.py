@@ -0,0 +1,73 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from quiz_app.models import GenerationCacheEntry
+
+
+def generation_cache_key(transcript: str, prompt_version: str, model_name: str, *variant: str) -> str:
+    """
+    Return the SHA-256 key of a transcript for the given prompt version and model.
+    variant holds further inputs of the result, e.g. the condenser settings and the schema version.
+    """
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, *variant, transcript):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_cached_generation(cache_key: str) -> dict | None:
+    """
+    Return the cached quiz data for the given key, or None on a miss.
+    Expired entries are treated as misses and removed.
+    """
+    if not settings.GENERATION_CACHE_ENABLED:
+        return None
+    entry = GenerationCacheEntry.objects.filter(cache_key=cache_key).first()
+    if entry is None:
+        return None
+    now = timezone.now()
+    if now - entry.created_at > timedelta(seconds=settings.GENERATION_CACHE_TTL):
+        entry.delete()
+        return None
+    GenerationCacheEntry.objects.filter(pk=entry.pk).update(last_used_at=now)
+    return entry.quiz_data
+
+
+def store_generation(cache_key: str, prompt_version: str, model_name: str, quiz_data: dict) -> None:
+    """Store generated quiz data and evict old entries if the cache holds too many."""
+    if not settings.GENERATION_CACHE_ENABLED:
+        return
+    defaults = {
+        "model_name": model_name,
+        "prompt_version": prompt_version,
+        "quiz_data": quiz_data,
+        "created_at": timezone.now(),
+        "last_used_at": timezone.now(),
+    }
+    try:
+        with transaction.atomic():
+            GenerationCacheEntry.objects.update_or_create(cache_key=cache_key, defaults=defaults)
+    except IntegrityError:
+        # A concurrent job stored the same result first.
+        pass
+    evict_generations()
+
+
+def evict_generations() -> int:
+    """
+    Remove expired entries, then least recently used entries beyond GENERATION_CACHE_MAX_ENTRIES.
+    Returns the number of removed entries.
+    """
+    expired_before = timezone.now() - timedelta(seconds=settings.GENERATION_CACHE_TTL)
+    removed, _ = GenerationCacheEntry.objects.filter(created_at__lt=expired_before).delete()
+
+    keep_ids = GenerationCacheEntry.objects.order_by("-last_used_at").values_list("id", flat=True)[
+        :settings.GENERATION_CACHE_MAX_ENTRIES
+    ]
+    deleted, _ = GenerationCacheEntry.objects.exclude(id__in=list(keep_ids)).delete()
+    return removed + deleted
@@ -0,0 +1,38 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+    Lets heavy dependencies like torch, whisper, yt-dlp and google-genai stay out of
+    Django startup for processes that never use them.
+
+    Attributes:
+        name (str): The dotted name of the wrapped module.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Import the wrapped module if needed and return it."""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self.name)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self.name!r} ({state})>"
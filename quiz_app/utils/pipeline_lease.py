@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from quiz_app.models import PipelineLease
+
+# Seconds between two attempts to take a lease held by another process.
+POLL_INTERVAL = 1.0
+
+
+def lease_key(key: str) -> str:
+    """Return the database key of a lease, a hash so that long video URLs fit."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def try_acquire(key: str, token: str) -> bool:
+    """
+    Take the lease of key unless another holder's lease is still valid.
+    An expired lease (its holder died or ran longer than GENERATION_LEASE_TIMEOUT) is replaced.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            PipelineLease.objects.filter(key=key, expires_at__lte=now).delete()
+            PipelineLease.objects.create(
+                key=key, token=token, expires_at=now + timedelta(seconds=settings.GENERATION_LEASE_TIMEOUT)
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def release(key: str, token: str) -> None:
+    """Release the lease of key if it is still held with token."""
+    PipelineLease.objects.filter(key=key, token=token).delete()
+
+
+@contextmanager
+def pipeline_lease(key: str):
+    """
+    Hold the lease of key for the duration of the context.
+    While a job in another process holds it, wait until it is released or has expired.
+    """
+    key, token = lease_key(key), uuid.uuid4().hex
+    while not try_acquire(key, token):
+        time.sleep(POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        release(key, token)
+
+
+@asynccontextmanager
+async def apipeline_lease(key: str):
+    """Async variant of pipeline_lease that waits without blocking the event loop."""
+    key, token = lease_key(key), uuid.uuid4().hex
+    while not await sync_to_async(try_acquire)(key, token):
+        await asyncio.sleep(POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        await sync_to_async(release)(key, token)
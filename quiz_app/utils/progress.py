@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DOWNLOADING = "downloading"
+TRANSCRIBING = "transcribing"
+GENERATING = "generating"
+
+# Share of the overall progress (start and end percent) of each stage
+STAGE_PERCENT = {
+    DOWNLOADING: (0, 20),
+    TRANSCRIBING: (20, 70),
+    GENERATING: (70, 95),
+}
+
+_reporter = ContextVar("quiz_progress_reporter", default=None)
+
+
+@contextmanager
+def progress_reporter(callback):
+    """
+    Route stage reports of the current context to callback.
+    The callback receives the stage name and the overall progress in percent
+    for every report_stage and report_progress call.
+    """
+    token = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+def current_reporter():
+    """Return the progress callback of the current context, or None."""
+    return _reporter.get()
+
+
+def report_stage(stage: str) -> None:
+    """Report the start of a pipeline stage to the active reporter, if any."""
+    report_progress(stage, 0.0)
+
+
+def report_progress(stage: str, fraction: float) -> None:
+    """
+    Report how far the current stage is to the active reporter, if any.
+
+    Args:
+        stage (str): The pipeline stage.
+        fraction (float): The finished part of the stage, from 0.0 to 1.0.
+    """
+    callback = _reporter.get()
+    if callback is None:
+        return
+    start, end = STAGE_PERCENT[stage]
+    fraction = min(max(fraction, 0.0), 1.0)
+    callback(stage, int(start + (end - start) * fraction))
@@ -0,0 +1,100 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+OPTIONS_PER_QUESTION = 4
+# Matches the max_length of Question.question_title and Question.answer.
+MAX_TEXT_LENGTH = 200
+# Bump whenever the schema or the validation rules change so cached generations are validated again.
+SCHEMA_VERSION = "2"
+
+
+class GeneratedQuestion(BaseModel):
+    """A generated multiple-choice question with four distinct options and one correct answer."""
+    question_title: str = Field(min_length=1, max_length=MAX_TEXT_LENGTH)
+    question_options: list[Annotated[str, Field(max_length=MAX_TEXT_LENGTH)]]
+    answer: str = Field(max_length=MAX_TEXT_LENGTH)
+
+    @field_validator("question_title", "answer")
+    @classmethod
+    def strip_text(cls, value: str) -> str:
+        return value.strip()
+
+    @field_validator("question_options")
+    @classmethod
+    def check_options(cls, options: list) -> list:
+        options = [option.strip() for option in options]
+        if len(options) != OPTIONS_PER_QUESTION:
+            raise ValueError(f"expected {OPTIONS_PER_QUESTION} options, got {len(options)}")
+        if len({option.casefold() for option in options}) != len(options) or not all(options):
+            raise ValueError("options must be distinct and not empty")
+        return options
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        """Accept an answer that differs from its option only in case, and use the option's spelling."""
+        matches = [option for option in self.question_options if option.casefold() == self.answer.casefold()]
+        if not matches:
+            raise ValueError("the answer must be one of the options")
+        self.answer = matches[0]
+        return self
+
+
+class QuizResponse(BaseModel):
+    """Response schema of a quiz generation request."""
+    title: str
+    description: str
+    questions: list[GeneratedQuestion]
+
+
+class QuestionsResponse(BaseModel):
+    """Response schema of a request for replacement questions."""
+    questions: list[GeneratedQuestion]
+
+
+class _QuizShell(BaseModel):
+    """The quiz without question validation, so valid questions survive invalid siblings."""
+    title: str = Field(min_length=1)
+    description: str
+    questions: list = []
+
+
+def validate_questions(questions: list, existing: list | None = None) -> tuple[list, list]:
+    """
+    Validate generated questions one by one.
+
+    Args:
+        questions (list): Raw question dicts from the model.
+        existing (list): Already accepted questions; questions with the same title are rejected.
+
+    Returns:
+        tuple: The valid questions as dicts and the rejected ones as (question, reason) pairs.
+    """
+    titles = {question["question_title"].casefold() for question in existing or []}
+    valid, rejected = [], []
+    for raw in questions:
+        try:
+            question = GeneratedQuestion.model_validate(raw).model_dump()
+        except ValidationError as e:
+            rejected.append((raw, "; ".join(error["msg"] for error in e.errors())))
+            continue
+        if question["question_title"].casefold() in titles:
+            rejected.append((raw, "duplicate question"))
+            continue
+        titles.add(question["question_title"].casefold())
+        valid.append(question)
+    return valid, rejected
+
+
+def validate_quiz(data) -> tuple[dict, list]:
+    """
+    Validate a generated quiz.
+    Raises ValidationError if the title or description is missing, since those cannot be
+    repaired question by question.
+
+    Returns:
+        tuple: The quiz dict with only the valid questions, and the rejected (question, reason) pairs.
+    """
+    shell = _QuizShell.model_validate(data)
+    valid, rejected = validate_questions(shell.questions)
+    return {"title": shell.title, "description": shell.description, "questions": valid}, rejected
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+
+from quiz_app.utils.progress import current_reporter, progress_reporter
+
+
+class Flight:
+    """
+    One in-flight call shared by a leader and any number of followers.
+    Progress reported by the leader is forwarded to the reporters of all callers;
+    callers that join late first receive the latest report.
+    """
+    def __init__(self):
+        self.future = Future()
+        self._reporters = []
+        self._last = None
+        self._lock = threading.Lock()
+
+    def join(self, reporter) -> None:
+        if reporter is None:
+            return
+        with self._lock:
+            self._reporters.append(reporter)
+            last = self._last
+        if last is not None:
+            reporter(*last)
+
+    def report(self, stage: str, percent: int) -> None:
+        with self._lock:
+            self._last = (stage, percent)
+            reporters = list(self._reporters)
+        for reporter in reporters:
+            reporter(stage, percent)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+    The first caller runs the function; callers arriving while it runs wait for its result
+    (or its exception) instead of running it again. Works across threads and event loops
+    of the same process; calls after the flight finished run the function anew.
+    """
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _enter(self, key) -> tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def _leave(self, key, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, func, *args):
+        """Call func(*args) unless a call with the same key is in flight, and return its result."""
+        flight, leader = self._enter(key)
+        flight.join(current_reporter())
+        if not leader:
+            return flight.future.result()
+        try:
+            with progress_reporter(flight.report):
+                result = func(*args)
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._leave(key, flight)
+
+    async def ado(self, key, func, *args):
+        """Async variant of do for a coroutine function func."""
+        flight, leader = self._enter(key)
+        await sync_to_async(flight.join)(current_reporter())
+        if not leader:
+            return await asyncio.wrap_future(flight.future)
+        try:
+            with progress_reporter(flight.report):
+                result = await func(*args)
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._leave(key, flight)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from quiz_app.models import TranscriptCacheEntry
+
+# Caption transcripts do not depend on a Whisper model, they are stored under this model size key.
+CAPTIONS_KEY = "captions"
+
+
+def _language_key(language: str | None) -> str:
+    return language or "auto"
+
+
+def get_cached_transcript(video_id: str, model_size: str, language: str | None = None) -> str | None:
+    """Return the cached transcript for the given key, or None on a miss."""
+    cached = get_cached_transcript_with_source(video_id, model_size, language)
+    return cached[0] if cached is not None else None
+
+
+def get_cached_transcript_with_source(video_id: str, model_size: str, language: str | None = None) -> tuple[str, str] | None:
+    """
+    Return the cached transcript for the given key together with its source, or None on a miss.
+    Expired entries are treated as misses and removed.
+    """
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return None
+    entry = TranscriptCacheEntry.objects.filter(
+        video_id=video_id, model_size=model_size, language=_language_key(language)
+    ).first()
+    if entry is None:
+        return None
+    now = timezone.now()
+    if now - entry.created_at > timedelta(seconds=settings.TRANSCRIPT_CACHE_TTL):
+        entry.delete()
+        return None
+    TranscriptCacheEntry.objects.filter(pk=entry.pk).update(last_used_at=now)
+    return entry.transcript, entry.source
+
+
+def store_transcript(video_id: str, model_size: str, language: str | None, transcript: str, source: str = "whisper") -> None:
+    """Store a transcript and its source in the cache and evict old entries if the cache grew too large."""
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return
+    defaults = {
+        "transcript": transcript,
+        "source": source,
+        "size_bytes": len(transcript.encode("utf-8")),
+        "created_at": timezone.now(),
+        "last_used_at": timezone.now(),
+    }
+    try:
+        with transaction.atomic():
+            TranscriptCacheEntry.objects.update_or_create(
+                video_id=video_id, model_size=model_size, language=_language_key(language), defaults=defaults
+            )
+    except IntegrityError:
+        # A concurrent job stored the same transcript first.
+        pass
+    evict_transcripts()
+
+
+def evict_transcripts() -> int:
+    """
+    Remove expired entries, then least recently used entries until the cache fits into
+    TRANSCRIPT_CACHE_MAX_MB. Returns the number of removed entries.
+    """
+    expired_before = timezone.now() - timedelta(seconds=settings.TRANSCRIPT_CACHE_TTL)
+    removed, _ = TranscriptCacheEntry.objects.filter(created_at__lt=expired_before).delete()
+
+    budget = settings.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024
+    total = TranscriptCacheEntry.objects.aggregate(total=Sum("size_bytes"))["total"] or 0
+    if total <= budget:
+        return removed
+
+    stale_ids = []
+    for entry_id, size_bytes in TranscriptCacheEntry.objects.order_by("last_used_at").values_list("id", "size_bytes"):
+        if total <= budget:
+            break
+        stale_ids.append(entry_id)
+        total -= size_bytes
+    deleted, _ = TranscriptCacheEntry.objects.filter(id__in=stale_ids).delete()
+    return removed + deleted
@@ -0,0 +1,157 @@
+import logging
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+
+from quiz_app.utils.lazy_import import LazyModule
+
+tiktoken = LazyModule("tiktoken")
+
+logger = logging.getLogger(__name__)
+
+FILLERS = re.compile(r"\b(?:u+m+|u+h+|u+hm+|e+r+m+|hm+|mhm)\b[,.]?\s*|\b(?:you know|i mean),\s*", re.IGNORECASE)
+REPEATED_WORD = re.compile(r"\b(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STOPWORDS = frozenset(
+    "the a an and or but if of to in on at for with from by as is are was were be been this that these those "
+    "it its we you they he she i so then there here what which who will would can could just also not".split()
+)
+MAX_SENTENCE_WORDS = 40
+
+# Bump whenever the condensing rules change so cached generations of the old condensed prompts are not reused.
+CONDENSER_VERSION = "1"
+
+
+def condenser_fingerprint() -> str:
+    """Return the condenser version and the settings that shape the condensed transcript."""
+    return ":".join(str(part) for part in (
+        CONDENSER_VERSION,
+        settings.PROMPT_TRANSCRIPT_TOKEN_BUDGET,
+        settings.PROMPT_EXTRACTIVE_SAMPLING,
+        settings.PROMPT_SAMPLING_SEGMENTS,
+        settings.PROMPT_TOKEN_ENCODING,
+    ))
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Return the tiktoken encoding of PROMPT_TOKEN_ENCODING, or None if it cannot be loaded (e.g. offline)."""
+    try:
+        return tiktoken.get_encoding(settings.PROMPT_TOKEN_ENCODING)
+    except Exception:
+        logger.warning("Could not load tiktoken encoding %s, estimating tokens from characters",
+                       settings.PROMPT_TOKEN_ENCODING, exc_info=True)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of text with tiktoken, or estimate them as one token per four characters."""
+    encoding = get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(transcript: str) -> list:
+    """
+    Split a transcript into sentences in timeline order.
+    Unpunctuated text (e.g. automatic captions) is split into pieces of at most MAX_SENTENCE_WORDS words.
+    """
+    sentences = []
+    for sentence in SENTENCE_END.split(transcript):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def _normalize(sentence: str) -> str:
+    return re.sub(r"[^\w\s]", "", sentence.lower()).strip()
+
+
+def clean_sentences(sentences: list) -> list:
+    """Remove filler words and stutters, and drop empty and repeated sentences."""
+    cleaned = []
+    seen = set()
+    for sentence in sentences:
+        sentence = REPEATED_WORD.sub(r"\1", FILLERS.sub("", sentence)).strip(" ,")
+        key = _normalize(sentence)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        cleaned.append(sentence)
+    return cleaned
+
+
+def _score_sentences(sentences: list) -> list:
+    """Score sentences by the document frequency of their content words."""
+    tokenized = [[word for word in _normalize(s).split() if word not in STOPWORDS and len(word) > 2] for s in sentences]
+    frequencies = Counter(word for words in tokenized for word in words)
+    return [
+        sum(frequencies[word] for word in words) / math.sqrt(len(words)) if words else 0.0
+        for words in tokenized
+    ]
+
+
+def sample_timeline(sentences: list, token_budget: int, segments: int) -> list:
+    """
+    Pick the most informative sentences from each of segments equal slices of the timeline,
+    so the condensed transcript still covers the whole video. Keeps the original order.
+    """
+    scores = _score_sentences(sentences)
+    tokens = [count_tokens(sentence) + 1 for sentence in sentences]
+    segments = max(min(segments, len(sentences)), 1)
+    segment_budget = token_budget // segments
+    selected = []
+    for index in range(segments):
+        start = index * len(sentences) // segments
+        end = (index + 1) * len(sentences) // segments
+        used = 0
+        chosen = []
+        for i in sorted(range(start, end), key=lambda i: scores[i], reverse=True):
+            if used + tokens[i] <= segment_budget:
+                chosen.append(i)
+                used += tokens[i]
+        selected.extend(sorted(chosen))
+    return [sentences[i] for i in selected]
+
+
+def truncate_to_budget(sentences: list, token_budget: int) -> list:
+    """Keep the sentences from the start of the timeline that fit into token_budget."""
+    kept = []
+    used = 0
+    for sentence in sentences:
+        used += count_tokens(sentence) + 1
+        if used > token_budget:
+            break
+        kept.append(sentence)
+    return kept
+
+
+def condense_transcript(transcript: str, token_budget: int | None = None) -> str:
+    """
+    Condense a transcript before it is embedded in the prompt.
+    Filler words and repeated segments are always removed. If the result is still longer than
+    token_budget (PROMPT_TRANSCRIPT_TOKEN_BUDGET, 0 disables the limit), sentences are sampled
+    across the whole timeline with PROMPT_EXTRACTIVE_SAMPLING, otherwise the transcript is cut.
+
+    Args:
+        transcript (str): The raw transcript.
+        token_budget (int): Maximum number of transcript tokens.
+
+    Returns:
+        str: The condensed transcript.
+    """
+    token_budget = settings.PROMPT_TRANSCRIPT_TOKEN_BUDGET if token_budget is None else token_budget
+    sentences = clean_sentences(split_sentences(transcript))
+    condensed = " ".join(sentences)
+    if not token_budget or count_tokens(condensed) <= token_budget:
+        return condensed
+    if settings.PROMPT_EXTRACTIVE_SAMPLING:
+        sentences = sample_timeline(sentences, token_budget, settings.PROMPT_SAMPLING_SEGMENTS)
+    else:
+        sentences = truncate_to_budget(sentences, token_budget)
+    return " ".join(sentences)
@@ -0,0 +1,186 @@
+import importlib
+import threading
+import types
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from quiz_app.utils.lazy_import import LazyModule
+from quiz_app.utils.progress import report_progress, TRANSCRIBING
+
+whisper = LazyModule("whisper")
+torch = LazyModule("torch")
+
+
+class TranscriptionBackend:
+    """
+    Interface of a speech-to-text engine.
+    load returns a model whose transcribe(audio, **options) accepts a file path or a
+    16 kHz mono float32 array and returns a dict with "text" and "segments",
+    the same shape openai-whisper returns.
+
+    Attributes:
+        name (str): The name used in the TRANSCRIPTION_BACKEND setting.
+        thread_safe (bool): Whether one loaded model may transcribe in several threads at once.
+    """
+    name = None
+    thread_safe = False
+
+    def load(self, model_size: str, device: str):
+        raise NotImplementedError
+
+
+_progress_lock = threading.Lock()
+_progress_users = 0
+_original_tqdm = None
+
+
+@contextmanager
+def whisper_progress():
+    """
+    Report the decoding progress of openai-whisper as TRANSCRIBING progress inside the context.
+    openai-whisper has no progress callback, it only advances a tqdm bar over the audio frames
+    after every decoded segment. While any thread is inside the context, the tqdm module used by
+    whisper.transcribe is swapped for one whose bar also reports to the progress reporter of the
+    calling thread; the original module is restored when the last thread leaves. The bar itself
+    is still only shown with verbose=False.
+    """
+    global _progress_users, _original_tqdm
+    module = importlib.import_module("whisper.transcribe")
+    with _progress_lock:
+        if _progress_users == 0:
+            _original_tqdm = module.tqdm
+
+            class WhisperProgressBar(_original_tqdm.tqdm):
+                def __init__(self, *args, **kwargs):
+                    super().__init__(*args, **kwargs)
+                    self.decoded_frames = 0
+
+                def update(self, n=1):
+                    self.decoded_frames += n
+                    if self.total:
+                        report_progress(TRANSCRIBING, self.decoded_frames / self.total)
+                    return super().update(n)
+
+            module.tqdm = types.SimpleNamespace(tqdm=WhisperProgressBar)
+        _progress_users += 1
+    try:
+        yield
+    finally:
+        with _progress_lock:
+            _progress_users -= 1
+            if _progress_users == 0:
+                module.tqdm = _original_tqdm
+                _original_tqdm = None
+
+
+class _OpenAIWhisperModel:
+    """Runs an openai-whisper model and reports its decoding progress, other attributes come from the model."""
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **options):
+        with whisper_progress():
+            return self.model.transcribe(audio, **options)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """
+    The reference openai-whisper engine in float32 (float16 on CUDA) PyTorch.
+    Not thread-safe: decoding installs kv-cache hooks on the shared model.
+    """
+    name = "whisper"
+
+    def load(self, model_size: str, device: str):
+        return _OpenAIWhisperModel(whisper.load_model(model_size, device=device))
+
+
+class _QuantizedWhisperModel(_OpenAIWhisperModel):
+    """Runs a dynamically quantized Whisper model, which only supports float32 decoding."""
+    def transcribe(self, audio, **options):
+        options.setdefault("fp16", False)
+        return super().transcribe(audio, **options)
+
+
+class WhisperInt8Backend(TranscriptionBackend):
+    """
+    openai-whisper with int8 weights for all Linear layers (torch dynamic quantization).
+    CPU only, needs no extra dependencies. Not thread-safe, like the openai-whisper backend.
+    """
+    name = "whisper-int8"
+
+    def load(self, model_size: str, device: str):
+        if device != "cpu":
+            raise ImproperlyConfigured("The whisper-int8 backend only runs on the CPU.")
+        model = whisper.load_model(model_size, device="cpu")
+        quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return _QuantizedWhisperModel(quantized)
+
+
+class _FasterWhisperModel:
+    """
+    Adapts faster-whisper's lazy segment generator to the openai-whisper result format.
+    Progress is reported after every decoded segment.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **options):
+        decoded, info = self.model.transcribe(audio, **options)
+        segments = []
+        for index, segment in enumerate(decoded):
+            segments.append({"id": index, "start": segment.start, "end": segment.end, "text": segment.text})
+            if info.duration:
+                report_progress(TRANSCRIBING, segment.end / info.duration)
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    CTranslate2 engine from the optional faster-whisper package.
+    Uses int8 weights by default (FASTER_WHISPER_COMPUTE_TYPE), the fastest choice on CPU-only nodes.
+    CTranslate2 models can be used from several threads at once.
+    """
+    name = "faster-whisper"
+    thread_safe = True
+
+    def load(self, model_size: str, device: str):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "The faster-whisper backend requires the faster-whisper package (pip install faster-whisper)."
+            ) from e
+        device_type, _, index = device.partition(":")
+        model = WhisperModel(
+            model_size,
+            device=device_type,
+            device_index=int(index or 0),
+            compute_type=settings.FASTER_WHISPER_COMPUTE_TYPE,
+        )
+        return _FasterWhisperModel(model)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (OpenAIWhisperBackend, WhisperInt8Backend, FasterWhisperBackend)
+}
+
+
+def get_backend(name: str | None = None) -> TranscriptionBackend:
+    """Return the transcription backend with the given name, defaulting to TRANSCRIPTION_BACKEND."""
+    name = name or settings.TRANSCRIPTION_BACKEND
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown TRANSCRIPTION_BACKEND {name!r}, choose one of: {', '.join(BACKENDS)}."
+        )
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+from django.conf import settings
+
+from quiz_app.utils.progress import current_reporter, progress_reporter
+from quiz_app.utils.vad import transcribe_with_vad
+
+
+class TranscriptionServiceError(Exception):
+    """Raised when the transcription service fails to transcribe the audio."""
+
+
+class TranscriptionServiceBusy(TranscriptionServiceError):
+    """Raised when the transcription service rejected a job because its queue is full."""
+
+
+# Seconds a new connection may take to authenticate and send its job.
+RECEIVE_TIMEOUT = 10
+
+
+def parse_address(address: str):
+    """Return a listener address: a (host, port) tuple for "host:port", otherwise a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def parse_devices(devices: str) -> dict:
+    """Parse "cuda:0=1,cpu=2" into {"cuda:0": 1, "cpu": 2} (device to concurrent jobs)."""
+    parsed = {}
+    for item in devices.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        device, _, slots = item.rpartition("=") if "=" in item else (item, "", "1")
+        parsed[device.strip()] = max(int(slots), 1)
+    return parsed
+
+
+def service_authkey() -> bytes:
+    """Derive the shared secret of service and clients from the Django SECRET_KEY."""
+    return hashlib.sha256(f"transcription-service:{settings.SECRET_KEY}".encode("utf-8")).digest()
+
+
+class TranscriptionService:
+    """
+    Standalone process that owns the loaded Whisper models and runs transcription jobs.
+    Jobs arrive over a local socket and wait in a bounded queue. Each device runs at most its
+    configured number of jobs at once; when the queue is full new jobs are rejected as busy,
+    so clients back off instead of overloading the host. While a job runs, its progress reports
+    are relayed to the client before the final reply. Connections are authenticated and read
+    on their own threads, so a client that disconnects, fails authentication or stalls cannot
+    stop the service from accepting other connections.
+
+    Attributes:
+        devices (dict): Device name to number of concurrent jobs.
+        queue_size (int): Number of jobs that may wait for a free device.
+    """
+    def __init__(self, address, devices: dict, queue_size: int, registry=None, decode=None, authkey: bytes | None = None):
+        if registry is None:
+            from quiz_app.utils.whisper_registry import registry
+        if decode is None:
+            from quiz_app.utils.whisper_utils import decode_audio as decode
+        self.devices = devices
+        self.queue_size = queue_size
+        self.registry = registry
+        self.decode = decode
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._authkey = authkey or service_authkey()
+        self._listener = Listener(address)
+        self._stopped = threading.Event()
+        self._threads = []
+
+    @property
+    def address(self):
+        return self._listener.address
+
+    def start(self) -> None:
+        """Start one worker thread per device slot and the thread accepting connections."""
+        for device, slots in self.devices.items():
+            for slot in range(slots):
+                self._spawn(self._work, device, name=f"transcribe-{device}-{slot}")
+        self._spawn(self._accept, name="transcribe-accept")
+
+    def serve_forever(self) -> None:
+        self.start()
+        self._stopped.wait()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._listener.close()
+
+    def _spawn(self, target, *args, name: str) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept(self) -> None:
+        """Accept client connections until the service is stopped and receive each job on its own thread."""
+        while not self._stopped.is_set():
+            try:
+                conn = self._listener.accept()
+            except (EOFError, AuthenticationError, OSError):
+                continue
+            threading.Thread(target=self._receive, args=(conn,), name="transcribe-receive", daemon=True).start()
+
+    def _receive(self, conn) -> None:
+        """Authenticate a connection and queue its job, rejecting it if the queue is full."""
+        try:
+            deliver_challenge(conn, self._authkey)
+            answer_challenge(conn, self._authkey)
+            if not conn.poll(RECEIVE_TIMEOUT):
+                raise EOFError("No job received.")
+            job = conn.recv()
+        except (EOFError, AuthenticationError, OSError):
+            conn.close()
+            return
+        try:
+            self._jobs.put_nowait((job, conn))
+        except queue.Full:
+            try:
+                conn.send({"busy": True})
+            except OSError:
+                pass
+            conn.close()
+
+    def _work(self, device: str) -> None:
+        """Run queued jobs on one slot of the given device."""
+        while not self._stopped.is_set():
+            try:
+                job, conn = self._jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                with progress_reporter(lambda stage, percent: conn.send({"progress": percent, "stage": stage})):
+                    text = self.transcribe(job, device)
+                conn.send({"text": text})
+            except Exception as e:
+                try:
+                    conn.send({"error": str(e)})
+                except OSError:
+                    pass
+            finally:
+                conn.close()
+
+    def transcribe(self, job: dict, device: str) -> str:
+        """Decode the job's audio source and transcribe it with the shared model for the device."""
+        audio = self.decode(job["source"], job.get("headers"))
+        options = {"language": job["language"]} if job.get("language") else {}
+        with self.registry.acquire(job["model_size"], device) as model:
+            return transcribe_with_vad(model, audio, **options)["text"]
+
+
+class TranscriptionClient:
+    """
+    Thin client that hands transcription jobs to the TranscriptionService.
+    Retries with exponential backoff while the service reports that it is busy, and gives up
+    if the service sends neither progress nor a reply within timeout seconds.
+    Progress messages of the service are passed on to the progress reporter of the calling thread.
+    """
+    def __init__(self, address=None, authkey: bytes | None = None, busy_timeout: float | None = None, timeout: float | None = None):
+        self.address = address or parse_address(settings.TRANSCRIPTION_SERVICE_ADDRESS)
+        self.authkey = authkey or service_authkey()
+        self.busy_timeout = settings.TRANSCRIPTION_SERVICE_BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+        self.timeout = settings.TRANSCRIPTION_SERVICE_TIMEOUT if timeout is None else timeout
+
+    def _request(self, job: dict) -> dict:
+        """Send a job, relay its progress messages and return the service's final reply."""
+        reporter = current_reporter()
+        try:
+            with Client(self.address, authkey=self.authkey) as conn:
+                conn.send(job)
+                while True:
+                    if not conn.poll(self.timeout):
+                        raise TranscriptionServiceError(f"Transcription service did not answer within {self.timeout} seconds.")
+                    reply = conn.recv()
+                    if "progress" not in reply:
+                        return reply
+                    if reporter is not None:
+                        reporter(reply["stage"], reply["progress"])
+        except (EOFError, AuthenticationError, OSError) as e:
+            raise TranscriptionServiceError(f"Transcription service connection failed: {e!r}") from e
+
+    def transcribe(self, source: str, headers: str | None = None, model_size: str = "base", language: str | None = None) -> str:
+        """
+        Transcribe an audio file or stream URL in the service and return the text.
+        Raises TranscriptionServiceBusy if the service stays busy longer than busy_timeout
+        and TranscriptionServiceError if it fails or does not answer in time.
+        """
+        job = {"source": source, "headers": headers, "model_size": model_size, "language": language}
+        deadline = time.monotonic() + self.busy_timeout
+        delay = 0.5
+        while True:
+            reply = self._request(job)
+            if "text" in reply:
+                return reply["text"]
+            if not reply.get("busy"):
+                raise TranscriptionServiceError(reply.get("error", "Unknown transcription service error"))
+            if time.monotonic() + delay > deadline:
+                raise TranscriptionServiceBusy("Transcription service is busy, try again later.")
+            time.sleep(delay)
+            delay = min(delay * 2, 10)
+
+
+def cpu_threads_per_slot(devices: dict) -> int:
+    """Return the torch CPU threads each CPU slot may use without oversubscribing the cores."""
+    cpu_slots = sum(slots for device, slots in devices.items() if device == "cpu")
+    return max((os.cpu_count() or 1) // max(cpu_slots, 1), 1)
@@ -0,0 +1,116 @@
+import numpy as np
+from django.conf import settings
+
+from quiz_app.utils.chunked_transcription import SAMPLE_RATE
+
+FRAME_MS = 30
+
+
+def frame_energy_db(audio: np.ndarray, frame_samples: int) -> np.ndarray:
+    """Return the RMS energy of consecutive frames in dBFS."""
+    frames = len(audio) // frame_samples
+    if frames == 0:
+        return np.empty(0, dtype=np.float32)
+    framed = audio[:frames * frame_samples].reshape(frames, frame_samples)
+    rms = np.sqrt(np.square(framed, dtype=np.float64).mean(axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(
+    audio: np.ndarray,
+    threshold_db: float | None = None,
+    min_silence_ms: int | None = None,
+    padding_ms: int | None = None,
+    min_speech_ms: int = 250,
+) -> list:
+    """
+    Find the speech regions of 16 kHz mono audio with an adaptive energy detector.
+    A frame counts as speech if it is threshold_db louder than the noise floor (the 10th percentile
+    of all frames). Regions are padded, gaps shorter than min_silence_ms are bridged and
+    regions shorter than min_speech_ms are dropped.
+
+    Returns:
+        list: (start_sample, end_sample) pairs in ascending order.
+    """
+    threshold_db = settings.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+    min_silence_ms = settings.VAD_MIN_SILENCE_MS if min_silence_ms is None else min_silence_ms
+    padding_ms = settings.VAD_PADDING_MS if padding_ms is None else padding_ms
+
+    frame_samples = SAMPLE_RATE * FRAME_MS // 1000
+    energy = frame_energy_db(audio, frame_samples)
+    if len(energy) == 0:
+        return []
+    noise_floor = np.percentile(energy, 10)
+    voiced = energy > max(noise_floor + threshold_db, -60)
+
+    regions = []
+    start = None
+    for index, is_voiced in enumerate(voiced):
+        if is_voiced and start is None:
+            start = index
+        elif not is_voiced and start is not None:
+            regions.append([start, index])
+            start = None
+    if start is not None:
+        regions.append([start, len(voiced)])
+
+    pad = padding_ms // FRAME_MS
+    gap = min_silence_ms // FRAME_MS
+    merged = []
+    for start, end in regions:
+        start, end = max(start - pad, 0), min(end + pad, len(voiced))
+        if merged and start - merged[-1][1] <= gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    min_frames = max(min_speech_ms // FRAME_MS, 1)
+    return [
+        (start * frame_samples, min(end * frame_samples, len(audio)))
+        for start, end in merged
+        if end - start >= min_frames
+    ]
+
+
+def compact_speech(audio: np.ndarray, regions: list) -> tuple[np.ndarray, list]:
+    """
+    Concatenate the speech regions of audio.
+
+    Returns:
+        tuple: The compacted audio and a mapping of (compact_start, original_start, length)
+        in seconds, used to translate timestamps back to the original audio.
+    """
+    mapping = []
+    position = 0
+    for start, end in regions:
+        mapping.append((position / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE))
+        position += end - start
+    if not regions:
+        return np.empty(0, dtype=np.float32), mapping
+    return np.concatenate([audio[start:end] for start, end in regions]), mapping
+
+
+def remap_timestamp(seconds: float, mapping: list) -> float:
+    """Translate a timestamp of the compacted audio to the original audio."""
+    for compact_start, original_start, length in reversed(mapping):
+        if seconds >= compact_start:
+            return original_start + min(seconds - compact_start, length)
+    return seconds
+
+
+def transcribe_with_vad(model, audio, **options) -> dict:
+    """
+    Transcribe audio with model, skipping silence first if VAD_ENABLED is set.
+    Only in-memory audio is filtered; segment timestamps refer to the original audio.
+    """
+    if not settings.VAD_ENABLED or not isinstance(audio, np.ndarray):
+        return model.transcribe(audio, **options)
+
+    compacted, mapping = compact_speech(audio, detect_speech(audio))
+    if len(compacted) == 0:
+        return {"text": "", "segments": []}
+    result = model.transcribe(compacted, **options)
+    for segment in result.get("segments", []):
+        segment["start"] = remap_timestamp(segment["start"], mapping)
+        segment["end"] = remap_timestamp(segment["end"], mapping)
+    return result
@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from quiz_app.utils.transcription_backends import get_backend
+
+
+def resolve_device(device: str | None = None) -> str:
+    """
+    Return the device a Whisper model should be loaded on.
+    Falls back to the WHISPER_DEVICE setting and finally to CUDA if available, else CPU.
+    """
+    device = device or getattr(settings, "WHISPER_DEVICE", None)
+    if device:
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def estimate_model_bytes(model) -> int:
+    """
+    Estimate the memory footprint of a loaded model from the tensors in its state dict.
+    Unlike parameters(), the state dict also holds the packed int8 weights of dynamically
+    quantized Linear layers. Tensors shared between modules are counted once.
+    """
+    state_dict = getattr(model, "state_dict", None)
+    if state_dict is None:
+        return 0
+    total = 0
+    seen = set()
+    for value in state_dict().values():
+        for tensor in value if isinstance(value, tuple) else (value,):
+            if not hasattr(tensor, "element_size") or tensor.data_ptr() in seen:
+                continue
+            seen.add(tensor.data_ptr())
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class _Entry:
+    """A loaded model together with its bookkeeping data and, if it is not thread-safe, its inference lock."""
+    def __init__(self, model, size_bytes: int, thread_safe: bool = False):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self.inference_lock = None if thread_safe else threading.Lock()
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models of the configured transcription backend.
+    Each (model_size, device) pair is loaded once and shared across requests.
+    Idle models are evicted least-recently-used first when the memory budget is exceeded
+    or when they have not been used for longer than the idle timeout; with an idle timeout,
+    a timer sweeps the loaded models while any are held, so idle models are freed even if
+    no other model is loaded.
+    Models of backends that are not thread-safe (whisper, whisper-int8) are used by one caller at a time.
+
+    Attributes:
+        memory_budget_bytes (int): Maximum bytes of loaded models, 0 means unlimited.
+        idle_timeout (float): Seconds after which an unused model is evicted, 0 means never.
+    """
+    def __init__(self, memory_budget_bytes: int = 0, idle_timeout: float = 0, loader=None, thread_safe: bool | None = None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_timeout = idle_timeout
+        self._loader = loader
+        self._thread_safe = thread_safe
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._sweep_timer = None
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "load_seconds": 0.0, "evictions": 0}
+
+    def _load(self, model_size: str, device: str):
+        """Load a model using the configured loader, or the TRANSCRIPTION_BACKEND setting."""
+        if self._loader is not None:
+            return self._loader(model_size, device)
+        return get_backend().load(model_size, device)
+
+    def _is_thread_safe(self) -> bool:
+        """Return whether loaded models may be shared by concurrent callers; custom loaders default to no."""
+        if self._thread_safe is not None:
+            return self._thread_safe
+        return self._loader is None and get_backend().thread_safe
+
+    def _key_lock(self, key) -> threading.Lock:
+        """Return the lock that serializes loading of a single key."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _checkout(self, key):
+        """Mark a cached entry as in use and return it, or None if not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    @contextmanager
+    def acquire(self, model_size: str = "base", device: str | None = None):
+        """
+        Yield the shared model for (model_size, device), loading it on first use.
+        The model is protected from eviction while the context is active. If it is not thread-safe,
+        the context also holds its inference lock, so concurrent callers transcribe one after another.
+        """
+        key = (model_size, resolve_device(device))
+        entry = self._checkout(key)
+        if entry is None:
+            with self._key_lock(key):
+                entry = self._checkout(key)
+                if entry is None:
+                    entry = self._load_entry(key)
+        try:
+            if entry.inference_lock is None:
+                yield entry.model
+            else:
+                with entry.inference_lock:
+                    yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+                self._schedule_sweep_locked()
+
+    def _load_entry(self, key) -> _Entry:
+        """Load the model for key, register it as in use and evict others if needed."""
+        started = time.perf_counter()
+        model = self._load(*key)
+        elapsed = time.perf_counter() - started
+        entry = _Entry(model, estimate_model_bytes(model), self._is_thread_safe())
+        entry.in_use = 1
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["loads"] += 1
+            self._stats["load_seconds"] += elapsed
+            self._entries[key] = entry
+            self._evict_locked()
+        return entry
+
+    def get_model(self, model_size: str = "base", device: str | None = None):
+        """Return the shared model for (model_size, device) without pinning it."""
+        with self.acquire(model_size, device) as model:
+            return model
+
+    def warm_up(self, model_sizes, device: str | None = None) -> None:
+        """Load the given model sizes ahead of the first request."""
+        for model_size in model_sizes:
+            self.get_model(model_size, device)
+
+    def evict_idle(self) -> int:
+        """Evict models that exceed the idle timeout or the memory budget. Returns the count."""
+        with self._lock:
+            return self._evict_locked()
+
+    def _schedule_sweep_locked(self) -> None:
+        """Start the idle sweep timer unless it is running or there is no idle timeout. The caller must hold self._lock."""
+        if not self.idle_timeout or self._sweep_timer is not None or not self._entries:
+            return
+        self._sweep_timer = threading.Timer(self.idle_timeout, self._sweep)
+        self._sweep_timer.daemon = True
+        self._sweep_timer.start()
+
+    def _sweep(self) -> None:
+        """Evict expired models and sweep again later while models are loaded."""
+        with self._lock:
+            self._sweep_timer = None
+            self._evict_locked()
+            self._schedule_sweep_locked()
+
+    def _evict_locked(self) -> int:
+        """Evict idle entries, oldest first. The caller must hold self._lock."""
+        evicted = 0
+        now = time.monotonic()
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.in_use:
+                continue
+            expired = self.idle_timeout and now - entry.last_used >= self.idle_timeout
+            over_budget = self.memory_budget_bytes and self._total_bytes() > self.memory_budget_bytes
+            if expired or over_budget:
+                del self._entries[key]
+                evicted += 1
+        self._stats["evictions"] += evicted
+        return evicted
+
+    def _total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def loaded(self) -> list:
+        """Return the (model_size, device) keys currently held in memory."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss/load counters together with the current memory usage."""
+        with self._lock:
+            data = dict(self._stats)
+            data["loaded_models"] = len(self._entries)
+            data["loaded_bytes"] = self._total_bytes()
+        return data
+
+    def clear(self) -> None:
+        """Drop all cached models and reset the counters."""
+        with self._lock:
+            if self._sweep_timer is not None:
+                self._sweep_timer.cancel()
+                self._sweep_timer = None
+            self._entries.clear()
+            self._key_locks.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+registry = WhisperModelRegistry(
+    memory_budget_bytes=settings.WHISPER_MODEL_MEMORY_BUDGET_MB * 1024 * 1024,
+    idle_timeout=settings.WHISPER_MODEL_IDLE_TIMEOUT,
+)
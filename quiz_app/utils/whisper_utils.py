@@ -1,14 +1,51 @@
+import logging
 import os
-import yt_dlp
-import whisper
-import time
+import subprocess
+from functools import lru_cache
+
+import numpy as np
 
 from django.conf import settings
 
-def download_audio(video_url: str, output_dir: str) -> str:
+from quiz_app.utils.captions import captions_from_info, probe_video
+from quiz_app.utils.chunked_transcription import SAMPLE_RATE, transcribe_stream
+from quiz_app.utils.lazy_import import LazyModule
+from quiz_app.utils.transcription_service import TranscriptionClient
+from quiz_app.utils.progress import report_progress, report_stage, DOWNLOADING, TRANSCRIBING
+from quiz_app.utils.transcript_cache import CAPTIONS_KEY, get_cached_transcript_with_source, store_transcript
+from quiz_app.utils.vad import transcribe_with_vad
+from quiz_app.utils.whisper_registry import registry
+
+yt_dlp = LazyModule("yt_dlp")
+yt_dlp_extractor = LazyModule("yt_dlp.extractor")
+
+logger = logging.getLogger(__name__)
+
+WHISPER = "whisper"
+
+
+@lru_cache(maxsize=1024)
+def canonical_video_id(video_url: str) -> str | None:
+    """
+    Return a canonical "<extractor>:<id>" key for a video URL without any network access.
+    Different URLs of the same video (e.g. youtu.be and youtube.com/watch) map to the same key.
+    Returns None if no specific yt-dlp extractor recognizes the URL.
+    """
+    for extractor in yt_dlp_extractor.gen_extractor_classes():
+        if extractor.ie_key() == "Generic" or not extractor.suitable(video_url):
+            continue
+        video_id = extractor.get_temp_id(video_url)
+        if video_id:
+            return f"{extractor.ie_key()}:{video_id}"
+        return None
+    return None
+
+
+def download_audio(video_url: str, output_dir: str, info: dict | None = None) -> str:
     """
     Download audio from YouTube video using yt-dlp
     The Audio file is saved temporarily in the specified output path.
+    If the info dict of an earlier probe is given, the video page is not extracted again.
     Returns the path to the downloaded audio file.
     """
     if not os.path.exists(output_dir):
@@ -23,29 +60,174 @@ def download_audio(video_url: str, output_dir: str) -> str:
             "key": "FFmpegExtractAudio",
             "preferredcodec": "m4a",
         }],
+        "progress_hooks": [report_download_progress],
     }
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(video_url, download=True)
+        if info is not None:
+            info = ydl.process_ie_result(info, download=True)
+        else:
+            info = ydl.extract_info(video_url, download=True)
         return os.path.join(output_dir, f"{info['id']}.m4a")
 
 
-def whisper_transcribe(video_url: str, model_size: str = "base") -> str:
+def report_download_progress(status: dict) -> None:
+    """yt-dlp progress hook that reports the downloaded share of the audio file."""
+    if status.get("status") != "downloading":
+        return
+    total = status.get("total_bytes") or status.get("total_bytes_estimate")
+    if total:
+        report_progress(DOWNLOADING, status.get("downloaded_bytes", 0) / total)
+
+
+def resolve_audio_stream(video_url: str, info: dict | None = None) -> tuple[str, str] | None:
+    """
+    Resolve the direct audio stream URL of a video without downloading it.
+    The info dict of an earlier probe_video call is used if given, it already has the audio format selected.
+    Returns the stream URL and the HTTP headers ffmpeg needs to read it,
+    or None if the selected format has no direct stream URL (e.g. fragmented formats).
+    """
+    if info is None:
+        ydl_opts = {"format": "bestaudio/best", "quiet": True, "no_warnings": True}
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(video_url, download=False)
+    stream_url = info.get("url")
+    if not stream_url or info.get("fragments"):
+        return None
+    headers = "".join(f"{key}: {value}\r\n" for key, value in info.get("http_headers", {}).items())
+    return stream_url, headers
+
+
+def ffmpeg_decode_command(source: str, headers: str | None = None) -> list:
+    """Return the ffmpeg command that decodes source to 16 kHz mono float32 PCM on stdout."""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if headers:
+        cmd += ["-headers", headers]
+    cmd += [
+        "-i", source,
+        "-vn", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    return cmd
+
+
+def decode_audio(source: str, headers: str | None = None) -> np.ndarray:
+    """Decode a stream URL or file into memory in a single ffmpeg pass."""
+    try:
+        out = subprocess.run(ffmpeg_decode_command(source, headers), capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out, np.float32)
+
+
+def transcribe_chunked(source: str, model_size: str = "base", language: str | None = None, headers: str | None = None, duration: float | None = None) -> str:
+    """
+    Decode source with ffmpeg and transcribe the PCM stream in parallel chunks while it is being read.
+    Only a bounded number of chunks is held in memory at any time.
+    The duration of the audio, if known, lets finished chunks be reported as progress right away.
+    """
+    process = subprocess.Popen(ffmpeg_decode_command(source, headers), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        transcript = transcribe_stream(process.stdout, model_size, language, duration=duration)
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        process.wait()
+    if process.returncode:
+        raise RuntimeError(f"Failed to decode audio, ffmpeg exited with {process.returncode}")
+    return transcript
+
+
+def transcribe_audio(video_url: str, model_size: str = "base", language: str | None = None, info: dict | None = None) -> str:
+    """
+    Load the audio of a video and transcribe it with the shared Whisper model from the registry.
+    With AUDIO_STREAMING enabled the audio is decoded from the stream URL without temporary files,
+    otherwise (or if the format cannot be streamed) download_audio writes a temporary file.
+    With TRANSCRIPTION_SERVICE_ADDRESS set, the transcription service does the work instead,
+    and with WHISPER_CHUNK_WORKERS set, long audio is transcribed in parallel chunks.
+    With VAD_ENABLED, silence and other non-speech regions are dropped before Whisper runs.
+    The info dict of an earlier probe_video call saves extracting the video page again.
+    Returns the transcript as text.
+    """
+    report_stage(DOWNLOADING)
+    stream = resolve_audio_stream(video_url, info) if settings.AUDIO_STREAMING else None
+    audio_file = None
+    if stream is None:
+        audio_file = download_audio(video_url, settings.TMP_AUDIO_DIR, info)
+    source, headers = stream or (audio_file, None)
+    options = {"language": language} if language else {}
+    try:
+        if settings.TRANSCRIPTION_SERVICE_ADDRESS:
+            report_stage(TRANSCRIBING)
+            return TranscriptionClient().transcribe(source, headers, model_size, language)
+        if settings.WHISPER_CHUNK_WORKERS:
+            report_stage(TRANSCRIBING)
+            duration = info.get("duration") if info else None
+            return transcribe_chunked(source, model_size, language, headers=headers, duration=duration)
+        audio = decode_audio(source, headers) if stream or settings.VAD_ENABLED else audio_file
+        report_stage(TRANSCRIBING)
+        with registry.acquire(model_size) as model:
+            result = transcribe_with_vad(model, audio, **options)
+    finally:
+        if audio_file and os.path.exists(audio_file):
+            os.remove(audio_file)
+    return result["text"]
+
+
+def whisper_transcribe(video_url: str, model_size: str = "base", language: str | None = None, info: dict | None = None) -> str:
+    """
+    Transcribe the audio of a video and store the transcript in the transcript cache.
+    Callers check the cache first (see acquire_transcript).
+    """
+    transcript = transcribe_audio(video_url, model_size, language, info)
+    video_id = canonical_video_id(video_url)
+    if video_id:
+        store_transcript(video_id, model_size, language, transcript)
+    return transcript
+
+
+def cached_transcript(video_id: str, model_size: str, language: str | None = None) -> tuple[str, str] | None:
     """
-    Calls the download_audio function to download the audio.
-    Whisper then transcribes the audio file into text.
-    Return the Transcript as text.
+    Return a cached transcript of a video and its source: the captions if CAPTIONS_ENABLED,
+    otherwise the Whisper transcript for model_size. Returns None on a miss.
     """
-    audio_file = download_audio(video_url, settings.TMP_AUDIO_DIR)
-    model = whisper.load_model(model_size)
-    result = model.transcribe(audio_file)
-    transcript = result["text"]
+    if settings.CAPTIONS_ENABLED:
+        cached = get_cached_transcript_with_source(video_id, CAPTIONS_KEY, language)
+        if cached is not None:
+            return cached
+    return get_cached_transcript_with_source(video_id, model_size, language)
 
-    transcript_file = os.path.join(settings.TMP_TRANSCRIPTS_DIR, f"transcript_{int(time.time())}.txt")
-    with open(transcript_file, 'w', encoding='utf-8') as f:
-        f.write(transcript)
-    
-    if os.path.exists(audio_file):
-        os.remove(audio_file)
 
-    return transcript, transcript_file
\ No newline at end of file
+def acquire_transcript(video_url: str, model_size: str = "base", language: str | None = None) -> tuple[str, str]:
+    """
+    Return the transcript of a video from the cheapest available source.
+    The transcript cache is checked first, keyed by the canonical video ID, so a cached video
+    needs no network access at all. With CAPTIONS_ENABLED the captions of the video are used
+    if they pass the quality rules, which needs no media download. Otherwise the audio is
+    transcribed with Whisper, reusing the info dict of the caption probe, so yt-dlp extracts
+    the video page only once.
+
+    Returns:
+        tuple: The transcript and its source ("captions", "auto_captions" or "whisper").
+    """
+    video_id = canonical_video_id(video_url)
+    cached = cached_transcript(video_id, model_size, language) if video_id else None
+    if cached is not None:
+        return cached
+
+    info = None
+    if settings.CAPTIONS_ENABLED:
+        report_stage(DOWNLOADING)
+        try:
+            info = probe_video(video_url)
+            captions = captions_from_info(info, language)
+        except Exception:
+            logger.warning("Probing captions of %s failed, falling back to Whisper", video_url, exc_info=True)
+            captions = None
+        if captions is not None:
+            if video_id:
+                store_transcript(video_id, CAPTIONS_KEY, language, *captions)
+            return captions
+    return whisper_transcribe(video_url, model_size, language, info), WHISPER